@@ -0,0 +1,15 @@
+"""Benchmarks for the FitMentor backend.
+
+Run from the project root, e.g.:
+    python -m benchmarks.bench_catalog_loader
+    python -m benchmarks.bench_engines --baseline benchmarks/baseline.json
+    python -m benchmarks.loadtest --rate 500 --duration 20
+"""
+
+import os
+import sys
+
+# Make the backend importable as in tests (src/backend on sys.path)
+BACKEND_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src", "backend")
+if BACKEND_DIR not in sys.path:
+    sys.path.insert(0, BACKEND_DIR)
@@ -0,0 +1,132 @@
+"""Benchmark catalog import time and memory for external catalog files.
+
+Writes synthetic catalogs of 1k, 10k and 100k exercises (variations of the
+built-in ones), then loads each in a fresh interpreter and measures:
+- import: importing models.exercise_data
+- first_group: first get_exercises_by_muscle_group("chest") (parses one group)
+- all: materializing every exercise
+- peak_kb: tracemalloc peak over the whole run
+- maxrss_kb: process max RSS
+
+The built-in catalog is measured the same way for reference.
+
+Usage:
+    python -m benchmarks.bench_catalog_loader [--sizes 1000,10000] [--json out.json]
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+
+from benchmarks import BACKEND_DIR
+
+DEFAULT_SIZES = [1_000, 10_000, 100_000]
+
+# Runs in a fresh interpreter so import costs are not hidden by caching
+# (tracemalloc slows allocation down, so it only runs when asked to)
+_PROBE = r"""
+import json, resource, sys, time, tracemalloc
+sys.path.insert(0, sys.argv[1])
+if sys.argv[2] == "trace":
+    tracemalloc.start()
+t0 = time.perf_counter()
+import models.exercise_data as data
+t1 = time.perf_counter()
+chest = data.get_exercises_by_muscle_group("chest")
+t2 = time.perf_counter()
+count = len(data.ALL_EXERCISES)
+t3 = time.perf_counter()
+peak = tracemalloc.get_traced_memory()[1]
+print(json.dumps({
+    "count": count,
+    "import_ms": (t1 - t0) * 1000,
+    "first_group_ms": (t2 - t1) * 1000,
+    "all_ms": (t3 - t2) * 1000,
+    "peak_kb": peak // 1024,
+    "maxrss_kb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+}))
+"""
+
+
+def write_synthetic_catalog(path, size):
+    """Write a catalog of `size` exercises derived from the built-in ones."""
+    from models.exercise_data import ALL_EXERCISES
+    from models.exercise_data.loader import write_catalog
+    from models.movement_patterns import EXERCISE_TO_PATTERN
+
+    exercises = []
+    for i in range(size):
+        base = ALL_EXERCISES[i % len(ALL_EXERCISES)]
+        variation = dict(base, id=f"{base['id']}-v{i}", name=f"{base['name']} #{i}")
+        pattern = EXERCISE_TO_PATTERN.get(base["id"])
+        if pattern:
+            variation["movement_pattern"] = pattern
+        exercises.append(variation)
+    write_catalog(path, exercises)
+
+
+def _run_probe(env, mode):
+    output = subprocess.run(
+        [sys.executable, "-c", _PROBE, BACKEND_DIR, mode],
+        env=env, check=True, capture_output=True, text=True,
+    ).stdout
+    return json.loads(output)
+
+
+def probe(catalog_path=None):
+    """Measure loading in fresh interpreters; returns the probe's metrics.
+
+    Timings come from an untraced run, peak_kb from a tracemalloc run.
+    """
+    env = dict(os.environ)
+    env.pop("FITMENTOR_CATALOG_PATH", None)
+    if catalog_path:
+        env["FITMENTOR_CATALOG_PATH"] = catalog_path
+
+    result = _run_probe(env, "time")
+    result["peak_kb"] = _run_probe(env, "trace")["peak_kb"]
+    return result
+
+
+def run(sizes):
+    """Run the benchmark for each size; returns a list of result rows."""
+    results = [dict(probe(), source="builtin")]
+
+    with tempfile.TemporaryDirectory() as tmp:
+        for size in sizes:
+            path = os.path.join(tmp, f"catalog-{size}.jsonl")
+            write_synthetic_catalog(path, size)
+            row = probe(path)
+            row["source"] = f"jsonl-{size}"
+            row["file_kb"] = os.path.getsize(path) // 1024
+            results.append(row)
+
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", default=",".join(map(str, DEFAULT_SIZES)))
+    parser.add_argument("--json", help="Write results to this JSON file")
+    args = parser.parse_args(argv)
+
+    sizes = [int(s) for s in args.sizes.split(",") if s]
+    results = run(sizes)
+
+    print(f"{'source':<14}{'count':>8}{'import ms':>11}{'group ms':>10}"
+          f"{'all ms':>10}{'peak KB':>10}{'rss KB':>10}")
+    for r in results:
+        print(f"{r['source']:<14}{r['count']:>8}{r['import_ms']:>11.1f}"
+              f"{r['first_group_ms']:>10.1f}{r['all_ms']:>10.1f}"
+              f"{r['peak_kb']:>10}{r['maxrss_kb']:>10}")
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
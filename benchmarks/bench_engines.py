@@ -0,0 +1,319 @@
+"""Benchmark the workout, query, calorie and storage engines.
+
+Cases:
+- suggest.grid: suggest() over the full input grid (gender x goal x
+  experience x days x equipment set), timed per call
+- selector.init: ExerciseSelector construction per experience/equipment
+- selector.select.<group>: select_for_muscle_group() per muscle group
+- query.filters: query_exercises() over a grid of filter combinations
+- calorie.calculate: calorie_calculator.calculate() over an input grid
+- storage.<op>.<n>: save/load/exists with n saved workouts on disk
+
+Every case reports p50/p95/p99 per call. A second, shorter pass under
+tracemalloc reports the peak and net memory per case. Results can be
+written as JSON and compared against a baseline from an earlier run. The
+exit status is 1 if any case got slower by more than --threshold.
+
+Usage:
+    python -m benchmarks.bench_engines --json results.json
+    python -m benchmarks.bench_engines --save-baseline benchmarks/baseline.json
+    python -m benchmarks.bench_engines --baseline benchmarks/baseline.json
+    python -m benchmarks.bench_engines --quick --only storage
+"""
+
+import argparse
+import gc
+import itertools
+import json
+import platform
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+from benchmarks.stats import summarize
+
+from models import calorie_calculator, exercise_query, workout_storage, workout_suggester
+from models.exercise_data import MUSCLE_GROUPS
+from models.workout_generator import ExerciseSelector
+
+GENDERS = ["male", "female"]
+GOALS = ["strength", "hypertrophy", "endurance", "weight_loss"]
+EXPERIENCES = ["beginner", "intermediate", "advanced"]
+DAYS = [3, 4, 5, 6]
+EQUIPMENT_SETS = [
+    ["bodyweight"],
+    ["dumbbell", "bench"],
+    ["barbell", "dumbbell", "bench", "rack"],
+    ["cable", "machine"],
+    ["barbell", "dumbbell", "cable", "bench", "rack", "machine", "pullup_bar", "barbell_ez"],
+]
+
+STORAGE_SIZES = [1_000, 10_000, 100_000]
+
+# Compared metrics and the default allowed slowdown (25%)
+COMPARED_METRICS = ("p50_ms", "p95_ms")
+DEFAULT_THRESHOLD = 0.25
+
+
+def suggest_inputs():
+    """Every combination of the suggest() input grid."""
+    return [
+        {"gender": g, "goal": goal, "experience": exp, "days_per_week": days, "equipment": eq}
+        for g, goal, exp, days, eq in itertools.product(
+            GENDERS, GOALS, EXPERIENCES, DAYS, EQUIPMENT_SETS
+        )
+    ]
+
+
+def query_inputs():
+    """A grid of query_exercises() filter combinations."""
+    return [
+        {"muscle_group": mg, "equipment": eq, "max_difficulty": diff, "min_tier": tier}
+        for mg, eq, diff, tier in itertools.product(
+            [None] + MUSCLE_GROUPS, [None] + EQUIPMENT_SETS,
+            [None, "easy", "hard"], [None, "A"],
+        )
+    ]
+
+
+def calorie_inputs():
+    """A grid of calorie_calculator.calculate() inputs."""
+    return [
+        {"age": age, "height": height, "weight": weight, "gender": gender,
+         "activity_level": activity, "goal": goal}
+        for age, height, weight, gender, activity, goal in itertools.product(
+            [20, 40, 65], [160, 185], [55, 80, 120], GENDERS,
+            list(calorie_calculator.ACTIVITY_MULTIPLIERS), list(calorie_calculator.GOAL_ADJUSTMENTS),
+        )
+    ]
+
+
+def _calls(func, inputs):
+    """One callable per input."""
+    return [lambda i=i: func(i) for i in inputs]
+
+
+def engine_cases():
+    """Return [(name, calls)] for the in-memory engines."""
+    cases = [("suggest.grid", _calls(workout_suggester.suggest, suggest_inputs()))]
+
+    cases.append(("selector.init", [
+        lambda eq=eq, exp=exp: ExerciseSelector(eq, exp)
+        for exp, eq in itertools.product(EXPERIENCES, EQUIPMENT_SETS)
+    ]))
+
+    for muscle_group in MUSCLE_GROUPS:
+        selectors = [
+            ExerciseSelector(eq + ["bodyweight"], exp)
+            for exp, eq in itertools.product(EXPERIENCES, EQUIPMENT_SETS)
+        ]
+        cases.append((f"selector.select.{muscle_group}", [
+            lambda s=s, mg=muscle_group: s.select_for_muscle_group(mg)
+            for s in selectors
+        ]))
+
+    cases.append(("query.filters", [
+        lambda kwargs=kwargs: exercise_query.query_exercises(**kwargs)
+        for kwargs in query_inputs()
+    ]))
+    cases.append(("calorie.calculate", _calls(calorie_calculator.calculate, calorie_inputs())))
+    return cases
+
+
+def _sample_workout(i):
+    """A small saved-workout payload (real plans would make 100k records huge)."""
+    return {
+        "name": f"Day {i}",
+        "exercises": [
+            {"id": "barbell-bench-press", "sets": 3, "reps": "8-12", "rest": 120},
+            {"id": "lat-pulldown", "sets": 3, "reps": "8-12", "rest": 90},
+        ],
+    }
+
+
+def seed_storage(data_dir, size):
+    """Write `size` saved workouts to data_dir and point workout_storage at it."""
+    workout_storage.DATA_DIR = Path(data_dir)
+    workout_storage._write_all_records([
+        {
+            "name": f"workout-{i}",
+            "saved_at": "2024-01-01T00:00:00",
+            "input_params": {"days_per_week": 3},
+            "workout": _sample_workout(i),
+        }
+        for i in range(size)
+    ])
+
+
+def storage_cases(size, repeat):
+    """Return [(name, calls)] for storage at a given number of saved records."""
+    middle = f"workout-{size // 2}"
+    return [
+        # Overwrites an existing name, so the file size stays constant
+        (f"storage.save.{size}", [
+            lambda: workout_storage.save_workout(middle, _sample_workout(0), {"days_per_week": 3})
+        ] * repeat),
+        (f"storage.load.{size}", [lambda: workout_storage.load_workout(middle)] * repeat),
+        (f"storage.exists_miss.{size}", [
+            lambda: workout_storage.workout_exists("not-saved")
+        ] * repeat),
+    ]
+
+
+def time_calls(calls, rounds):
+    """Time each call `rounds` times; returns a list of durations in seconds."""
+    durations = []
+    perf_counter = time.perf_counter
+    for _ in range(rounds):
+        for call in calls:
+            start = perf_counter()
+            call()
+            durations.append(perf_counter() - start)
+    return durations
+
+
+def measure_memory(calls):
+    """Run the calls once under tracemalloc; returns peak and net KB."""
+    gc.collect()
+    tracemalloc.start()
+    try:
+        before = tracemalloc.get_traced_memory()[0]
+        for call in calls:
+            call()
+        current, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return {"peak_kb": (peak - before) // 1024, "net_kb": (current - before) // 1024}
+
+
+def run_case(name, calls, rounds, warmup=True):
+    """Benchmark one case; returns its result row."""
+    if warmup:
+        for call in calls[:10]:
+            call()
+
+    gc.collect()
+    result = {"case": name, **summarize(time_calls(calls, rounds))}
+    # A short traced pass is enough for memory and keeps the run fast
+    result.update(measure_memory(calls[:50]))
+    return result
+
+
+def run(only=None, quick=False, storage_sizes=STORAGE_SIZES):
+    """Run all (or matching) cases; returns a list of result rows."""
+    rounds = 1 if quick else 3
+    results = []
+
+    for name, calls in engine_cases():
+        if only and not name.startswith(only):
+            continue
+        results.append(run_case(name, calls, rounds))
+        print(_format_row(results[-1]), flush=True)
+
+    original_dir = workout_storage.DATA_DIR
+    try:
+        for size in storage_sizes:
+            cases = [c for c in storage_cases(size, 1) if not only or c[0].startswith(only)]
+            if not cases:
+                continue
+            # Each call reads (and save rewrites) the whole file, so the
+            # number of repeats shrinks as the file grows
+            repeat = max(3, min(50, 200_000 // size)) if not quick else 3
+            with tempfile.TemporaryDirectory() as tmp:
+                seed_storage(tmp, size)
+                for name, calls in storage_cases(size, repeat):
+                    if only and not name.startswith(only):
+                        continue
+                    results.append(run_case(name, calls, 1, warmup=False))
+                    print(_format_row(results[-1]), flush=True)
+    finally:
+        workout_storage.DATA_DIR = original_dir
+
+    return results
+
+
+def compare(results, baseline, threshold=DEFAULT_THRESHOLD):
+    """Compare results with a baseline run.
+
+    Returns:
+        List of (case, metric, baseline_ms, current_ms, ratio) for every
+        compared metric that got slower by more than `threshold`.
+    """
+    base_rows = {row["case"]: row for row in baseline["results"]}
+    regressions = []
+    for row in results:
+        base = base_rows.get(row["case"])
+        if base is None:
+            continue
+        for metric in COMPARED_METRICS:
+            if not base.get(metric):
+                continue
+            ratio = row[metric] / base[metric]
+            if ratio > 1 + threshold:
+                regressions.append((row["case"], metric, base[metric], row[metric], ratio))
+    return regressions
+
+
+def _format_row(r):
+    return (f"{r['case']:<28}{r['n']:>7}{r['p50_ms']:>10.3f}{r['p95_ms']:>10.3f}"
+            f"{r['p99_ms']:>10.3f}{r['peak_kb']:>10}{r['net_kb']:>9}")
+
+
+def _document(results, engine):
+    return {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "engine": engine,
+        "results": results,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--json", help="Write results to this JSON file")
+    parser.add_argument("--baseline", help="Compare against this results file")
+    parser.add_argument("--save-baseline", help="Write results as a new baseline file")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD,
+                        help="Allowed slowdown before a case counts as a regression")
+    parser.add_argument("--only", help="Only run cases whose name starts with this")
+    parser.add_argument("--quick", action="store_true", help="Fewer rounds and repeats")
+    parser.add_argument("--storage-sizes", default=",".join(map(str, STORAGE_SIZES)))
+    parser.add_argument("--engine", choices=sorted(workout_suggester.SELECTOR_ENGINES),
+                        help="Selector engine used by suggest()")
+    args = parser.parse_args(argv)
+
+    if args.engine:
+        workout_suggester.SELECTOR_ENGINE = args.engine
+
+    print(f"{'case':<28}{'n':>7}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}"
+          f"{'peak KB':>10}{'net KB':>9}")
+    sizes = [int(s) for s in args.storage_sizes.split(",") if s]
+    results = run(args.only, args.quick, sizes)
+    document = _document(results, workout_suggester.SELECTOR_ENGINE)
+
+    for path in (args.json, args.save_baseline):
+        if path:
+            with open(path, "w") as f:
+                json.dump(document, f, indent=2)
+
+    if not args.baseline:
+        return 0
+
+    with open(args.baseline) as f:
+        baseline = json.load(f)
+
+    regressions = compare(results, baseline, args.threshold)
+    if not regressions:
+        print(f"\nNo regressions against {args.baseline} (threshold {args.threshold:.0%})")
+        return 0
+
+    print(f"\nRegressions against {args.baseline} (threshold {args.threshold:.0%}):")
+    for case, metric, base_ms, current_ms, ratio in regressions:
+        print(f"  {case:<28}{metric:<8}{base_ms:>10.3f} -> {current_ms:>10.3f} ms  (x{ratio:.2f})")
+    return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,116 @@
+"""Benchmark JSON encoding of the largest API responses.
+
+Compares Flask's default JSON provider (sorted keys) with FastJSONProvider
+(unsorted keys, optional pre-encoded fragments) on:
+- plan: a 5-day suggest() plan
+- plan+fragments: the same plan with progression and every exercise's
+  targets swapped for pre-encoded fragments (the cost of building the
+  substituted copy is included)
+- catalog: the /api/exercises payload
+- catalog+fragment: the same with the exercise list pre-encoded once
+
+Reports microseconds and bytes per response.
+
+Usage:
+    python -m benchmarks.bench_json [--json out.json]
+"""
+
+import argparse
+import json
+import timeit
+
+import benchmarks  # noqa: F401  (puts src/backend on sys.path)
+
+from flask import Flask
+from flask.json.provider import DefaultJSONProvider
+
+from json_provider import FastJSONProvider, encode_fragment
+from models.exercises import get_all_exercises
+from models.workout_suggester import PROGRESSIONS, suggest
+
+PLAN_INPUT = {
+    "gender": "male",
+    "goal": "hypertrophy",
+    "experience": "intermediate",
+    "days_per_week": 5,
+    "equipment": ["barbell", "dumbbell", "cable", "machine"],
+}
+
+
+def _with_plan_fragments(plan, progression_fragments, targets_fragments):
+    """Copy of a plan with progression and targets replaced by fragments."""
+    workouts = []
+    for workout in plan["workouts"]:
+        exercises = []
+        for e in workout["exercises"]:
+            key = tuple(e["targets"])
+            fragment = targets_fragments.get(key)
+            if fragment is None:
+                fragment = targets_fragments[key] = encode_fragment(e["targets"])
+            exercises.append(dict(e, targets=fragment))
+        workouts.append(dict(workout, exercises=exercises))
+    return dict(plan, workouts=workouts,
+                progression=progression_fragments[plan["parameters"]["goal"]])
+
+
+def cases():
+    """Return [(name, provider name, encode callable)]."""
+    app = Flask(__name__)
+    default = DefaultJSONProvider(app)
+    fast = FastJSONProvider(app)
+
+    plan = suggest(PLAN_INPUT)
+    progression_fragments = {goal: encode_fragment(p) for goal, p in PROGRESSIONS.items()}
+    targets_fragments = {}
+
+    exercises = get_all_exercises()
+    catalog = {"count": len(exercises), "exercises": exercises}
+    catalog_fragment = {"count": len(exercises), "exercises": encode_fragment(exercises)}
+
+    # The default provider is compact outside debug mode, as in production
+    compact = {"separators": (",", ":")}
+    return [
+        ("plan", "default", lambda: default.dumps(plan, **compact)),
+        ("plan", "fast", lambda: fast.dumps(plan)),
+        ("plan+fragments", "fast", lambda: fast.dumps(
+            _with_plan_fragments(plan, progression_fragments, targets_fragments))),
+        ("catalog", "default", lambda: default.dumps(catalog, **compact)),
+        ("catalog", "fast", lambda: fast.dumps(catalog)),
+        ("catalog+fragment", "fast", lambda: fast.dumps(catalog_fragment)),
+    ]
+
+
+def run(min_seconds=0.5):
+    """Time each case; returns result rows."""
+    results = []
+    for name, provider, encode in cases():
+        timer = timeit.Timer(encode)
+        number, _ = timer.autorange()
+        number = max(number, int(number * min_seconds / 0.2))
+        best = min(timer.repeat(repeat=5, number=number)) / number
+        results.append({
+            "case": name,
+            "provider": provider,
+            "us": best * 1e6,
+            "bytes": len(encode().encode("utf-8")),
+        })
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--json", help="Write results to this JSON file")
+    args = parser.parse_args(argv)
+
+    results = run()
+    print(f"{'case':<18}{'provider':<10}{'us':>10}{'bytes':>9}")
+    for r in results:
+        print(f"{r['case']:<18}{r['provider']:<10}{r['us']:>10.1f}{r['bytes']:>9}")
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+"""Benchmark saved-workout throughput against the number of shards.
+
+Seeds a data directory with --records saved workouts for each shard count.
+Then --writers threads overwrite existing workouts concurrently (--saves
+each), and the saves per second are reported. Each save rewrites one shard
+file, so its cost shrinks with shard size, and writers to different
+shards don't wait for each other.
+
+Usage:
+    python -m benchmarks.bench_storage_shards [--shards 1,4,16] [--json out.json]
+"""
+
+import argparse
+import json
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+import benchmarks  # noqa: F401  (puts src/backend on sys.path)
+
+from benchmarks.bench_engines import _sample_workout, seed_storage
+from models import workout_storage
+
+
+def run_writers(writers, saves, records):
+    """Run concurrent saves; returns elapsed seconds."""
+    barrier = threading.Barrier(writers + 1)
+
+    def writer(w):
+        barrier.wait()
+        for i in range(saves):
+            name = f"workout-{(w * saves + i) * 7919 % records}"
+            workout_storage.save_workout(name, _sample_workout(i), {"days_per_week": 3})
+
+    threads = [threading.Thread(target=writer, args=(w,)) for w in range(writers)]
+    for t in threads:
+        t.start()
+    barrier.wait()
+    start = time.perf_counter()
+    for t in threads:
+        t.join()
+    return time.perf_counter() - start
+
+
+def run(shard_counts, records, writers, saves):
+    """Returns one result row per shard count."""
+    results = []
+    original_dir = workout_storage.DATA_DIR
+    try:
+        for shards in shard_counts:
+            with tempfile.TemporaryDirectory() as tmp:
+                workout_storage.DATA_DIR = Path(tmp)
+                workout_storage.reshard(shards)
+                seed_storage(tmp, records)
+                elapsed = run_writers(writers, saves, records)
+                results.append({
+                    "shards": shards,
+                    "records": records,
+                    "writers": writers,
+                    "saves_per_second": writers * saves / elapsed,
+                })
+    finally:
+        workout_storage.DATA_DIR = original_dir
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--shards", default="1,4,16")
+    parser.add_argument("--records", type=int, default=10_000)
+    parser.add_argument("--writers", type=int, default=8)
+    parser.add_argument("--saves", type=int, default=25, help="Saves per writer")
+    parser.add_argument("--json", help="Write results to this JSON file")
+    args = parser.parse_args(argv)
+
+    shard_counts = [int(s) for s in args.shards.split(",") if s]
+    results = run(shard_counts, args.records, args.writers, args.saves)
+
+    print(f"{'shards':>6}{'saves/s':>12}")
+    for r in results:
+        print(f"{r['shards']:>6}{r['saves_per_second']:>12.1f}")
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
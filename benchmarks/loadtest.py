@@ -0,0 +1,422 @@
+"""Load-test the Flask API with a configurable traffic mix.
+
+Targets (all offline, no third-party tools):
+- in-process (default): each worker drives the app through its own Flask
+  test client, so no sockets are involved
+- --serve: starts the app on a free localhost port (threaded werkzeug
+  server) and sends real HTTP requests to it
+- --url http://host:port: sends HTTP requests to an already running server
+
+Load models:
+- --concurrency N: N workers, each sending the next request as soon as the
+  previous one completes (closed loop)
+- --rate R: requests are scheduled at R per second, independent of response
+  times (open loop). Latency counts from the scheduled start, so a backlog
+  shows up in the percentiles instead of silently lowering the load.
+
+--serve runs the load generator and the server in one interpreter, so they
+compete for the GIL; for high rates start the server in its own process
+(python start.py or app.run) and use --url.
+
+In-process and --serve runs write calorie/workout logs and saved workouts to
+a temporary directory (or --data-dir), never to the real data directory.
+They also turn the app's rate limiter off, since every worker comes from
+one address and would share one bucket; pass --rate-limit to keep it on.
+
+Usage:
+    python -m benchmarks.loadtest --duration 10 --concurrency 16
+    python -m benchmarks.loadtest --serve --rate 500 --duration 20
+    python -m benchmarks.loadtest --mix suggest=1,load=3 --json results.json
+"""
+
+import argparse
+import http.client
+import json
+import logging
+import random
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+from urllib.parse import urlsplit
+
+from benchmarks.stats import summarize
+
+DEFAULT_MIX = "calorie=20,suggest=15,exercises=10,save=10,load=25,exists=20"
+
+# Saved-workout names used by save/load/exists (load and exists mostly hit)
+NAME_POOL = 50
+
+SUGGEST_INPUTS = [
+    {"gender": g, "goal": goal, "experience": exp, "days_per_week": days, "equipment": eq}
+    for g in ("male", "female")
+    for goal in ("strength", "hypertrophy")
+    for exp in ("beginner", "advanced")
+    for days in (3, 5)
+    for eq in (["dumbbell", "bench"], ["barbell", "dumbbell", "cable", "machine", "bench", "rack"])
+]
+
+SAMPLE_WORKOUT = {
+    "name": "Upper A",
+    "exercises": [
+        {"id": "barbell-bench-press", "sets": 3, "reps": "8-12", "rest": 120},
+        {"id": "lat-pulldown", "sets": 3, "reps": "8-12", "rest": 90},
+    ],
+}
+
+
+def _calorie(rng):
+    return "POST", "/api/calculate-calories", {
+        "age": rng.randint(18, 70), "height": rng.randint(150, 200),
+        "weight": rng.randint(50, 120), "gender": rng.choice(["male", "female"]),
+        "activity_level": rng.choice(["sedentary", "moderate", "active"]),
+        "goal": rng.choice(["lose", "maintain", "gain"]),
+    }
+
+
+def _suggest(rng):
+    return "POST", "/api/suggest-workout", rng.choice(SUGGEST_INPUTS)
+
+
+def _exercises(rng):
+    return "GET", "/api/exercises", None
+
+
+def _save(rng):
+    return "POST", "/api/workouts/save", {
+        "name": f"loadtest-{rng.randrange(NAME_POOL)}",
+        "workout": SAMPLE_WORKOUT,
+        "input_params": {"days_per_week": 3},
+    }
+
+
+def _load(rng):
+    return "GET", f"/api/workouts/load/loadtest-{rng.randrange(NAME_POOL)}", None
+
+
+def _exists(rng):
+    return "GET", f"/api/workouts/exists/loadtest-{rng.randrange(NAME_POOL)}", None
+
+
+REQUEST_BUILDERS = {
+    "calorie": _calorie,
+    "suggest": _suggest,
+    "exercises": _exercises,
+    "save": _save,
+    "load": _load,
+    "exists": _exists,
+}
+
+
+def parse_mix(value):
+    """Parse "name=weight,..." into [(name, weight)]."""
+    mix = []
+    for part in value.split(","):
+        name, _, weight = part.partition("=")
+        name = name.strip()
+        if name not in REQUEST_BUILDERS:
+            raise ValueError(f"Unknown request type: {name}. "
+                             f"Valid options: {', '.join(REQUEST_BUILDERS)}")
+        mix.append((name, float(weight) if weight else 1.0))
+    return mix
+
+
+class InProcessTransport:
+    """Sends requests through a Flask test client (one per worker)."""
+
+    def __init__(self, app):
+        self.client = app.test_client()
+
+    def send(self, method, path, body):
+        response = self.client.open(path, method=method, json=body)
+        response.get_data()
+        return response.status_code
+
+
+class HttpTransport:
+    """Sends requests over a keep-alive HTTP connection (one per worker)."""
+
+    def __init__(self, url):
+        parts = urlsplit(url)
+        self.host, self.port = parts.hostname, parts.port or 80
+        self.connection = None
+
+    def send(self, method, path, body):
+        headers = {}
+        payload = None
+        if body is not None:
+            payload = json.dumps(body).encode("utf-8")
+            headers["Content-Type"] = "application/json"
+
+        for attempt in range(2):
+            if self.connection is None:
+                self.connection = http.client.HTTPConnection(self.host, self.port, timeout=30)
+            try:
+                self.connection.request(method, path, body=payload, headers=headers)
+                response = self.connection.getresponse()
+                response.read()
+                if response.will_close:
+                    self.connection.close()
+                    self.connection = None
+                return response.status
+            except (ConnectionError, http.client.HTTPException):
+                # The server closed an idle keep-alive connection; retry once
+                self.connection.close()
+                self.connection = None
+                if attempt:
+                    raise
+
+
+def _use_data_dir(data_dir):
+    """Point the app's data files at data_dir."""
+    from models import data_collector, workout_storage
+
+    data_collector.DATA_DIR = Path(data_dir)
+    workout_storage.DATA_DIR = Path(data_dir)
+
+
+def start_server(app):
+    """Serve the app on a free localhost port; returns (server, url)."""
+    from werkzeug.serving import make_server
+
+    # Per-request access logs would dominate the run
+    logging.getLogger("werkzeug").setLevel(logging.ERROR)
+    server = make_server("127.0.0.1", 0, app, threaded=True)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    return server, f"http://127.0.0.1:{server.server_port}"
+
+
+# Non-2xx/3xx statuses a request type expects (loads of names never saved)
+EXPECTED_STATUSES = {
+    "load": {404},
+}
+
+
+def is_error(name, status):
+    """Whether a response counts as an error: no response, or a status
+    outside 2xx/3xx that the request type doesn't expect."""
+    if status is None:
+        return True
+    return not 200 <= status < 400 and status not in EXPECTED_STATUSES.get(name, ())
+
+
+class Recorder:
+    """Collects (request type, status, latency) samples from all workers."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.samples = {}
+        self.errors = {}
+        self.statuses = {}
+
+    def add(self, name, status, seconds):
+        with self._lock:
+            self.samples.setdefault(name, []).append(seconds)
+            counts = self.statuses.setdefault(name, {})
+            # No response at all (connection error, exception) is "failed"
+            key = "failed" if status is None else str(status)
+            counts[key] = counts.get(key, 0) + 1
+            if is_error(name, status):
+                self.errors[name] = self.errors.get(name, 0) + 1
+
+
+def _send(transport, recorder, name, rng, scheduled=None):
+    method, path, body = REQUEST_BUILDERS[name](rng)
+    start = time.perf_counter()
+    try:
+        status = transport.send(method, path, body)
+    except Exception:
+        status = None
+    end = time.perf_counter()
+    recorder.add(name, status, end - (scheduled if scheduled is not None else start))
+
+
+def run_closed_loop(make_transport, mix, concurrency, duration, seed=0):
+    """Run `concurrency` workers back-to-back for `duration` seconds."""
+    recorder = Recorder()
+    names = [name for name, _ in mix]
+    weights = [weight for _, weight in mix]
+    deadline = time.perf_counter() + duration
+
+    def worker(index):
+        rng = random.Random(seed + index)
+        transport = make_transport()
+        while time.perf_counter() < deadline:
+            _send(transport, recorder, rng.choices(names, weights)[0], rng)
+
+    _run_workers(worker, concurrency)
+    return recorder
+
+
+def run_open_loop(make_transport, mix, rate, duration, concurrency, seed=0):
+    """Start requests at a fixed arrival rate for `duration` seconds.
+
+    Workers take the next scheduled start time from a shared counter and
+    sleep until it comes; if all workers are busy, requests start late and
+    the wait counts towards their latency.
+    """
+    recorder = Recorder()
+    names = [name for name, _ in mix]
+    weights = [weight for _, weight in mix]
+    total = int(rate * duration)
+    start = time.perf_counter() + 0.05
+    counter = iter(range(total))
+    counter_lock = threading.Lock()
+
+    def worker(index):
+        rng = random.Random(seed + index)
+        transport = make_transport()
+        while True:
+            with counter_lock:
+                i = next(counter, None)
+            if i is None:
+                return
+            scheduled = start + i / rate
+            delay = scheduled - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+            _send(transport, recorder, rng.choices(names, weights)[0], rng, scheduled)
+
+    _run_workers(worker, concurrency)
+    return recorder
+
+
+def _run_workers(worker, count):
+    threads = [threading.Thread(target=worker, args=(i,), daemon=True) for i in range(count)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+
+def prefill(transport):
+    """Save every name in the pool so load/exists requests find them."""
+    rng = random.Random(0)
+    for i in range(NAME_POOL):
+        method, path, body = _save(rng)
+        body["name"] = f"loadtest-{i}"
+        transport.send(method, path, body)
+
+
+def report(recorder, elapsed):
+    """Per-request-type and overall throughput and latency rows."""
+    rows = []
+    all_samples = []
+    all_statuses = {}
+    for name in sorted(recorder.samples):
+        samples = recorder.samples[name]
+        all_samples.extend(samples)
+        statuses = dict(sorted(recorder.statuses.get(name, {}).items()))
+        for status, count in statuses.items():
+            all_statuses[status] = all_statuses.get(status, 0) + count
+        rows.append({
+            "endpoint": name,
+            "rps": len(samples) / elapsed,
+            "errors": recorder.errors.get(name, 0),
+            "statuses": statuses,
+            **summarize(samples),
+        })
+    rows.append({
+        "endpoint": "total",
+        "rps": len(all_samples) / elapsed,
+        "errors": sum(recorder.errors.values()),
+        "statuses": dict(sorted(all_statuses.items())),
+        **summarize(all_samples),
+    })
+    return rows
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    target = parser.add_mutually_exclusive_group()
+    target.add_argument("--url", help="Send HTTP requests to a running server")
+    target.add_argument("--serve", action="store_true",
+                        help="Start the app on a localhost port and load it over HTTP")
+    load = parser.add_mutually_exclusive_group()
+    load.add_argument("--concurrency", type=int, default=8,
+                      help="Closed loop: number of workers (default 8)")
+    load.add_argument("--rate", type=float, help="Open loop: requests per second")
+    parser.add_argument("--workers", type=int, default=64,
+                        help="Open loop: maximum requests in flight (default 64)")
+    parser.add_argument("--duration", type=float, default=10, help="Seconds (default 10)")
+    parser.add_argument("--mix", default=DEFAULT_MIX, help=f"Traffic mix (default {DEFAULT_MIX})")
+    parser.add_argument("--data-dir", help="Data directory for in-process/--serve runs")
+    parser.add_argument("--rate-limit", action="store_true",
+                        help="Keep the app's rate limiter on in in-process/--serve runs")
+    parser.add_argument("--no-prefill", dest="prefill", action="store_false",
+                        help="Don't save the workout name pool before the run")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--json", help="Write results to this JSON file")
+    args = parser.parse_args(argv)
+
+    mix = parse_mix(args.mix)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        server = None
+        if args.url:
+            url = args.url
+        else:
+            _use_data_dir(args.data_dir or tmp)
+            from app import app
+
+            app.config["RATE_LIMIT_ENABLED"] = args.rate_limit
+            if args.serve:
+                server, url = start_server(app)
+
+        if args.url or args.serve:
+            make_transport = lambda: HttpTransport(url)  # noqa: E731
+        else:
+            make_transport = lambda: InProcessTransport(app)  # noqa: E731
+
+        started = None
+        try:
+            if args.prefill:
+                prefill(make_transport())
+            started = time.perf_counter()
+            if args.rate:
+                recorder = run_open_loop(
+                    make_transport, mix, args.rate, args.duration, args.workers, args.seed
+                )
+            else:
+                recorder = run_closed_loop(
+                    make_transport, mix, args.concurrency, args.duration, args.seed
+                )
+        finally:
+            if server is not None:
+                server.shutdown()
+        elapsed = time.perf_counter() - started
+
+    rows = report(recorder, elapsed)
+
+    print(f"{'endpoint':<11}{'count':>8}{'errors':>8}{'rps':>9}"
+          f"{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}{'max ms':>9}")
+    for r in rows:
+        if not r["n"]:
+            continue
+        print(f"{r['endpoint']:<11}{r['n']:>8}{r['errors']:>8}{r['rps']:>9.1f}"
+              f"{r['p50_ms']:>9.2f}{r['p95_ms']:>9.2f}{r['p99_ms']:>9.2f}{r['max_ms']:>9.2f}")
+
+    print("\nstatus codes:")
+    for r in rows:
+        if r["n"]:
+            counts = ", ".join(f"{status}={count}" for status, count in r["statuses"].items())
+            print(f"  {r['endpoint']:<11}{counts}")
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump({
+                "mode": "rate" if args.rate else "concurrency",
+                "rate": args.rate,
+                "concurrency": None if args.rate else args.concurrency,
+                "duration": args.duration,
+                "mix": dict(mix),
+                "results": rows,
+            }, f, indent=2)
+
+    return 1 if rows[-1]["errors"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
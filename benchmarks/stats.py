@@ -0,0 +1,24 @@
+"""Timing statistics shared by the benchmarks."""
+
+
+def percentile(sorted_values, pct):
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return None
+    rank = max(1, -(-len(sorted_values) * pct // 100))  # ceil without floats
+    return sorted_values[int(rank) - 1]
+
+
+def summarize(seconds):
+    """Summarize a list of durations (seconds) in milliseconds."""
+    values = sorted(seconds)
+    if not values:
+        return {"n": 0}
+    return {
+        "n": len(values),
+        "mean_ms": sum(values) / len(values) * 1000,
+        "p50_ms": percentile(values, 50) * 1000,
+        "p95_ms": percentile(values, 95) * 1000,
+        "p99_ms": percentile(values, 99) * 1000,
+        "max_ms": values[-1] * 1000,
+    }
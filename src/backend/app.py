@@ -1,13 +1,148 @@
 """FitMentor V2 Backend - Flask API Server."""
 
-from flask import Flask, request, jsonify
+import time
+
+from flask import Flask, Response, g, request, jsonify
 
 from urllib.parse import unquote
 
+import middleware
+import ratelimit
+import serving
+from json_provider import FastJSONProvider, encode_fragment
 from models import calorie_calculator, workout_suggester, data_collector, workout_storage
-from models.exercises import get_all_exercises
+from models import exercise_query, metrics, profiler, warmup
+from models.catalog import get_catalog
+from models.exercises import (
+    get_all_exercises, get_exercises_by_ids, resolve_exercise_id, EXERCISE_FIELDS,
+)
+from models.substitutes import get_substitute_nodes, get_day_substitutes
 
 app = Flask(__name__)
+app.json = FastJSONProvider(app)
+app.config["PROFILING_ENABLED"] = profiler.PROFILING_ENABLED
+
+_suggest_flight = serving.SingleFlight("suggest-workout")
+# Plan generation is CPU-bound; bound it so bursts get a fast 503
+_plan_admission = serving.AdmissionControl(
+    "plan-generation", serving.SUGGEST_CONCURRENCY,
+    serving.SUGGEST_QUEUE, serving.SUGGEST_QUEUE_TIMEOUT,
+)
+
+
+def _generate_plan(func, *args):
+    """Run a plan-generation call under admission control."""
+    with _plan_admission.admit():
+        return serving.run_cpu(func, *args)
+
+REQUEST_SECONDS = metrics.Histogram(
+    "fitmentor_http_request_duration_seconds",
+    "HTTP request latency",
+    ["method", "endpoint"],
+)
+REQUESTS_IN_FLIGHT = metrics.Gauge(
+    "fitmentor_http_requests_in_flight",
+    "HTTP requests currently being served",
+    ["endpoint"],
+)
+RESPONSES = metrics.Counter(
+    "fitmentor_http_responses_total",
+    "HTTP responses by status code",
+    ["method", "endpoint", "status"],
+)
+REQUEST_BYTES = metrics.Histogram(
+    "fitmentor_http_request_size_bytes",
+    "HTTP request body size",
+    ["endpoint"],
+    buckets=metrics.SIZE_BUCKETS,
+)
+RESPONSE_BYTES = metrics.Histogram(
+    "fitmentor_http_response_size_bytes",
+    "HTTP response body size",
+    ["endpoint"],
+    buckets=metrics.SIZE_BUCKETS,
+)
+# Latency of the most recent requests, for /readyz
+RECENT_REQUEST_SECONDS = metrics.RecentSamples()
+
+
+def _endpoint_label():
+    """Route template of the current request (bounded label cardinality)."""
+    return request.url_rule.rule if request.url_rule else "<unmatched>"
+
+
+@app.before_request
+def start_request_metrics():
+    """Start the request timer and count the request as in flight."""
+    g.metrics_endpoint = _endpoint_label()
+    g.metrics_start = time.perf_counter()
+    REQUESTS_IN_FLIGHT.inc(endpoint=g.metrics_endpoint)
+
+
+@app.after_request
+def record_request_metrics(response):
+    """Record latency, status and payload sizes of the request."""
+    start = g.get("metrics_start")
+    if start is None:
+        return response
+
+    endpoint = g.metrics_endpoint
+    elapsed = time.perf_counter() - start
+    REQUEST_SECONDS.observe(elapsed, method=request.method, endpoint=endpoint)
+    if endpoint not in PROBE_ENDPOINTS:
+        RECENT_REQUEST_SECONDS.observe(elapsed)
+    RESPONSES.inc(method=request.method, endpoint=endpoint, status=response.status_code)
+    if request.content_length is not None:
+        REQUEST_BYTES.observe(request.content_length, endpoint=endpoint)
+    response_length = response.calculate_content_length()
+    if response_length is not None:
+        RESPONSE_BYTES.observe(response_length, endpoint=endpoint)
+    return response
+
+
+@app.teardown_request
+def finish_request_metrics(exc):
+    """Count the request as no longer in flight (also runs on errors)."""
+    if g.get("metrics_start") is not None:
+        REQUESTS_IN_FLIGHT.dec(endpoint=g.metrics_endpoint)
+
+
+# Registered after the metrics hooks so response sizes are measured compressed
+middleware.init_app(app)
+# Registered after the metrics hooks so 429s are counted too
+ratelimit.init_app(app)
+
+
+@app.before_request
+def start_request_profile():
+    """Profile this request with cProfile if it asks for it (X-Profile: 1)."""
+    if app.config["PROFILING_ENABLED"] and request.headers.get("X-Profile") == "1":
+        try:
+            g.profile = profiler.start_profile()
+        except ValueError:
+            pass  # Another profiler is already active in this thread
+
+
+@app.after_request
+def return_request_profile(response):
+    """Replace the body of a profiled request with its cProfile summary."""
+    profile = g.pop("profile", None)
+    if profile is None:
+        return response
+
+    g.pop("etag", None)  # The body is no longer the tagged response
+    response.set_data(profiler.summarize(profile))
+    response.content_type = "text/plain; charset=utf-8"
+    response.headers["X-Profile"] = "cprofile"
+    return response
+
+
+@app.teardown_request
+def stop_request_profile(exc):
+    """Make sure a profile never outlives its request (e.g. on errors)."""
+    profile = g.pop("profile", None)
+    if profile is not None:
+        profile.disable()
 
 
 @app.after_request
@@ -15,12 +150,23 @@ def add_cors_headers(response):
     """Add CORS headers to all responses."""
     response.headers["Access-Control-Allow-Origin"] = "*"
     response.headers["Access-Control-Allow-Methods"] = "GET, POST, OPTIONS"
-    response.headers["Access-Control-Allow-Headers"] = "Content-Type"
+    response.headers["Access-Control-Allow-Headers"] = "Content-Type, X-Profile, X-API-Key"
+    response.headers["Access-Control-Expose-Headers"] = (
+        "RateLimit-Limit, RateLimit-Remaining, RateLimit-Reset, Retry-After"
+    )
     return response
 
 VERSION = "2.0.0"
 
 
+def _revalidate(*key):
+    """ETag the response from the values that determine it.
+
+    Returns a 304 response if the client already has it, else None.
+    """
+    return middleware.revalidate(VERSION, *key)
+
+
 @app.route("/")
 def index():
     """Return API info and version."""
@@ -31,8 +177,16 @@ def index():
             {"method": "GET", "path": "/", "description": "API info"},
             {"method": "POST", "path": "/api/calculate-calories", "description": "Calculate calories and macros"},
             {"method": "POST", "path": "/api/suggest-workout", "description": "Generate workout plan"},
+            {"method": "POST", "path": "/api/suggest-workout/day", "description": "Regenerate one workout day"},
             {"method": "GET", "path": "/api/exercises", "description": "Get exercise database"},
+            {"method": "POST", "path": "/api/exercises/lookup", "description": "Get exercises by ID"},
+            {"method": "GET", "path": "/api/exercises/<id>/substitutes", "description": "Get swap alternatives"},
+            {"method": "POST", "path": "/api/exercises/swap", "description": "Get swap alternatives for a workout day"},
             {"method": "GET", "path": "/api/stats", "description": "Get data collection stats"},
+            {"method": "GET", "path": "/metrics", "description": "Prometheus metrics"},
+            {"method": "GET", "path": "/healthz", "description": "Liveness probe"},
+            {"method": "GET", "path": "/readyz", "description": "Readiness probe with cache and storage state"},
+            {"method": "GET", "path": "/api/debug/profile", "description": "Sample stacks (collapsed format)"},
             {"method": "POST", "path": "/api/workouts/save", "description": "Save a workout"},
             {"method": "GET", "path": "/api/workouts/load/<name>", "description": "Load a saved workout"},
             {"method": "GET", "path": "/api/workouts/exists/<name>", "description": "Check if workout exists"},
@@ -48,9 +202,13 @@ def calculate_calories():
 
     data = request.get_json()
 
+    not_modified = _revalidate("calculate-calories", data)
+    if not_modified:
+        return not_modified
+
     try:
         result = calorie_calculator.calculate(data)
-        data_collector.log_calorie_calculation(data, result)
+        serving.submit_io(data_collector.log_calorie_calculation, data, result)
         return jsonify(result)
     except calorie_calculator.ValidationError as e:
         return jsonify({"error": str(e)}), 400
@@ -65,30 +223,308 @@ def suggest_workout():
     data = request.get_json()
 
     try:
-        result = workout_suggester.suggest(data)
-        data_collector.log_workout_plan(data, result)
+        workout_suggester.validate_input(data)
+        not_modified = _revalidate(
+            "suggest-workout", workout_suggester.input_key(data), get_catalog().fingerprint
+        )
+        if not_modified:
+            return not_modified
+
+        # Identical concurrent requests share one computation
+        result = _suggest_flight.do(
+            (workout_suggester.input_key(data), get_catalog().fingerprint),
+            _generate_plan, workout_suggester.suggest, data,
+        )
+        serving.submit_io(data_collector.log_workout_plan, data, result)
         return jsonify(result)
     except workout_suggester.ValidationError as e:
         return jsonify({"error": str(e)}), 400
 
 
+@app.route("/api/suggest-workout/day", methods=["POST"])
+def suggest_workout_day():
+    """Regenerate a single day of a workout plan."""
+    if not request.is_json:
+        return jsonify({"error": "Request must be JSON"}), 400
+
+    data = request.get_json()
+
+    if "day_index" not in data:
+        return jsonify({"error": "Missing required field: day_index"}), 400
+
+    try:
+        workout_suggester.validate_input(data)
+        not_modified = _revalidate(
+            "suggest-workout/day", workout_suggester.input_key(data), data["day_index"],
+            data.get("exclude_exercise_ids"), get_catalog().fingerprint,
+        )
+        if not_modified:
+            return not_modified
+
+        workout = _generate_plan(
+            workout_suggester.suggest_day,
+            data, data["day_index"], data.get("exclude_exercise_ids"),
+        )
+        return jsonify({"day_index": data["day_index"], "workout": workout})
+    except workout_suggester.ValidationError as e:
+        return jsonify({"error": str(e)}), 400
+
+
+def _encode_exercises(catalog):
+    """Return (count, pre-encoded exercise list) for a catalog snapshot."""
+    exercises = get_all_exercises(catalog)
+    return len(exercises), encode_fragment(exercises)
+
+
 @app.route("/api/exercises", methods=["GET"])
 def get_exercises():
     """Return the complete exercise database."""
-    exercises = get_all_exercises()
+    catalog = get_catalog()
+    not_modified = _revalidate("exercises", catalog.fingerprint)
+    if not_modified:
+        return not_modified
+
+    # The exercise list is encoded once per catalog version
+    count, exercises = catalog.derived("exercises.json", _encode_exercises)
+    return jsonify({
+        "count": count,
+        "exercises": exercises,
+    })
+
+
+MAX_LOOKUP_IDS = 500
+
+
+@app.route("/api/exercises/lookup", methods=["POST"])
+def lookup_exercises():
+    """Return exercises for a mixed list of new string and legacy integer IDs."""
+    if not request.is_json:
+        return jsonify({"error": "Request must be JSON"}), 400
+
+    data = request.get_json()
+    if not isinstance(data, dict):
+        return jsonify({"error": "Request body must be a JSON object"}), 400
+
+    ids = data.get("ids")
+    fields = data.get("fields")
+
+    if not isinstance(ids, list):
+        return jsonify({"error": "ids must be a list"}), 400
+
+    if len(ids) > MAX_LOOKUP_IDS:
+        return jsonify({"error": f"ids must contain at most {MAX_LOOKUP_IDS} items"}), 400
+
+    if any(isinstance(i, bool) or not isinstance(i, (str, int)) for i in ids):
+        return jsonify({"error": "ids must be strings or integers"}), 400
+
+    if fields is not None:
+        if not isinstance(fields, list):
+            return jsonify({"error": "fields must be a list"}), 400
+        invalid_fields = [f for f in fields if f not in EXERCISE_FIELDS]
+        if invalid_fields:
+            return jsonify({
+                "error": f"Invalid fields: {', '.join(map(str, invalid_fields))}. "
+                         f"Valid options: {', '.join(EXERCISE_FIELDS)}"
+            }), 400
+
+    catalog = get_catalog()
+    not_modified = _revalidate("lookup", ids, fields, catalog.fingerprint)
+    if not_modified:
+        return not_modified
+
+    exercises, resolved_ids, not_found = get_exercises_by_ids(ids, fields, catalog)
     return jsonify({
         "count": len(exercises),
         "exercises": exercises,
+        "resolved_ids": {str(k): v for k, v in resolved_ids.items()},
+        "not_found": not_found,
+    })
+
+
+def _parse_equipment_param(value):
+    """Parse a comma-separated equipment query parameter.
+
+    Bodyweight is always available, matching plan generation.
+    Returns None when no equipment filter was given.
+    """
+    if not value:
+        return None
+
+    equipment = [eq.strip().lower() for eq in value.split(",") if eq.strip()]
+    exercise_query.validate_equipment(equipment)
+
+    if "bodyweight" not in equipment:
+        equipment.append("bodyweight")
+    return equipment
+
+
+@app.route("/api/exercises/<exercise_id>/substitutes", methods=["GET"])
+def get_exercise_substitutes(exercise_id):
+    """Return tier-ordered alternatives for an exercise."""
+    # Legacy integer IDs arrive as digit strings in the URL
+    lookup_id = int(exercise_id) if exercise_id.isdigit() else exercise_id
+    catalog = get_catalog()
+    resolved_id = resolve_exercise_id(lookup_id, catalog)
+
+    if not resolved_id:
+        return jsonify({"error": "No exercise found with that ID"}), 404
+
+    try:
+        equipment = _parse_equipment_param(request.args.get("equipment"))
+    except exercise_query.ValidationError as e:
+        return jsonify({"error": str(e)}), 400
+
+    not_modified = _revalidate("substitutes", resolved_id, equipment, catalog.fingerprint)
+    if not_modified:
+        return not_modified
+
+    substitutes = get_substitute_nodes(resolved_id, equipment, catalog)
+    return jsonify({
+        "exercise_id": resolved_id,
+        "count": len(substitutes),
+        "substitutes": substitutes,
+    })
+
+
+@app.route("/api/exercises/swap", methods=["POST"])
+def swap_exercise():
+    """Return ranked swaps that keep a workout day free of pattern redundancy."""
+    if not request.is_json:
+        return jsonify({"error": "Request must be JSON"}), 400
+
+    data = request.get_json()
+    if not isinstance(data, dict):
+        return jsonify({"error": "Request body must be a JSON object"}), 400
+
+    exercise_id = data.get("exercise_id")
+    day_exercise_ids = data.get("day_exercise_ids", [])
+    equipment = data.get("equipment")
+
+    if not exercise_id:
+        return jsonify({"error": "exercise_id is required"}), 400
+
+    if not isinstance(day_exercise_ids, list):
+        return jsonify({"error": "day_exercise_ids must be a list"}), 400
+
+    if equipment is not None:
+        if not isinstance(equipment, list):
+            return jsonify({"error": "equipment must be a list"}), 400
+        try:
+            equipment = _parse_equipment_param(",".join(map(str, equipment)))
+        except exercise_query.ValidationError as e:
+            return jsonify({"error": str(e)}), 400
+
+    # Resolve everything against one catalog snapshot
+    catalog = get_catalog()
+    resolved_id = resolve_exercise_id(exercise_id, catalog)
+    if not resolved_id:
+        return jsonify({"error": "No exercise found with that ID"}), 404
+
+    not_modified = _revalidate(
+        "swap", resolved_id, day_exercise_ids, equipment, catalog.fingerprint
+    )
+    if not_modified:
+        return not_modified
+
+    day_ids = [resolve_exercise_id(i, catalog) for i in day_exercise_ids]
+    substitutes = get_day_substitutes(
+        resolved_id, [i for i in day_ids if i], equipment, catalog
+    )
+    return jsonify({
+        "exercise_id": resolved_id,
+        "count": len(substitutes),
+        "substitutes": substitutes,
     })
 
 
 @app.route("/api/stats", methods=["GET"])
 def get_stats():
     """Return data collection statistics."""
-    stats = data_collector.get_stats()
+    stats = serving.run_io(data_collector.get_stats)
     return jsonify(stats)
 
 
+# Liveness/readiness probes, left out of the recent-latency window
+PROBE_ENDPOINTS = {"/healthz", "/readyz"}
+
+
+@app.route("/healthz", methods=["GET"])
+def healthz():
+    """Liveness: the process is up and serving requests."""
+    return jsonify({"status": "ok"})
+
+
+@app.route("/readyz", methods=["GET"])
+def readyz():
+    """Readiness: caches are warm and storage is usable.
+
+    Returns 200 when this worker should get traffic, 503 otherwise. Both
+    include the catalog version, cache fill levels, work queue depths,
+    storage state and recent latency percentiles.
+    """
+    catalog = get_catalog()
+    warm = warmup.status()
+    storage = workout_storage.storage_health()
+
+    # An idle warm-up was never started; a failed one leaves caches cold
+    # but the worker still works
+    warming = warm["status"] in ("pending", "running")
+    ready = not warming and storage["ok"]
+
+    latency = RECENT_REQUEST_SECONDS.percentiles()
+    body = {
+        "status": "ready" if ready else ("warming" if warming else "unavailable"),
+        "catalog": {
+            "version": catalog.version,
+            "fingerprint": catalog.fingerprint[:12],
+            "exercises": len(catalog.exercises),
+        },
+        "warmup": warm,
+        "caches": {
+            "plan_contexts": workout_suggester.plan_context_cache_info(),
+            "catalog_indexes": catalog.derived_names(),
+        },
+        "io_queue": {
+            "depth": serving.io_queue_depth(),
+            "limit": serving.IO_WORKERS + serving.IO_QUEUE,
+        },
+        "plan_generation": _plan_admission.info(),
+        "storage": storage,
+        "latency_ms": {
+            name: (round(value * 1000, 2) if value is not None and name != "count" else value)
+            for name, value in latency.items()
+        },
+    }
+    return jsonify(body), 200 if ready else 503
+
+
+@app.route("/metrics", methods=["GET"])
+def get_metrics():
+    """Return request and internal metrics in Prometheus text format."""
+    return Response(metrics.render(), content_type=metrics.CONTENT_TYPE)
+
+
+@app.route("/api/debug/profile", methods=["GET"])
+def sample_profile():
+    """Sample all threads for a few seconds and return collapsed stacks.
+
+    Query parameters: seconds (default 5) and interval (default 0.005).
+    """
+    if not app.config["PROFILING_ENABLED"]:
+        return jsonify({"error": "Profiling is disabled"}), 404
+
+    try:
+        stacks = profiler.record(request.args.get("seconds"), request.args.get("interval"))
+    except profiler.ValidationError as e:
+        return jsonify({"error": str(e)}), 400
+    except profiler.ProfilerBusy as e:
+        response = jsonify({"error": str(e)})
+        response.headers["Retry-After"] = str(max(1, round(e.retry_after)))
+        return response, 429
+
+    return Response(stacks, content_type="text/plain; charset=utf-8")
+
+
 @app.route("/api/workouts/save", methods=["POST"])
 def save_workout():
     """Save a workout with a user-chosen name."""
@@ -107,7 +543,7 @@ def save_workout():
     if not workout:
         return jsonify({"success": False, "error": "Workout data is required"}), 400
 
-    result = workout_storage.save_workout(name, workout, input_params)
+    result = serving.run_io(workout_storage.save_workout, name, workout, input_params)
 
     if not result.get("success"):
         return jsonify(result), 400
@@ -120,7 +556,7 @@ def load_workout(name):
     """Load a saved workout by name."""
     name = unquote(name)
 
-    result = workout_storage.load_workout(name)
+    result = serving.run_io(workout_storage.load_workout, name)
 
     if not result:
         return jsonify({"success": False, "error": "No workout found with that name"}), 404
@@ -133,10 +569,18 @@ def workout_exists(name):
     """Check if a workout with the given name exists."""
     name = unquote(name)
 
-    result = workout_storage.workout_exists(name)
+    result = serving.run_io(workout_storage.workout_exists, name)
     return jsonify(result)
 
 
+@app.errorhandler(serving.Overloaded)
+def overloaded(e):
+    """Ask clients to back off when a work queue is full or too slow."""
+    response = jsonify({"error": "Server busy, please retry"})
+    response.headers["Retry-After"] = str(e.retry_after)
+    return response, 503
+
+
 @app.errorhandler(400)
 def bad_request(e):
     """Handle 400 errors."""
@@ -155,5 +599,17 @@ def server_error(e):
     return jsonify({"error": "Internal server error"}), 500
 
 
+def start_warmup():
+    """Warm the caches from the request logs on a background thread.
+
+    Call once per server process before serving (WSGI servers: once per
+    worker).
+    """
+    return warmup.start(
+        extra=[lambda catalog: catalog.derived("exercises.json", _encode_exercises)]
+    )
+
+
 if __name__ == "__main__":
+    start_warmup()
     app.run(host="0.0.0.0", port=5000, debug=True)
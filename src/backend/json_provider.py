@@ -0,0 +1,60 @@
+"""Fast JSON encoding for API responses.
+
+FastJSONProvider replaces Flask's default provider. It always uses compact
+separators and doesn't sort keys, since responses are built in a stable
+order already. It can also splice in pre-encoded JSONFragment values. Large
+static sub-objects are encoded once, and the encoder copies them into the
+output instead of re-encoding them on every response.
+
+A JSONFragment is encoded to a unique placeholder string. The placeholders
+are replaced by the fragments' text after encoding, so the C encoder still
+does all the work for the rest of the object.
+"""
+
+import json
+import re
+import secrets
+
+from flask.json.provider import DefaultJSONProvider
+
+# Random per process, so request data can never forge a placeholder
+_MARKER = f"__fragment_{secrets.token_hex(8)}_"
+_PLACEHOLDER = re.compile(rf'"{_MARKER}(\d+)"')
+
+
+class JSONFragment:
+    """Already-encoded JSON, inserted verbatim by FastJSONProvider."""
+
+    __slots__ = ("text",)
+
+    def __init__(self, text):
+        self.text = text
+
+
+def encode_fragment(value):
+    """Encode a value once, for reuse in many responses."""
+    return JSONFragment(json.dumps(value, separators=(",", ":")))
+
+
+class FastJSONProvider(DefaultJSONProvider):
+    """Compact, unsorted JSON with support for pre-encoded fragments."""
+
+    sort_keys = False
+    compact = True
+
+    def dumps(self, obj, **kwargs):
+        fragments = []
+
+        def default(o):
+            if isinstance(o, JSONFragment):
+                fragments.append(o.text)
+                return f"{_MARKER}{len(fragments) - 1}"
+            return self.default(o)
+
+        kwargs["default"] = default
+        kwargs.setdefault("separators", (",", ":"))
+        text = super().dumps(obj, **kwargs)
+
+        if not fragments:
+            return text
+        return _PLACEHOLDER.sub(lambda m: fragments[int(m.group(1))], text)
@@ -0,0 +1,94 @@
+"""HTTP response middleware: compression and conditional requests.
+
+Compression: responses of a compressible type above a size threshold are
+compressed with gzip or deflate, whichever the client's Accept-Encoding
+prefers. Brotli isn't offered, since it would need a third-party package.
+
+Conditional requests: deterministic endpoints call revalidate() with the
+values that fully determine their response (canonical input plus catalog
+fingerprint). That gives a weak ETag without building the response. If the
+client already holds it (If-None-Match), the endpoint returns the 304 from
+revalidate() and skips the work.
+
+Configuration (app.config):
+    COMPRESS_MIN_BYTES: smallest body that gets compressed (default 1024)
+    COMPRESS_LEVEL: zlib compression level (default 6)
+"""
+
+import gzip
+import zlib
+
+from flask import Response, current_app, g, request
+
+from models.canonical import content_hash
+
+COMPRESSIBLE_TYPES = {"application/json", "text/plain", "text/html", "text/css",
+                      "application/javascript"}
+ENCODINGS = ["gzip", "deflate"]
+
+
+def _compress(data, encoding, level):
+    if encoding == "gzip":
+        # mtime=0 keeps the output byte-for-byte reproducible
+        return gzip.compress(data, compresslevel=level, mtime=0)
+    # HTTP "deflate" is the zlib format
+    return zlib.compress(data, level)
+
+
+def compress_response(response):
+    """Compress a response body if the client accepts it and it's worth it."""
+    if (response.direct_passthrough or response.is_streamed
+            or response.status_code < 200 or response.status_code in (204, 304)
+            or "Content-Encoding" in response.headers
+            or response.mimetype not in COMPRESSIBLE_TYPES):
+        return response
+
+    response.vary.add("Accept-Encoding")
+
+    encoding = request.accept_encodings.best_match(ENCODINGS)
+    if encoding is None:
+        return response
+
+    data = response.get_data()
+    if len(data) < current_app.config["COMPRESS_MIN_BYTES"]:
+        return response
+
+    response.set_data(_compress(data, encoding, current_app.config["COMPRESS_LEVEL"]))
+    response.headers["Content-Encoding"] = encoding
+    return response
+
+
+def etag_for(*parts):
+    """Return an (unquoted) ETag value for JSON-serializable parts."""
+    return content_hash(list(parts))[:32]
+
+
+def revalidate(*parts):
+    """Tag the current response with an ETag derived from parts.
+
+    Returns:
+        A 304 response if the client already has this version, else None
+    """
+    g.etag = etag_for(*parts)
+    if request.if_none_match.contains_weak(g.etag):
+        return Response(status=304)
+    return None
+
+
+def add_etag(response):
+    """Attach the ETag set by revalidate() to a successful response."""
+    etag = g.get("etag")
+    if etag is not None and response.status_code in (200, 304):
+        response.set_etag(etag, weak=True)
+        # Clients may store the response but must revalidate before reuse
+        response.headers["Cache-Control"] = "no-cache"
+    return response
+
+
+def init_app(app):
+    """Register the middleware on an app."""
+    app.config.setdefault("COMPRESS_MIN_BYTES", 1024)
+    app.config.setdefault("COMPRESS_LEVEL", 6)
+    # after_request hooks run in reverse order: ETag first, then compression
+    app.after_request(compress_response)
+    app.after_request(add_etag)
@@ -0,0 +1,29 @@
+"""Canonical JSON encoding and content hashing.
+
+Canonical encoding sorts keys and uses compact separators so equal values
+always produce identical bytes, regardless of dict insertion order.
+
+Equal values only give equal bytes if the values themselves don't depend on
+set iteration order, which changes between processes with hash
+randomization. Code that builds API output from sets sorts them (or keeps
+declaration order) first. tests/test_determinism.py checks suggest()
+under several PYTHONHASHSEED values.
+"""
+
+import hashlib
+import json
+
+
+def canonical_json(value):
+    """Return the canonical JSON string for a JSON-serializable value."""
+    return json.dumps(value, sort_keys=True, separators=(",", ":"), ensure_ascii=True)
+
+
+def canonical_bytes(value):
+    """Return the canonical JSON encoding of a value as bytes."""
+    return canonical_json(value).encode("utf-8")
+
+
+def content_hash(value):
+    """Return a stable SHA-256 hex digest of a value's canonical JSON."""
+    return hashlib.sha256(canonical_bytes(value)).hexdigest()
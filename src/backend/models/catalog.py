@@ -0,0 +1,280 @@
+"""Versioned, hot-reloadable view of the exercise catalog.
+
+The live catalog is an immutable CatalogSnapshot (exercises plus movement
+patterns) with a version number. get_catalog() returns the current snapshot
+without taking a lock. Every few seconds one caller also stats the source
+files (exercise_data/*.py, movement_patterns.py, or the external catalog
+file). If any of them changed, it builds a new snapshot from fresh copies of
+those files and swaps it in atomically.
+
+Work that started on a snapshot keeps using it, and new work picks up the
+new one. Derived indexes (id tables, the substitute graph, ...) are stored on
+the snapshot with CatalogSnapshot.derived(), and caches that hold plans or
+selectors key on snapshot.version, so nothing derived from an old catalog
+leaks into a new one.
+
+Configuration:
+    FITMENTOR_CATALOG_POLL_SECONDS: seconds between change checks
+                                    (default 2, 0 disables hot reload)
+"""
+
+import logging
+import os
+import runpy
+import threading
+import time
+from pathlib import Path
+from types import MappingProxyType
+
+from . import exercise_data
+from .canonical import content_hash
+from .movement_patterns import EXERCISE_TO_PATTERN
+
+logger = logging.getLogger(__name__)
+
+MODELS_DIR = Path(__file__).parent
+MOVEMENT_PATTERNS_FILE = MODELS_DIR / "movement_patterns.py"
+
+# Built-in data files and the list each one defines, in catalog order
+BUILTIN_DATA_FILES = [
+    (MODELS_DIR / "exercise_data" / "chest.py", "CHEST_EXERCISES"),
+    (MODELS_DIR / "exercise_data" / "arms.py", "ARM_EXERCISES"),
+    (MODELS_DIR / "exercise_data" / "shoulders.py", "SHOULDER_EXERCISES"),
+    (MODELS_DIR / "exercise_data" / "back.py", "BACK_EXERCISES"),
+    (MODELS_DIR / "exercise_data" / "legs.py", "LEG_EXERCISES"),
+]
+
+POLL_SECONDS = float(os.environ.get("FITMENTOR_CATALOG_POLL_SECONDS", "2"))
+
+
+class CatalogSnapshot:
+    """An immutable catalog version: exercises, patterns and derived indexes.
+
+    A snapshot built with from_file() parses the file's muscle groups on
+    demand: group() only reads its own group, and exercises, by_id and
+    patterns read the whole file the first time they're used.
+    """
+
+    def __init__(self, version, exercises, patterns):
+        self.version = version
+        self._file = None
+        self._exercises = tuple(exercises)
+        self._base_patterns = dict(patterns)
+        self._by_id = None
+        self._patterns = None
+        self._groups = {}
+        self._derived = {}
+        # Reentrant: builders may use other derived indexes
+        self._derived_lock = threading.RLock()
+
+    @classmethod
+    def from_file(cls, version, catalog_file, patterns):
+        """Snapshot of an ExerciseCatalogFile; patterns stored in the file
+        take precedence over the given ones."""
+        snapshot = cls(version, (), patterns)
+        snapshot._file = catalog_file
+        snapshot._exercises = None
+        return snapshot
+
+    @property
+    def exercises(self):
+        """All exercises, in catalog order."""
+        if self._exercises is None:
+            with self._derived_lock:
+                if self._exercises is None:
+                    self._exercises = tuple(self._file.all())
+        return self._exercises
+
+    @property
+    def by_id(self):
+        """Read-only {exercise id: exercise}."""
+        if self._by_id is None:
+            with self._derived_lock:
+                if self._by_id is None:
+                    self._by_id = MappingProxyType({e["id"]: e for e in self.exercises})
+        return self._by_id
+
+    @property
+    def patterns(self):
+        """Read-only {exercise id: movement pattern}."""
+        if self._patterns is None:
+            with self._derived_lock:
+                if self._patterns is None:
+                    patterns = dict(self._base_patterns)
+                    if self._file is not None:
+                        patterns.update(self._file.patterns())
+                    self._patterns = MappingProxyType(patterns)
+        return self._patterns
+
+    def group(self, muscle_group):
+        """Return the exercises of one muscle group, in catalog order."""
+        exercises = self._groups.get(muscle_group)
+        if exercises is None:
+            with self._derived_lock:
+                exercises = self._groups.get(muscle_group)
+                if exercises is None:
+                    if self._file is not None and self._exercises is None:
+                        exercises = tuple(self._file.group(muscle_group))
+                    else:
+                        exercises = tuple(
+                            e for e in self.exercises if e["muscle_group"] == muscle_group
+                        )
+                    self._groups[muscle_group] = exercises
+        return exercises
+
+    def get_exercise(self, exercise_id):
+        """Return an exercise by ID (string slug), or None."""
+        return self.by_id.get(exercise_id)
+
+    def pattern_of(self, exercise_id):
+        """Return an exercise's movement pattern, or None."""
+        return self.patterns.get(exercise_id)
+
+    @property
+    def fingerprint(self):
+        """Content hash of the catalog, stable across processes and reloads."""
+        return self.derived(
+            "fingerprint",
+            lambda s: content_hash([list(s.exercises), dict(s.patterns)]),
+        )
+
+    def derived_names(self):
+        """Names of the derived indexes built so far."""
+        with self._derived_lock:
+            return sorted(self._derived)
+
+    def derived(self, name, builder):
+        """Return a derived index for this snapshot, building it on first use.
+
+        Args:
+            name: Unique name of the index
+            builder: Callable taking the snapshot and returning the index
+        """
+        try:
+            return self._derived[name]
+        except KeyError:
+            pass
+
+        with self._derived_lock:
+            if name not in self._derived:
+                self._derived[name] = builder(self)
+            return self._derived[name]
+
+
+def _source_files():
+    """Return the files the catalog is built from."""
+    if exercise_data.CATALOG_PATH:
+        return [Path(exercise_data.CATALOG_PATH), MOVEMENT_PATTERNS_FILE]
+    return [path for path, _ in BUILTIN_DATA_FILES] + [MOVEMENT_PATTERNS_FILE]
+
+
+def _signature(paths):
+    """Cheap change detector: (mtime_ns, size) of each source file."""
+    signature = []
+    for path in paths:
+        try:
+            st = os.stat(path)
+            signature.append((st.st_mtime_ns, st.st_size))
+        except OSError:
+            signature.append(None)
+    return tuple(signature)
+
+
+def _load_sources():
+    """Read fresh copies of the catalog sources.
+
+    Returns (exercises, patterns). Data modules are executed from their
+    files rather than re-imported, so the imported modules are untouched.
+    """
+    patterns = dict(runpy.run_path(str(MOVEMENT_PATTERNS_FILE))["EXERCISE_TO_PATTERN"])
+
+    if exercise_data.CATALOG_PATH:
+        from .exercise_data.loader import ExerciseCatalogFile
+
+        exercises = ExerciseCatalogFile(exercise_data.CATALOG_PATH).all()
+        for e in exercises:
+            if e.get("movement_pattern"):
+                patterns[e["id"]] = e["movement_pattern"]
+        return exercises, patterns
+
+    exercises = []
+    for path, list_name in BUILTIN_DATA_FILES:
+        exercises.extend(runpy.run_path(str(path))[list_name])
+    return exercises, patterns
+
+
+class CatalogHolder:
+    """Holds the current CatalogSnapshot and swaps in new versions."""
+
+    def __init__(self, poll_seconds=POLL_SECONDS):
+        self.poll_seconds = poll_seconds
+        self._reload_lock = threading.Lock()
+        self._next_check = time.monotonic() + poll_seconds
+
+        paths = _source_files()
+        self._signature = _signature(paths)
+        # The first snapshot reuses the already imported data; a catalog
+        # file is only parsed as its groups are needed
+        if exercise_data._CATALOG_FILE is not None:
+            self._snapshot = CatalogSnapshot.from_file(
+                1, exercise_data._CATALOG_FILE, EXERCISE_TO_PATTERN
+            )
+        else:
+            self._snapshot = CatalogSnapshot(1, exercise_data.ALL_EXERCISES, EXERCISE_TO_PATTERN)
+
+    def current(self):
+        """Return the current snapshot (lock-free; may trigger a change check)."""
+        if self.poll_seconds and time.monotonic() >= self._next_check:
+            self.check_for_changes()
+        return self._snapshot
+
+    def check_for_changes(self):
+        """Reload the catalog if its source files changed.
+
+        Only one thread checks at a time; others keep using the current
+        snapshot instead of waiting. Returns True if a new snapshot was
+        swapped in.
+        """
+        if not self._reload_lock.acquire(blocking=False):
+            return False
+
+        try:
+            self._next_check = time.monotonic() + self.poll_seconds
+            signature = _signature(_source_files())
+            if signature == self._signature:
+                return False
+
+            try:
+                exercises, patterns = _load_sources()
+            except Exception:
+                # Keep serving the last good catalog (e.g. file mid-edit)
+                logger.exception("Catalog reload failed; keeping version %d",
+                                 self._snapshot.version)
+                return False
+
+            self._signature = signature
+            self._snapshot = CatalogSnapshot(self._snapshot.version + 1, exercises, patterns)
+            logger.info("Catalog reloaded: version %d, %d exercises",
+                        self._snapshot.version, len(exercises))
+            return True
+        finally:
+            self._reload_lock.release()
+
+    def replace(self, exercises, patterns):
+        """Swap in a snapshot built from the given data (for tools and tests)."""
+        with self._reload_lock:
+            self._snapshot = CatalogSnapshot(self._snapshot.version + 1, exercises, patterns)
+            return self._snapshot
+
+
+_holder = CatalogHolder()
+
+
+def get_catalog():
+    """Return the current catalog snapshot."""
+    return _holder.current()
+
+
+def get_holder():
+    """Return the process-wide CatalogHolder."""
+    return _holder
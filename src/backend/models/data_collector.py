@@ -1,10 +1,30 @@
-"""Data persistence using JSON Lines format."""
+"""Data persistence using JSON Lines format.
+
+Workout plans are large and most requests produce one of a few identical
+plans, so plan logs don't repeat them. Each distinct output is written
+once to a content-addressed blob store (blobs/<2 hex>/<sha256>.json,
+keyed by content_hash()). The log line holds the input plus
+"output_blob", the hash. read_records() returns such lines as LazyRecord
+objects. Their "output" is loaded from the blob store on first access,
+and each blob is read at most once per call (records with the same
+output share one object).
+"""
 
 import json
+import threading
 from datetime import datetime
 from pathlib import Path
 
+from .canonical import content_hash
+from .locking import atomic_write_lines
+from .metrics import timed
+
 DATA_DIR = Path(__file__).parent.parent / "data"
+BLOB_DIR = "blobs"
+
+# Blobs known to exist, so repeated outputs cost no filesystem calls
+_known_blobs = set()
+_known_blobs_lock = threading.Lock()
 
 
 def ensure_data_dir():
@@ -12,34 +32,107 @@ def ensure_data_dir():
     DATA_DIR.mkdir(parents=True, exist_ok=True)
 
 
-def append_record(filename, input_data, output_data):
-    """Append a record to a JSONL file."""
+def _blob_path(digest):
+    return DATA_DIR / BLOB_DIR / digest[:2] / f"{digest}.json"
+
+
+def store_blob(value):
+    """Store a JSON-serializable value once; returns its content hash."""
+    digest = content_hash(value)
+    path = _blob_path(digest)
+    if path in _known_blobs:
+        return digest
+
+    if not path.exists():
+        path.parent.mkdir(parents=True, exist_ok=True)
+        # Atomic, so a concurrent writer of the same blob is harmless
+        atomic_write_lines(path, [json.dumps(value, separators=(",", ":"))])
+    with _known_blobs_lock:
+        _known_blobs.add(path)
+    return digest
+
+
+def load_blob(digest):
+    """Load a value stored with store_blob()."""
+    with open(_blob_path(digest)) as f:
+        return json.load(f)
+
+
+class LazyRecord(dict):
+    """A log record whose "output" is loaded from the blob store on first access.
+
+    Until then the record has only "output_blob". record["output"] and
+    record.get("output") load it; iterating or serializing the record
+    doesn't.
+    """
+
+    def __init__(self, record, load):
+        super().__init__(record)
+        self._load = load
+
+    def __missing__(self, key):
+        if key == "output" and "output_blob" in self:
+            value = self["output"] = self._load(self["output_blob"])
+            return value
+        raise KeyError(key)
+
+    def get(self, key, default=None):
+        try:
+            return self[key]
+        except KeyError:
+            return default
+
+
+@timed("data_collector.append_record")
+def append_record(filename, input_data, output_data, dedupe=False):
+    """Append a record to a JSONL file.
+
+    With dedupe, the output goes to the blob store and the record only
+    references it.
+    """
     ensure_data_dir()
     filepath = DATA_DIR / filename
 
     record = {
         "timestamp": datetime.now().isoformat(),
         "input": input_data,
-        "output": output_data,
     }
+    if dedupe:
+        record["output_blob"] = store_blob(output_data)
+    else:
+        record["output"] = output_data
 
     with open(filepath, "a") as f:
         f.write(json.dumps(record) + "\n")
 
 
+@timed("data_collector.read_records")
 def read_records(filename):
-    """Read all records from a JSONL file."""
+    """Read all records from a JSONL file.
+
+    Records that reference a blob come back as LazyRecord objects.
+    """
     filepath = DATA_DIR / filename
 
     if not filepath.exists():
         return []
 
+    blobs = {}
+
+    def load(digest):
+        if digest not in blobs:
+            blobs[digest] = load_blob(digest)
+        return blobs[digest]
+
     records = []
     with open(filepath, "r") as f:
         for line in f:
             line = line.strip()
             if line:
-                records.append(json.loads(line))
+                record = json.loads(line)
+                if "output_blob" in record:
+                    record = LazyRecord(record, load)
+                records.append(record)
 
     return records
 
@@ -68,4 +161,4 @@ def log_calorie_calculation(input_data, output_data):
 
 def log_workout_plan(input_data, output_data):
     """Log a workout plan generation."""
-    append_record("workout_plans.jsonl", input_data, output_data)
+    append_record("workout_plans.jsonl", input_data, output_data, dedupe=True)
@@ -1,13 +1,14 @@
 """Evidence-based exercise database with 100+ exercises.
 
 Source: Jeff Nippard's evidence-based recommendations and EMG research.
+
+Set FITMENTOR_CATALOG_PATH to load the catalog from an external JSONL file
+instead of the built-in lists (see loader.py). The functions below work the
+same either way, and read the current catalog snapshot (models.catalog), so
+they follow hot reloads.
 """
 
-from .chest import CHEST_EXERCISES
-from .arms import ARM_EXERCISES
-from .shoulders import SHOULDER_EXERCISES
-from .back import BACK_EXERCISES
-from .legs import LEG_EXERCISES
+import os
 
 # Constants
 MUSCLE_GROUPS = ["chest", "arms", "shoulders", "back", "legs"]
@@ -31,44 +32,74 @@ DIFFICULTY_RANK = {"easy": 1, "medium": 2, "hard": 3}
 NIPPARD_TIERS = ["S+", "S", "A+", "A", "B+", "B", "C", "D"]
 TIER_RANK = {"S+": 8, "S": 7, "A+": 6, "A": 5, "B+": 4, "B": 3, "C": 2, "D": 1, None: 0}
 
-# Aggregate all exercises
-ALL_EXERCISES = (
-    CHEST_EXERCISES +
-    ARM_EXERCISES +
-    SHOULDER_EXERCISES +
-    BACK_EXERCISES +
-    LEG_EXERCISES
-)
+# External catalog file, if configured (imported after the constants above,
+# which the loader validates against)
+CATALOG_PATH = os.environ.get("FITMENTOR_CATALOG_PATH")
+
+if CATALOG_PATH:
+    from .loader import ExerciseCatalogFile, LazyExerciseList
+
+    _CATALOG_FILE = ExerciseCatalogFile(CATALOG_PATH)
+    ALL_EXERCISES = LazyExerciseList(_CATALOG_FILE)
+else:
+    _CATALOG_FILE = None
+
+    # The built-in lists are only imported when there's no catalog file
+    from .chest import CHEST_EXERCISES
+    from .arms import ARM_EXERCISES
+    from .shoulders import SHOULDER_EXERCISES
+    from .back import BACK_EXERCISES
+    from .legs import LEG_EXERCISES
+
+    # Aggregate all exercises
+    ALL_EXERCISES = (
+        CHEST_EXERCISES +
+        ARM_EXERCISES +
+        SHOULDER_EXERCISES +
+        BACK_EXERCISES +
+        LEG_EXERCISES
+    )
+
 
-# Build lookup by ID
-_EXERCISE_BY_ID = {e["id"]: e for e in ALL_EXERCISES}
+def _catalog():
+    # The current catalog snapshot, so these follow hot reloads (imported
+    # here because catalog builds on this package)
+    from ..catalog import get_catalog
+    return get_catalog()
 
 
 def get_all_exercises():
     """Return all exercises."""
-    return ALL_EXERCISES
+    return list(_catalog().exercises)
 
 
 def get_exercise_by_id(exercise_id):
     """Return a specific exercise by ID (string slug)."""
-    return _EXERCISE_BY_ID.get(exercise_id)
+    return _catalog().get_exercise(exercise_id)
 
 
 def get_exercises_by_muscle_group(muscle_group):
     """Return exercises for a specific muscle group."""
-    return [e for e in ALL_EXERCISES if e["muscle_group"] == muscle_group]
+    # Only this group's records are parsed from a catalog file
+    return list(_catalog().group(muscle_group))
 
 
 def get_exercises_by_sub_region(sub_region):
     """Return exercises for a specific sub-region."""
-    return [e for e in ALL_EXERCISES if e["sub_region"] == sub_region]
+    for muscle_group, sub_regions in SUB_REGIONS.items():
+        if sub_region in sub_regions:
+            return [
+                e for e in _catalog().group(muscle_group)
+                if e["sub_region"] == sub_region
+            ]
+    return []
 
 
 def get_exercises_by_equipment(equipment_list):
     """Return exercises that can be performed with given equipment."""
     equipment_set = set(equipment_list)
     return [
-        e for e in ALL_EXERCISES
+        e for e in _catalog().exercises
         if set(e["equipment"]).issubset(equipment_set)
     ]
 
@@ -77,7 +108,7 @@ def get_exercises_by_difficulty(max_difficulty):
     """Return exercises up to and including the given difficulty."""
     max_rank = DIFFICULTY_RANK.get(max_difficulty, 3)
     return [
-        e for e in ALL_EXERCISES
+        e for e in _catalog().exercises
         if DIFFICULTY_RANK.get(e["difficulty"], 1) <= max_rank
     ]
 
@@ -86,6 +117,6 @@ def get_exercises_by_tier(min_tier):
     """Return exercises with tier >= min_tier."""
     min_rank = TIER_RANK.get(min_tier, 0)
     return [
-        e for e in ALL_EXERCISES
+        e for e in _catalog().exercises
         if TIER_RANK.get(e.get("nippard_tier"), 0) >= min_rank
     ]
@@ -0,0 +1,372 @@
+"""External exercise catalog files (JSON Lines).
+
+Large catalogs can be kept outside the code base in a JSONL file and loaded
+by pointing FITMENTOR_CATALOG_PATH at it. The file is memory-mapped and each
+muscle group is only parsed (and validated) the first time it is needed.
+
+File layout:
+- Line 1 (optional header):
+  {"format": "fitmentor-exercise-catalog", "version": 1,
+   "groups": {"chest": [offset, length], ...}}
+  Offsets are byte positions relative to the end of the header line.
+- Every other line is one exercise record (see EXERCISE_SCHEMA). Records may
+  carry an optional "movement_pattern".
+
+Files written by write_catalog() have the header and are grouped by muscle
+group, so reading one group only touches its own bytes. Header-less files are
+accepted too; they are scanned once to find each group's lines.
+
+Usage:
+    python -m models.exercise_data.loader export catalog.jsonl
+    python -m models.exercise_data.loader validate catalog.jsonl
+"""
+
+import json
+import mmap
+import os
+import sys
+import threading
+from collections.abc import Sequence
+
+from . import (
+    MUSCLE_GROUPS,
+    SUB_REGIONS,
+    EQUIPMENT,
+    DIFFICULTIES,
+    NIPPARD_TIERS,
+)
+CATALOG_FORMAT = "fitmentor-exercise-catalog"
+CATALOG_VERSION = 1
+
+# Field -> (allowed types, required)
+EXERCISE_SCHEMA = {
+    "id": ((str,), True),
+    "name": ((str,), True),
+    "muscle_group": ((str,), True),
+    "sub_region": ((str,), True),
+    "difficulty": ((str,), True),
+    "equipment": ((list,), True),
+    "targets": ((list,), True),
+    "type": ((str,), True),
+    "nippard_tier": ((str, type(None)), True),
+    "research_notes": ((str, type(None)), False),
+    "rest": ((int,), True),
+    "movement_pattern": ((str, type(None)), False),
+}
+
+EXERCISE_TYPES = ["compound", "isolation"]
+
+
+class ValidationError(Exception):
+    """Raised when a catalog file or record is invalid."""
+    pass
+
+
+_REQUIRED_FIELDS = frozenset(f for f, (_, required) in EXERCISE_SCHEMA.items() if required)
+_VALID_EQUIPMENT = frozenset(EQUIPMENT)
+_VALID_SUB_REGIONS = {mg: frozenset(srs) for mg, srs in SUB_REGIONS.items()}
+
+
+def validate_record(record):
+    """Validate one exercise record against EXERCISE_SCHEMA."""
+    if not isinstance(record, dict):
+        raise ValidationError("Exercise record must be an object")
+
+    record_id = record.get("id", "<unknown>")
+
+    if not _REQUIRED_FIELDS <= record.keys():
+        missing = sorted(_REQUIRED_FIELDS - record.keys())
+        raise ValidationError(f"{record_id}: missing required field: {missing[0]}")
+
+    for field, value in record.items():
+        schema = EXERCISE_SCHEMA.get(field)
+        if schema is None:
+            continue
+        if isinstance(value, bool) or not isinstance(value, schema[0]):
+            raise ValidationError(f"{record_id}: invalid type for field: {field}")
+
+    sub_regions = _VALID_SUB_REGIONS.get(record["muscle_group"])
+    if sub_regions is None:
+        raise ValidationError(f"{record_id}: invalid muscle_group: {record['muscle_group']}")
+
+    if record["sub_region"] not in sub_regions:
+        raise ValidationError(f"{record_id}: invalid sub_region: {record['sub_region']}")
+
+    if record["difficulty"] not in DIFFICULTIES:
+        raise ValidationError(f"{record_id}: invalid difficulty: {record['difficulty']}")
+
+    if record["type"] not in EXERCISE_TYPES:
+        raise ValidationError(f"{record_id}: invalid type: {record['type']}")
+
+    if record["nippard_tier"] is not None and record["nippard_tier"] not in NIPPARD_TIERS:
+        raise ValidationError(f"{record_id}: invalid nippard_tier: {record['nippard_tier']}")
+
+    if not _VALID_EQUIPMENT.issuperset(record["equipment"]):
+        invalid_equipment = [eq for eq in record["equipment"] if eq not in _VALID_EQUIPMENT]
+        raise ValidationError(
+            f"{record_id}: invalid equipment: {', '.join(map(str, invalid_equipment))}"
+        )
+
+
+def _line_spans(buffer, start, end):
+    """Yield (line_start, line_end) for the non-empty lines in buffer[start:end]."""
+    pos = start
+    while pos < end:
+        newline = buffer.find(b"\n", pos, end)
+        line_end = end if newline == -1 else newline
+        if buffer[pos:line_end].strip():
+            yield pos, line_end
+        pos = line_end + 1
+
+
+class ExerciseCatalogFile:
+    """A memory-mapped JSONL exercise catalog, parsed lazily per muscle group."""
+
+    def __init__(self, path):
+        self.path = os.fspath(path)
+        self._lock = threading.Lock()
+        self._groups = {}
+        self._patterns = {}
+        self._by_id = None
+
+        with open(self.path, "rb") as f:
+            size = os.fstat(f.fileno()).st_size
+            # mmap cannot map empty files
+            self._buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) if size else b""
+
+        self._spans = self._index(size)
+
+    def _index(self, size):
+        """Map each muscle group to the byte ranges holding its records."""
+        first_end = self._buffer.find(b"\n")
+        if first_end == -1:
+            first_end = size
+
+        first_line = self._buffer[:first_end].strip()
+        if first_line:
+            try:
+                header = json.loads(first_line)
+            except json.JSONDecodeError as e:
+                raise ValidationError(f"{self.path}: line 1: {e}") from e
+
+            if isinstance(header, dict) and header.get("format") == CATALOG_FORMAT:
+                if header.get("version") != CATALOG_VERSION:
+                    raise ValidationError(
+                        f"{self.path}: unsupported catalog version: {header.get('version')}"
+                    )
+                return self._header_spans(header.get("groups"), first_end + 1, size)
+
+        # No header: scan every line once to find its muscle group
+        spans = {}
+        for line_start, line_end in _line_spans(self._buffer, 0, size):
+            record = self._parse_line(line_start, line_end)
+            group = record.get("muscle_group") if isinstance(record, dict) else None
+            spans.setdefault(group, []).append((line_start, line_end))
+        return spans
+
+    def _header_spans(self, groups, base, size):
+        """Validate the header's group index and turn it into byte ranges."""
+        if not isinstance(groups, dict):
+            raise ValidationError(f"{self.path}: header groups must be an object")
+
+        spans = {}
+        for group, span in groups.items():
+            if (not isinstance(span, list) or len(span) != 2
+                    or not all(isinstance(n, int) and not isinstance(n, bool) and n >= 0
+                               for n in span)):
+                raise ValidationError(
+                    f"{self.path}: header span for {group} must be [offset, length]"
+                )
+            offset, length = span
+            if base + offset + length > size:
+                raise ValidationError(f"{self.path}: header span for {group} is past the end")
+            spans[group] = [(base + offset, base + offset + length)]
+        return spans
+
+    def _parse_line(self, line_start, line_end):
+        try:
+            return json.loads(self._buffer[line_start:line_end])
+        except json.JSONDecodeError as e:
+            raise ValidationError(f"{self.path}: byte {line_start}: {e}") from e
+
+    def _parse_span(self, start, end):
+        """Parse the records in a byte range.
+
+        The whole range is decoded as one JSON array, which is much faster
+        than decoding line by line; blank lines or bad JSON fall back to
+        per-line parsing so errors point at the offending line.
+        """
+        chunk = self._buffer[start:end].strip()
+        if not chunk:
+            return []
+        try:
+            return json.loads(b"[" + chunk.replace(b"\n", b",") + b"]")
+        except json.JSONDecodeError:
+            return [
+                self._parse_line(line_start, line_end)
+                for line_start, line_end in _line_spans(self._buffer, start, end)
+            ]
+
+    @property
+    def muscle_groups(self):
+        """Muscle groups present in the file, in file order."""
+        return [g for g in self._spans if g is not None]
+
+    def group(self, muscle_group):
+        """Return the (validated) exercises of one muscle group."""
+        exercises = self._groups.get(muscle_group)
+        if exercises is not None:
+            return exercises
+
+        with self._lock:
+            if muscle_group not in self._groups:
+                exercises = []
+                patterns = {}
+                for start, end in self._spans.get(muscle_group, []):
+                    for record in self._parse_span(start, end):
+                        validate_record(record)
+                        if record["muscle_group"] != muscle_group:
+                            raise ValidationError(
+                                f"{record['id']}: listed under {muscle_group} "
+                                f"but muscle_group is {record['muscle_group']}"
+                            )
+                        exercises.append(record)
+                        if record.get("movement_pattern"):
+                            patterns[record["id"]] = record["movement_pattern"]
+
+                self._patterns[muscle_group] = patterns
+                self._groups[muscle_group] = exercises
+
+        return self._groups[muscle_group]
+
+    def all(self):
+        """Return every exercise, grouped in file order."""
+        exercises = []
+        for muscle_group in self._spans:
+            if muscle_group is None:
+                raise ValidationError(f"{self.path}: record without a muscle_group")
+            exercises.extend(self.group(muscle_group))
+        return exercises
+
+    def patterns(self, muscle_groups=None):
+        """Return {exercise id: movement pattern} for patterns stored in the file.
+
+        Args:
+            muscle_groups: Groups to read (default: all), parsing each on first use
+        """
+        if muscle_groups is None:
+            muscle_groups = self.muscle_groups
+        patterns = {}
+        for muscle_group in muscle_groups:
+            self.group(muscle_group)
+            patterns.update(self._patterns.get(muscle_group, {}))
+        return patterns
+
+    def get_by_id(self, exercise_id):
+        """Return an exercise by ID (parses every group on first use)."""
+        if self._by_id is None:
+            by_id = {e["id"]: e for e in self.all()}
+            self._by_id = by_id
+        return self._by_id.get(exercise_id)
+
+
+class LazyExerciseList(Sequence):
+    """Read-only list of a catalog file's exercises, parsed on first access."""
+
+    def __init__(self, catalog):
+        self._catalog = catalog
+        self._items = None
+
+    def _load(self):
+        if self._items is None:
+            self._items = self._catalog.all()
+        return self._items
+
+    def __getitem__(self, index):
+        return self._load()[index]
+
+    def __len__(self):
+        return len(self._load())
+
+    def __iter__(self):
+        return iter(self._load())
+
+    def __add__(self, other):
+        return list(self._load()) + list(other)
+
+    def copy(self):
+        """Return a plain list copy, like list.copy()."""
+        return list(self._load())
+
+
+def write_catalog(path, exercises, patterns=None):
+    """Write exercises to a catalog file with a group index header.
+
+    Args:
+        path: Destination file path
+        exercises: Exercise records (validated before writing)
+        patterns: Optional mapping of exercise ID -> movement pattern, stored
+                  on records that don't already have a movement_pattern
+    """
+    groups = {}
+    for exercise in exercises:
+        record = dict(exercise)
+        if patterns and "movement_pattern" not in record and record["id"] in patterns:
+            record["movement_pattern"] = patterns[record["id"]]
+        validate_record(record)
+        groups.setdefault(record["muscle_group"], []).append(
+            json.dumps(record, separators=(",", ":")).encode("utf-8") + b"\n"
+        )
+
+    ordered = [g for g in MUSCLE_GROUPS if g in groups]
+    index = {}
+    offset = 0
+    for group in ordered:
+        length = sum(len(line) for line in groups[group])
+        index[group] = [offset, length]
+        offset += length
+
+    header = {"format": CATALOG_FORMAT, "version": CATALOG_VERSION, "groups": index}
+
+    with open(path, "wb") as f:
+        f.write(json.dumps(header, separators=(",", ":")).encode("utf-8") + b"\n")
+        for group in ordered:
+            f.writelines(groups[group])
+
+
+def main(argv):
+    """Export the built-in catalog or validate a catalog file."""
+    if len(argv) != 2 or argv[0] not in ("export", "validate"):
+        print("Usage: python -m models.exercise_data.loader (export|validate) PATH")
+        return 2
+
+    command, path = argv
+
+    if command == "export":
+        from ..movement_patterns import EXERCISE_TO_PATTERN
+        from .chest import CHEST_EXERCISES
+        from .arms import ARM_EXERCISES
+        from .shoulders import SHOULDER_EXERCISES
+        from .back import BACK_EXERCISES
+        from .legs import LEG_EXERCISES
+
+        exercises = (
+            CHEST_EXERCISES + ARM_EXERCISES + SHOULDER_EXERCISES +
+            BACK_EXERCISES + LEG_EXERCISES
+        )
+        write_catalog(path, exercises, EXERCISE_TO_PATTERN)
+        print(f"Wrote {len(exercises)} exercises to {path}")
+        return 0
+
+    try:
+        count = len(ExerciseCatalogFile(path).all())
+    except (ValidationError, OSError) as e:
+        print(f"Invalid catalog: {e}")
+        return 1
+
+    print(f"{path}: {count} valid exercises")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
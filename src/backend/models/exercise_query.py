@@ -3,8 +3,8 @@
 Provides filtering, ranking, and lookup functions for workout generation.
 """
 
+from .catalog import get_catalog
 from .exercise_data import (
-    ALL_EXERCISES,
     MUSCLE_GROUPS,
     SUB_REGIONS,
     EQUIPMENT,
@@ -12,13 +12,13 @@ from .exercise_data import (
     DIFFICULTY_RANK,
     NIPPARD_TIERS,
     TIER_RANK,
-    get_exercise_by_id,
     get_exercises_by_muscle_group,
     get_exercises_by_sub_region,
     get_exercises_by_equipment,
     get_exercises_by_difficulty,
     get_exercises_by_tier,
 )
+from .substitutes import get_substitute_nodes
 
 
 class ValidationError(Exception):
@@ -112,7 +112,7 @@ def query_exercises(
         )
 
     # Start with all exercises
-    results = ALL_EXERCISES.copy()
+    results = list(get_catalog().exercises)
 
     # Apply filters
     if muscle_group:
@@ -262,6 +262,8 @@ def get_substitutes(exercise_id, equipment=None):
     """
     Find substitute exercises that target the same sub-region.
 
+    Backed by the precomputed substitute graph (see substitutes.py).
+
     Args:
         exercise_id: The exercise to find substitutes for
         equipment: Optional equipment constraint
@@ -269,19 +271,17 @@ def get_substitutes(exercise_id, equipment=None):
     Returns:
         List of substitute exercises (excluding the original)
     """
-    exercise = get_exercise_by_id(exercise_id)
-    if not exercise:
-        return []
+    validate_equipment(equipment)
 
-    subs = query_exercises(
-        sub_region=exercise["sub_region"],
-        equipment=equipment,
-        exercise_type=exercise["type"],
-        sort_by_tier=True
-    )
+    if equipment:
+        equipment = [eq.lower() for eq in equipment]
+
+    catalog = get_catalog()
+    nodes = get_substitute_nodes(exercise_id, equipment or None, catalog)
+    if not nodes:
+        return []
 
-    # Remove the original exercise
-    return [e for e in subs if e["id"] != exercise_id]
+    return [catalog.get_exercise(n["id"]) for n in nodes]
 
 
 # Equipment groupings for constraint-based workout generation
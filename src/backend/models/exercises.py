@@ -12,10 +12,11 @@ The new database (exercise_data/) contains 120+ exercises with:
 For new code, use exercise_query.py directly for full functionality.
 """
 
+import copy
+
+from .catalog import get_catalog
 from .exercise_data import (
-    ALL_EXERCISES as NEW_EXERCISES,
     get_all_exercises as _new_get_all,
-    get_exercise_by_id as _new_get_by_id,
     get_exercises_by_muscle_group as _new_get_by_muscle,
     get_exercises_by_equipment as _new_get_by_equipment,
 )
@@ -163,13 +164,51 @@ def _adapt_exercise(new_exercise):
     }
 
 
-# Build the EXERCISES list from new database for backward compatibility
-EXERCISES = [_adapt_exercise(e) for e in NEW_EXERCISES]
+# Fields available on backward-compatible exercise records (for projections)
+EXERCISE_FIELDS = (
+    "id", "name", "muscle_group", "subcategory", "equipment", "difficulty",
+    "type", "category", "rest", "nippard_tier", "research_notes", "targets",
+)
+
+
+def _build_tables(catalog):
+    """Build the backward-compatible exercise list and id table for a catalog.
+
+    The id table maps new string IDs and legacy integer IDs to records.
+    Legacy IDs that map to None (core, calves, ...) are left out.
+    """
+    exercises = [_adapt_exercise(e) for e in catalog.exercises]
+
+    id_table = {e["id"]: e for e in exercises}
+    id_table.update({
+        legacy_id: id_table[new_id]
+        for legacy_id, new_id in LEGACY_ID_MAP.items()
+        if new_id in id_table
+    })
+
+    return exercises, id_table
 
 
-def get_all_exercises():
+def _tables(catalog=None):
+    """Return (exercises, id_table) for a catalog snapshot (default: current)."""
+    if catalog is None:
+        catalog = get_catalog()
+    return catalog.derived("exercises.compat_tables", _build_tables)
+
+
+def __getattr__(name):
+    # EXERCISES list for backward compatibility, built on first access so
+    # importing this module doesn't parse the catalog (get_all_exercises()
+    # follows catalog reloads; EXERCISES is the catalog as first accessed)
+    if name == "EXERCISES":
+        globals()["EXERCISES"] = _tables()[0]
+        return globals()["EXERCISES"]
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def get_all_exercises(catalog=None):
     """Return all exercises in backward-compatible format."""
-    return EXERCISES
+    return _tables(catalog)[0]
 
 
 def get_exercises_by_muscle_group(muscle_group):
@@ -177,62 +216,111 @@ def get_exercises_by_muscle_group(muscle_group):
 
     Handles legacy muscle group names (biceps, triceps, glutes).
     """
+    exercises = get_all_exercises()
+
     # Handle legacy muscle groups
     if muscle_group == "biceps":
-        return [e for e in EXERCISES if e["muscle_group"] == "arms"
+        return [e for e in exercises if e["muscle_group"] == "arms"
                 and "biceps" in e.get("subcategory", "")]
     elif muscle_group == "triceps":
-        return [e for e in EXERCISES if e["muscle_group"] == "arms"
+        return [e for e in exercises if e["muscle_group"] == "arms"
                 and "triceps" in e.get("subcategory", "")]
     elif muscle_group == "glutes":
-        return [e for e in EXERCISES if e["muscle_group"] == "legs"
+        return [e for e in exercises if e["muscle_group"] == "legs"
                 and e.get("subcategory") == "glutes"]
     elif muscle_group == "core":
         # Core exercises not in new database
         return []
 
-    return [e for e in EXERCISES if e["muscle_group"] == muscle_group]
+    return [e for e in exercises if e["muscle_group"] == muscle_group]
 
 
 def get_exercises_by_equipment(equipment_list):
     """Return exercises that can be performed with given equipment."""
     equipment_set = set(equipment_list)
+    exercises = get_all_exercises()
     return [
-        e for e in EXERCISES
+        e for e in exercises
         if set(e["equipment"]).issubset(equipment_set)
     ]
 
 
+def _lookup(exercise_id, catalog=None):
+    """Return the record for a string or legacy integer ID, or None."""
+    # bool is an int subclass and True == 1, so it must not hit legacy ID 1
+    if isinstance(exercise_id, bool) or not isinstance(exercise_id, (str, int)):
+        return None
+    return _tables(catalog)[1].get(exercise_id)
+
+
 def get_exercise_by_id(exercise_id):
     """Return a specific exercise by ID.
 
     Supports both:
     - Legacy integer IDs (1-66)
     - New string IDs ("incline-barbell-bench-press")
+
+    Returns a copy, so callers can't change the shared catalog record.
     """
-    # Try new string ID first
-    if isinstance(exercise_id, str):
-        new_exercise = _new_get_by_id(exercise_id)
-        if new_exercise:
-            return _adapt_exercise(new_exercise)
-        return None
+    exercise = _lookup(exercise_id)
+    return copy.deepcopy(exercise) if exercise else None
 
-    # Try legacy integer ID
-    if isinstance(exercise_id, int):
-        new_id = LEGACY_ID_MAP.get(exercise_id)
-        if new_id:
-            new_exercise = _new_get_by_id(new_id)
-            if new_exercise:
-                return _adapt_exercise(new_exercise)
-        return None
 
-    return None
+def resolve_exercise_id(exercise_id, catalog=None):
+    """Return the new string ID for a string or legacy integer ID, or None."""
+    exercise = _lookup(exercise_id, catalog)
+    return exercise["id"] if exercise else None
+
+
+def get_exercises_by_ids(exercise_ids, fields=None, catalog=None):
+    """Return exercises for a mixed list of new string and legacy integer IDs.
+
+    Args:
+        exercise_ids: Iterable of string slugs and/or legacy integer IDs
+        fields: Optional list of fields to include (``id`` is always included)
+        catalog: CatalogSnapshot to read from (defaults to the current one)
+
+    Returns:
+        Tuple of (exercises, resolved_legacy_ids, not_found) where exercises
+        are unique and in request order, resolved_legacy_ids maps each legacy
+        integer ID to its new string ID, and not_found lists unknown IDs.
+    """
+    exercises = []
+    resolved_legacy_ids = {}
+    not_found = []
+    seen = set()
+
+    if catalog is None:
+        catalog = get_catalog()
+
+    for exercise_id in exercise_ids:
+        exercise = _lookup(exercise_id, catalog)
+        if exercise is None:
+            not_found.append(exercise_id)
+            continue
+
+        if isinstance(exercise_id, int):
+            resolved_legacy_ids[exercise_id] = exercise["id"]
+
+        if exercise["id"] in seen:
+            continue
+        seen.add(exercise["id"])
+
+        if fields:
+            exercise = {
+                field: exercise[field]
+                for field in EXERCISE_FIELDS
+                if field == "id" or field in fields
+            }
+        exercises.append(exercise)
+
+    return exercises, resolved_legacy_ids, not_found
 
 
 # Export new database functions for direct access
 def get_evidence_based_exercises():
     """Return all exercises from the new evidence-based database."""
-    return NEW_EXERCISES
+    return list(get_catalog().exercises)
 
 
 def get_exercises_with_tier(min_tier="A"):
@@ -240,6 +328,6 @@ def get_exercises_with_tier(min_tier="A"):
     from .exercise_data import TIER_RANK
     min_rank = TIER_RANK.get(min_tier, 0)
     return [
-        e for e in NEW_EXERCISES
+        e for e in get_catalog().exercises
         if TIER_RANK.get(e.get("nippard_tier"), 0) >= min_rank
     ]
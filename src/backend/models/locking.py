@@ -0,0 +1,117 @@
+"""Locks and atomic writes for the JSONL data files.
+
+- RWLock: in-process readers/writer lock (many readers or one writer)
+- file_lock(): advisory fcntl lock that coordinates separate processes (for
+  example several server workers sharing a data directory). It locks a
+  sidecar "<file>.lock" file, because atomic replaces swap out the data
+  file's inode.
+- atomic_write_lines(): writes a temp file in the same directory, fsyncs it
+  and renames it over the target, so a crash leaves the old or the new
+  file, never a truncated one.
+
+On platforms without fcntl, file locks are no-ops and only the in-process
+locks apply.
+"""
+
+import os
+import tempfile
+import threading
+from contextlib import contextmanager
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - Windows
+    fcntl = None
+
+
+class RWLock:
+    """Readers/writer lock. Waiting writers block new readers (no starvation)."""
+
+    def __init__(self):
+        self._cond = threading.Condition(threading.Lock())
+        self._readers = 0
+        self._writer = False
+        self._writers_waiting = 0
+
+    @contextmanager
+    def read(self):
+        with self._cond:
+            while self._writer or self._writers_waiting:
+                self._cond.wait()
+            self._readers += 1
+        try:
+            yield
+        finally:
+            with self._cond:
+                self._readers -= 1
+                if not self._readers:
+                    self._cond.notify_all()
+
+    @contextmanager
+    def write(self):
+        with self._cond:
+            self._writers_waiting += 1
+            while self._writer or self._readers:
+                self._cond.wait()
+            self._writers_waiting -= 1
+            self._writer = True
+        try:
+            yield
+        finally:
+            with self._cond:
+                self._writer = False
+                self._cond.notify_all()
+
+
+@contextmanager
+def file_lock(path, shared=False):
+    """Hold an advisory lock for a data file across processes.
+
+    Args:
+        path: The data file being protected
+        shared: True for a read (shared) lock, False for exclusive
+    """
+    if fcntl is None:
+        yield
+        return
+
+    fd = os.open(f"{path}.lock", os.O_RDWR | os.O_CREAT, 0o644)
+    try:
+        fcntl.flock(fd, fcntl.LOCK_SH if shared else fcntl.LOCK_EX)
+        yield
+    finally:
+        # Closing the descriptor releases the lock
+        os.close(fd)
+
+
+def atomic_write_lines(path, lines):
+    """Atomically replace a file with the given lines (each ending in "\\n")."""
+    directory = os.path.dirname(os.fspath(path)) or "."
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=".tmp-", suffix=".jsonl")
+    try:
+        # mkstemp creates 0600 files; keep the existing file's mode
+        try:
+            mode = os.stat(path).st_mode & 0o777
+        except FileNotFoundError:
+            mode = 0o644
+        os.chmod(tmp_path, mode)
+
+        with os.fdopen(fd, "w") as f:
+            f.writelines(lines)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            os.unlink(tmp_path)
+        except FileNotFoundError:
+            pass
+        raise
+
+    # Persist the rename itself
+    if hasattr(os, "O_DIRECTORY"):
+        dir_fd = os.open(directory, os.O_RDONLY | os.O_DIRECTORY)
+        try:
+            os.fsync(dir_fd)
+        finally:
+            os.close(dir_fd)
@@ -0,0 +1,275 @@
+"""In-process metrics: counters, gauges and histograms.
+
+Every thread records into its own shard (a plain dict only that thread
+writes to), so recording a value takes no lock. A scrape merges all shards
+and renders them in the Prometheus text exposition format. Shards of threads
+that have exited are folded into a retired total on the next scrape, so
+per-request threads don't pile up.
+
+Usage:
+    REQUESTS = Counter("fitmentor_requests_total", "Requests", ["endpoint"])
+    REQUESTS.inc(endpoint="/api/exercises")
+
+    with span("validate_input"):
+        validate_input(data)
+"""
+
+import bisect
+import collections
+import math
+import threading
+import time
+from contextlib import contextmanager
+from functools import wraps
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# Upper bounds in seconds
+LATENCY_BUCKETS = (
+    0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0,
+)
+# Upper bounds in bytes
+SIZE_BUCKETS = (100, 1_000, 10_000, 50_000, 100_000, 500_000, 1_000_000, 5_000_000)
+
+# Metric name -> metric, in registration order
+_metrics = {}
+
+_local = threading.local()
+_shards = []
+_shards_lock = threading.Lock()
+# Merged values of exited threads
+_retired = {}
+
+
+class _Shard:
+    """Values recorded by one thread: {(metric name, label values): value}."""
+
+    __slots__ = ("thread", "values")
+
+    def __init__(self, thread):
+        self.thread = thread
+        self.values = {}
+
+
+def _values():
+    """Return the calling thread's value dict, registering a shard on first use."""
+    try:
+        return _local.values
+    except AttributeError:
+        shard = _Shard(threading.current_thread())
+        with _shards_lock:
+            _shards.append(shard)
+        _local.values = shard.values
+        return shard.values
+
+
+def _merge_value(into, key, value):
+    """Add a counter/gauge number or histogram list into a merged dict."""
+    current = into.get(key)
+    if current is None:
+        into[key] = list(value) if isinstance(value, list) else value
+    elif isinstance(value, list):
+        for i, v in enumerate(value):
+            current[i] += v
+    else:
+        into[key] = current + value
+
+
+class _Metric:
+    """Base class: a named metric with a fixed set of label names."""
+
+    type = None
+
+    def __init__(self, name, documentation, labelnames=()):
+        if name in _metrics:
+            raise ValueError(f"Duplicate metric: {name}")
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        _metrics[name] = self
+
+    def _key(self, labels):
+        if len(labels) != len(self.labelnames) or not all(n in labels for n in self.labelnames):
+            raise ValueError(f"{self.name} expects labels {self.labelnames}")
+        return self.name, tuple(str(labels[n]) for n in self.labelnames)
+
+
+class Counter(_Metric):
+    """A monotonically increasing count."""
+
+    type = "counter"
+
+    def inc(self, amount=1, **labels):
+        values = _values()
+        key = self._key(labels)
+        values[key] = values.get(key, 0) + amount
+
+
+class Gauge(_Metric):
+    """A value that goes up and down (per-thread deltas, summed on scrape)."""
+
+    type = "gauge"
+
+    def inc(self, amount=1, **labels):
+        values = _values()
+        key = self._key(labels)
+        values[key] = values.get(key, 0) + amount
+
+    def dec(self, amount=1, **labels):
+        self.inc(-amount, **labels)
+
+
+class Histogram(_Metric):
+    """Observations counted into fixed buckets, plus their sum."""
+
+    type = "histogram"
+
+    def __init__(self, name, documentation, labelnames=(), buckets=LATENCY_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(buckets)
+
+    def observe(self, value, **labels):
+        values = _values()
+        key = self._key(labels)
+        counts = values.get(key)
+        if counts is None:
+            # One count per bucket, one for +Inf, then the sum
+            counts = values[key] = [0] * (len(self.buckets) + 2)
+        counts[bisect.bisect_left(self.buckets, value)] += 1
+        counts[-1] += value
+
+
+class RecentSamples:
+    """The last `size` observations, for recent percentiles (not exported).
+
+    Histograms accumulate since startup; this answers "how slow is it now".
+    """
+
+    def __init__(self, size=1024):
+        self._samples = collections.deque(maxlen=size)
+
+    def observe(self, value):
+        # deque.append is atomic under the GIL
+        self._samples.append(value)
+
+    def percentiles(self, quantiles=(0.5, 0.95, 0.99)):
+        """Return {"p50": ..., ...} by nearest rank, or None values if empty."""
+        samples = sorted(self._samples)
+        result = {}
+        for q in quantiles:
+            name = f"p{q * 100:g}"
+            if not samples:
+                result[name] = None
+                continue
+            rank = max(0, min(len(samples) - 1, math.ceil(q * len(samples)) - 1))
+            result[name] = samples[rank]
+        result["count"] = len(samples)
+        return result
+
+
+SPAN_SECONDS = Histogram(
+    "fitmentor_span_duration_seconds",
+    "Time spent in internal operations",
+    ["span"],
+)
+
+
+@contextmanager
+def span(name):
+    """Time a block of code into the span histogram."""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        SPAN_SECONDS.observe(time.perf_counter() - start, span=name)
+
+
+def timed(name):
+    """Decorator form of span()."""
+    def decorator(func):
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            with span(name):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def collect():
+    """Merge all thread shards.
+
+    Returns:
+        Dict mapping (metric name, label values) -> number, or for histograms
+        a list of per-bucket counts followed by the +Inf count and the sum.
+    """
+    merged = {}
+    with _shards_lock:
+        live = []
+        for shard in _shards:
+            if shard.thread.is_alive():
+                live.append(shard)
+            else:
+                # The thread is gone, so nothing writes to this shard anymore
+                for key, value in shard.values.items():
+                    _merge_value(_retired, key, value)
+        _shards[:] = live
+
+        for key, value in _retired.items():
+            _merge_value(merged, key, value)
+
+    for shard in live:
+        # list() of a dict is atomic under the GIL, so a concurrent
+        # insert by the owning thread can't break the iteration
+        for key, value in list(shard.values.items()):
+            _merge_value(merged, key, value)
+
+    return merged
+
+
+def _escape(value):
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(pairs):
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in pairs) + "}"
+
+
+def _format_number(value):
+    if value == float("inf"):
+        return "+Inf"
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return repr(value) if isinstance(value, float) else str(value)
+
+
+def render():
+    """Return all metrics in the Prometheus text exposition format."""
+    merged = collect()
+
+    by_metric = {}
+    for (name, label_values), value in merged.items():
+        by_metric.setdefault(name, []).append((label_values, value))
+
+    lines = []
+    for name, metric in _metrics.items():
+        lines.append(f"# HELP {name} {metric.documentation}")
+        lines.append(f"# TYPE {name} {metric.type}")
+
+        for label_values, value in sorted(by_metric.get(name, [])):
+            pairs = list(zip(metric.labelnames, label_values))
+
+            if metric.type != "histogram":
+                lines.append(f"{name}{_format_labels(pairs)} {_format_number(value)}")
+                continue
+
+            cumulative = 0
+            for bound, count in zip(metric.buckets + (float("inf"),), value[:-1]):
+                cumulative += count
+                labels = _format_labels(pairs + [("le", _format_number(float(bound)))])
+                lines.append(f"{name}_bucket{labels} {cumulative}")
+            lines.append(f"{name}_sum{_format_labels(pairs)} {_format_number(value[-1])}")
+            lines.append(f"{name}_count{_format_labels(pairs)} {cumulative}")
+
+    return "\n".join(lines) + "\n"
@@ -0,0 +1,162 @@
+"""On-demand profiling for the API.
+
+Two tools, both off unless FITMENTOR_PROFILING=1:
+
+- A sampling profiler: a background thread snapshots every thread's stack
+  (sys._current_frames) at a fixed interval for N seconds and returns the
+  counts as collapsed stacks ("frame;frame;frame count" lines), ready for
+  flamegraph.pl or speedscope. Only one recording runs at a time, with a
+  cooldown between recordings, so it can be left enabled in production.
+- start_profile()/summarize(): cProfile a single request and return a
+  text summary, used for requests sent with an "X-Profile: 1" header.
+"""
+
+import cProfile
+import io
+import os
+import pstats
+import sys
+import threading
+import time
+
+PROFILING_ENABLED = os.environ.get("FITMENTOR_PROFILING") == "1"
+
+MAX_SECONDS = 30
+DEFAULT_SECONDS = 5
+MIN_INTERVAL = 0.001
+DEFAULT_INTERVAL = 0.005
+# Seconds to wait after a recording before another one may start
+COOLDOWN_SECONDS = 10
+
+SUMMARY_LINES = 40
+
+
+class ValidationError(Exception):
+    """Raised when profiling parameters are invalid."""
+    pass
+
+
+class ProfilerBusy(Exception):
+    """Raised when a recording is running or the cooldown hasn't passed."""
+
+    def __init__(self, retry_after):
+        super().__init__(f"Profiler busy; retry in {retry_after:.0f}s")
+        self.retry_after = retry_after
+
+
+def _frame_name(frame):
+    code = frame.f_code
+    name = getattr(code, "co_qualname", code.co_name)
+    return f"{os.path.basename(code.co_filename)}:{name}"
+
+
+def _collapse(frame):
+    """Return a frame's stack as "outer;...;inner"."""
+    names = []
+    while frame is not None:
+        names.append(_frame_name(frame))
+        frame = frame.f_back
+    return ";".join(reversed(names))
+
+
+def sample_stacks(seconds, interval, exclude_threads=()):
+    """Sample all thread stacks for a while.
+
+    Args:
+        seconds: How long to sample
+        interval: Seconds between samples
+        exclude_threads: Thread idents to leave out (besides the sampler)
+
+    Returns:
+        Dict mapping collapsed stack -> number of samples
+    """
+    counts = {}
+    excluded = set(exclude_threads)
+
+    def run():
+        excluded.add(threading.get_ident())
+        deadline = time.monotonic() + seconds
+        while time.monotonic() < deadline:
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id in excluded:
+                    continue
+                stack = _collapse(frame)
+                counts[stack] = counts.get(stack, 0) + 1
+            time.sleep(interval)
+
+    sampler = threading.Thread(target=run, name="fitmentor-profiler", daemon=True)
+    sampler.start()
+    sampler.join()
+    return counts
+
+
+def format_collapsed(counts):
+    """Format stack counts as collapsed-stack lines, most frequent first."""
+    lines = sorted(counts.items(), key=lambda item: (-item[1], item[0]))
+    return "".join(f"{stack} {count}\n" for stack, count in lines)
+
+
+_record_lock = threading.Lock()
+_last_finished = None
+
+
+def _parse_number(value, name, default, minimum, maximum):
+    if value is None:
+        return default
+    try:
+        number = float(value)
+    except (TypeError, ValueError):
+        raise ValidationError(f"{name} must be a number")
+    if not minimum <= number <= maximum:
+        raise ValidationError(f"{name} must be between {minimum} and {maximum}")
+    return number
+
+
+def record(seconds=None, interval=None):
+    """Record collapsed stacks of all other threads (rate-limited).
+
+    Args:
+        seconds: Recording length (default 5, at most MAX_SECONDS)
+        interval: Sampling interval in seconds (default 0.005)
+
+    Returns:
+        Collapsed-stack text
+
+    Raises:
+        ValidationError: bad parameters
+        ProfilerBusy: another recording runs or the cooldown hasn't passed
+    """
+    global _last_finished
+
+    seconds = _parse_number(seconds, "seconds", DEFAULT_SECONDS, 0.1, MAX_SECONDS)
+    interval = _parse_number(interval, "interval", DEFAULT_INTERVAL, MIN_INTERVAL, 1)
+
+    if not _record_lock.acquire(blocking=False):
+        raise ProfilerBusy(COOLDOWN_SECONDS)
+
+    try:
+        if _last_finished is not None:
+            wait = _last_finished + COOLDOWN_SECONDS - time.monotonic()
+            if wait > 0:
+                raise ProfilerBusy(wait)
+
+        counts = sample_stacks(seconds, interval, exclude_threads=[threading.get_ident()])
+        _last_finished = time.monotonic()
+        return format_collapsed(counts)
+    finally:
+        _record_lock.release()
+
+
+def start_profile():
+    """Start a cProfile profile of the calling thread."""
+    profile = cProfile.Profile()
+    profile.enable()
+    return profile
+
+
+def summarize(profile):
+    """Stop a profile and return its top functions by cumulative time."""
+    profile.disable()
+    out = io.StringIO()
+    pstats.Stats(profile, stream=out).sort_stats("cumulative").print_stats(SUMMARY_LINES)
+    return out.getvalue()
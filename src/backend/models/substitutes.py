@@ -0,0 +1,135 @@
+"""Precomputed substitute graph for fast exercise swaps.
+
+For every exercise the graph holds the tier-ordered alternatives that share its
+sub-region and type, each annotated with its movement pattern and an equipment
+bitmask. Swap lookups then only walk the (short) list of alternatives instead
+of filtering the whole catalog.
+
+The graph is built once per catalog snapshot and stored on it, so a catalog
+reload gets a fresh graph on first use.
+"""
+
+from .catalog import get_catalog
+from .exercise_data import EQUIPMENT, TIER_RANK
+
+# One bit per equipment type, in EQUIPMENT order
+EQUIPMENT_BITS = {eq: 1 << i for i, eq in enumerate(EQUIPMENT)}
+
+
+def equipment_mask(equipment_list):
+    """Return the bitmask for a list of (valid) equipment names."""
+    mask = 0
+    for eq in equipment_list:
+        mask |= EQUIPMENT_BITS[eq]
+    return mask
+
+
+def _make_node(exercise, pattern):
+    """Build the compact graph node for an exercise."""
+    return {
+        "id": exercise["id"],
+        "name": exercise["name"],
+        "sub_region": exercise["sub_region"],
+        "type": exercise["type"],
+        "nippard_tier": exercise.get("nippard_tier"),
+        "difficulty": exercise["difficulty"],
+        "equipment": exercise["equipment"],
+        "pattern": pattern,
+        "equipment_mask": equipment_mask(exercise["equipment"]),
+    }
+
+
+def build_substitute_graph(exercises, pattern_of):
+    """Build the substitute graph for a list of exercises.
+
+    Args:
+        exercises: Exercise records
+        pattern_of: Callable returning an exercise ID's movement pattern
+
+    Returns:
+        Dict mapping exercise ID -> tuple of substitute nodes, sorted by tier
+        (highest first) then by name, excluding the exercise itself.
+    """
+    groups = {}
+    for exercise in exercises:
+        key = (exercise["sub_region"], exercise["type"])
+        groups.setdefault(key, []).append(exercise)
+
+    graph = {}
+    for group in groups.values():
+        group.sort(key=lambda e: (-TIER_RANK.get(e.get("nippard_tier"), 0), e["name"]))
+        nodes = [_make_node(e, pattern_of(e["id"])) for e in group]
+        for exercise in group:
+            graph[exercise["id"]] = tuple(n for n in nodes if n["id"] != exercise["id"])
+
+    return graph
+
+
+def get_substitute_graph(catalog=None):
+    """Return the substitute graph of a catalog snapshot (default: current)."""
+    if catalog is None:
+        catalog = get_catalog()
+    return catalog.derived(
+        "substitute_graph",
+        lambda c: build_substitute_graph(c.exercises, c.pattern_of),
+    )
+
+
+def get_substitute_nodes(exercise_id, equipment=None, catalog=None):
+    """Return substitute nodes for an exercise, optionally limited by equipment.
+
+    Args:
+        exercise_id: The exercise to find substitutes for (string slug)
+        equipment: Optional list of available equipment
+        catalog: CatalogSnapshot to read from (defaults to the current one)
+
+    Returns:
+        List of substitute nodes in tier order, or None if the exercise is unknown
+    """
+    nodes = get_substitute_graph(catalog).get(exercise_id)
+    if nodes is None:
+        return None
+
+    if equipment is None:
+        return list(nodes)
+
+    missing = ~equipment_mask(equipment)
+    return [n for n in nodes if not n["equipment_mask"] & missing]
+
+
+def get_day_substitutes(exercise_id, day_exercise_ids, equipment=None, catalog=None):
+    """Return substitutes that keep a workout day free of pattern redundancy.
+
+    Candidates come from the substitute graph, so they share the exercise's
+    sub-region and type. Any candidate already in the day, or whose movement
+    pattern is used by another exercise in the day, is dropped.
+
+    Args:
+        exercise_id: The exercise being swapped out (string slug)
+        day_exercise_ids: IDs of all exercises currently in the workout day
+        equipment: Optional list of available equipment
+        catalog: CatalogSnapshot to read from (defaults to the current one)
+
+    Returns:
+        List of substitute nodes in tier order, or None if the exercise is unknown
+    """
+    if catalog is None:
+        catalog = get_catalog()
+
+    nodes = get_substitute_nodes(exercise_id, equipment, catalog)
+    if nodes is None:
+        return None
+
+    day_ids = set(day_exercise_ids)
+    day_patterns = set()
+    for day_id in day_ids:
+        if day_id == exercise_id:
+            continue
+        pattern = catalog.pattern_of(day_id)
+        if pattern:
+            day_patterns.add(pattern)
+
+    return [
+        n for n in nodes
+        if n["id"] not in day_ids and n["pattern"] not in day_patterns
+    ]
@@ -0,0 +1,212 @@
+"""NumPy-backed exercise selection engine.
+
+VectorizedExerciseSelector produces exactly the same selections as the
+reference ExerciseSelector, but represents the feasible catalog as parallel
+NumPy arrays (tier rank, sub-region id, pattern id, type, equipment mask) and
+computes each greedy step as a masked argmax instead of looping over dicts.
+The gain is small for the built-in catalog and grows with catalog size.
+
+NumPy is optional: when it is not installed, NUMPY_AVAILABLE is False and the
+suggester falls back to the reference engine.
+"""
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - exercised only without numpy
+    np = None
+
+from .exercise_data import TIER_RANK
+from .substitutes import equipment_mask
+from .workout_generator import ExerciseSelector
+
+NUMPY_AVAILABLE = np is not None
+
+TYPE_IDS = {"compound": 0, "isolation": 1}
+
+# Bonus added to a candidate's tier for covering a new sub-region.
+# Must match the reference ExerciseSelector's Phase 2 scoring.
+COVERAGE_BONUS = 10
+
+
+class VectorizedExerciseSelector(ExerciseSelector):
+    """ExerciseSelector with array-based candidate scoring."""
+
+    def __init__(self, available_equipment: list[str], experience: str, catalog=None):
+        """Initialize selector and build the catalog arrays.
+
+        Args:
+            available_equipment: List of available equipment
+            experience: User experience level (beginner, intermediate, advanced)
+            catalog: CatalogSnapshot to select from (defaults to the current one)
+        """
+        if not NUMPY_AVAILABLE:
+            raise RuntimeError("VectorizedExerciseSelector requires numpy")
+
+        super().__init__(available_equipment, experience, catalog)
+
+        # Rows are in reference tier order: highest tier first, then by name
+        # (stable, so ties keep catalog order just like _sort_by_tier)
+        self._rows = self._sort_by_tier(self.available_exercises)
+        self._row_by_id = {e["id"]: i for i, e in enumerate(self._rows)}
+
+        self._sub_region_ids = {}
+        self._pattern_ids = {}
+        for e in self._rows:
+            self._sub_region_ids.setdefault(e["sub_region"], len(self._sub_region_ids))
+            pattern = self.pattern_of(e["id"])
+            if pattern:
+                self._pattern_ids.setdefault(pattern, len(self._pattern_ids))
+
+        # Exercises without a pattern point at an extra slot that is never "used"
+        no_pattern = len(self._pattern_ids)
+
+        self.tier_rank = np.array(
+            [TIER_RANK.get(e.get("nippard_tier"), 0) for e in self._rows], dtype=np.int64
+        )
+        self.sub_region_id = np.array(
+            [self._sub_region_ids[e["sub_region"]] for e in self._rows], dtype=np.int64
+        )
+        self.pattern_id = np.array(
+            [self._pattern_ids.get(self.pattern_of(e["id"]), no_pattern) for e in self._rows],
+            dtype=np.int64,
+        )
+        self.type_id = np.array(
+            [TYPE_IDS.get(e["type"], -1) for e in self._rows], dtype=np.int64
+        )
+        self.equipment_mask = np.array(
+            [equipment_mask(e["equipment"]) for e in self._rows], dtype=np.int64
+        )
+
+        # Per-sub-region row lists, already in tier order
+        self._rows_by_sub_region = {}
+        for i, e in enumerate(self._rows):
+            self._rows_by_sub_region.setdefault(e["sub_region"], []).append(e)
+
+    def _get_exercises_for_subregion(self, sub_region: str) -> list[dict]:
+        """Get all available exercises for a sub-region, sorted by tier."""
+        return list(self._rows_by_sub_region.get(sub_region, []))
+
+    def _row_mask(self, exercise_ids) -> "np.ndarray":
+        """Boolean mask of the rows for a collection of exercise IDs."""
+        mask = np.zeros(len(self._rows), dtype=bool)
+        rows = [self._row_by_id[i] for i in exercise_ids if i in self._row_by_id]
+        mask[rows] = True
+        return mask
+
+    def _pattern_mask(self, used_patterns: set[str]) -> "np.ndarray":
+        """Boolean mask over pattern ids (plus the no-pattern slot)."""
+        mask = np.zeros(len(self._pattern_ids) + 1, dtype=bool)
+        ids = [self._pattern_ids[p] for p in used_patterns if p in self._pattern_ids]
+        mask[ids] = True
+        return mask
+
+    def _take(self, row, selected, covered_sub, used_mask, used_patterns):
+        """Mark a row as selected and update coverage and pattern state."""
+        exercise = self._rows[row]
+        selected.append(exercise)
+        covered_sub[self.sub_region_id[row]] = True
+        pattern = self.pattern_of(exercise["id"])
+        if pattern:
+            used_patterns.add(pattern)
+            used_mask[self.pattern_id[row]] = True
+        return exercise
+
+    def select_for_muscle_group(
+        self,
+        muscle_group: str,
+        used_patterns: set[str] | None = None,
+        target_subregions: list[str] | None = None,
+        excluded_exercise_ids: set[str] | None = None,
+        target_count: int | None = None,
+    ) -> tuple[list[dict], set[str], list[str]]:
+        """Select exercises for a muscle group with intelligent coverage.
+
+        Same contract and results as ExerciseSelector.select_for_muscle_group.
+        """
+        if used_patterns is None:
+            used_patterns = set()
+        if excluded_exercise_ids is None:
+            excluded_exercise_ids = set()
+
+        warnings = []
+        selected = []
+
+        subregions = self._resolve_subregions(muscle_group, target_subregions)
+
+        if target_count is None:
+            target_count = self.config["exercises_per_muscle"]
+
+        # Phase 0: top-tier (S+, S) main lifts with pattern diversity. The
+        # candidate list is tiny, so the reference implementation is reused.
+        top_tier_exercises = self._get_top_tier_exercises(subregions)
+        phase0_selected, used_patterns = self._select_with_pattern_diversity(
+            top_tier_exercises, target_count, used_patterns, muscle_group
+        )
+
+        n_rows = len(self._rows)
+        covered_sub = np.zeros(len(self._sub_region_ids), dtype=bool)
+        for exercise in phase0_selected:
+            selected.append(exercise)
+            covered_sub[self._sub_region_ids[exercise["sub_region"]]] = True
+
+        # Position of each row's sub-region in the target list (-1 = not targeted)
+        target_sub_ids = [self._sub_region_ids.get(sr, -1) for sr in subregions]
+        sub_position = np.full(len(self._sub_region_ids) + 1, -1, dtype=np.int64)
+        for pos, sub_id in enumerate(target_sub_ids):
+            # First occurrence wins, like list.index() in the reference
+            if sub_position[sub_id] < 0:
+                sub_position[sub_id] = pos
+        row_position = sub_position[self.sub_region_id]
+        targeted = row_position >= 0
+
+        taken = self._row_mask(e["id"] for e in selected)
+        excluded = self._row_mask(excluded_exercise_ids)
+        used_mask = self._pattern_mask(used_patterns)
+
+        # Phase 1: Ensure each target sub-region has at least one exercise
+        for subregion, sub_id in zip(subregions, target_sub_ids):
+            if len(selected) >= target_count:
+                break
+
+            if sub_id >= 0 and covered_sub[sub_id]:
+                continue  # Already covered by top-tier exercise
+
+            if sub_id >= 0:
+                feasible = (self.sub_region_id == sub_id) & ~taken & ~excluded \
+                    & ~used_mask[self.pattern_id]
+                row = int(np.argmax(feasible))
+                if feasible[row]:
+                    self._take(row, selected, covered_sub, used_mask, used_patterns)
+                    taken[row] = True
+                    continue
+
+            # No valid exercise found for this sub-region
+            if self.config["require_all_subregions"]:
+                warnings.append(
+                    f"Could not find non-redundant exercise for {subregion}"
+                )
+
+        # Phase 2: Fill remaining volume with the best available exercise.
+        # Ties go to the earliest sub-region in the target list, then to tier
+        # order, matching the reference iteration order.
+        tie_break = row_position * n_rows + np.arange(n_rows)
+        tie_span = (len(subregions) + 1) * n_rows
+        while len(selected) < target_count:
+            feasible = targeted & ~taken & ~excluded & ~used_mask[self.pattern_id]
+            if not feasible.any():
+                break
+
+            score = self.tier_rank + COVERAGE_BONUS * ~covered_sub[self.sub_region_id]
+            key = np.where(feasible, score * tie_span - tie_break, np.iinfo(np.int64).min)
+            row = int(np.argmax(key))
+
+            self._take(row, selected, covered_sub, used_mask, used_patterns)
+            taken[row] = True
+
+        covered_subregions = {
+            sr for sr, sub_id in zip(subregions, target_sub_ids)
+            if sub_id >= 0 and covered_sub[sub_id]
+        }
+        warnings.extend(self._coverage_warnings(subregions, covered_subregions))
+
+        return selected, used_patterns, warnings
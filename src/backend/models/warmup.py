@@ -0,0 +1,159 @@
+"""Cache warm-up from historical request logs.
+
+After a deploy every per-process cache is cold: the catalog's derived
+indexes, and the plan contexts (selector plus per-day state) that
+suggest() caches per input. The warm-up stage builds them before real
+traffic arrives:
+
+1. Build the catalog indexes (compat tables, substitute graph, codec
+   templates, fingerprint) and any extra ones the app registers.
+2. Read the newest MAX_BYTES of workout_plans.jsonl and count inputs by
+   their canonical key (input_key()).
+3. Run suggest() for the TOP_K most frequent inputs, which fills the
+   plan-context cache. Later suggest() calls for those inputs reuse the
+   cached selector, and suggest_day() calls reuse the whole context.
+
+Calorie calculations aren't cached, so calorie_calculations.jsonl has
+nothing to warm.
+
+start() runs this on a daemon thread. status() and wait() report
+progress, so readiness checks can hold traffic until it's done. Failures
+are recorded in status() and never stop the server.
+
+Configuration:
+    FITMENTOR_WARMUP_TOP_K: distinct inputs to pre-build (default 32)
+    FITMENTOR_WARMUP_MAX_BYTES: how much of the log tail to read (default 4 MB)
+"""
+
+import json
+import os
+import threading
+import time
+from collections import Counter
+
+from . import data_collector, workout_codec, workout_suggester
+from .catalog import get_catalog
+from .exercises import get_all_exercises
+from .substitutes import get_substitute_graph
+
+TOP_K = int(os.environ.get("FITMENTOR_WARMUP_TOP_K", "32"))
+MAX_BYTES = int(os.environ.get("FITMENTOR_WARMUP_MAX_BYTES", str(4 * 1024 * 1024)))
+
+WORKOUT_LOG = "workout_plans.jsonl"
+
+_state = {"status": "idle", "inputs": 0, "seconds": None, "error": None}
+_state_lock = threading.Lock()
+_done = threading.Event()
+
+
+def read_recent_inputs(filename, max_bytes=MAX_BYTES):
+    """Yield the "input" of each record in the newest max_bytes of a log."""
+    filepath = data_collector.DATA_DIR / filename
+    try:
+        f = open(filepath, "rb")
+    except FileNotFoundError:
+        return
+
+    with f:
+        size = os.fstat(f.fileno()).st_size
+        if size > max_bytes:
+            f.seek(size - max_bytes)
+            # Skip the partial first line
+            f.readline()
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                continue
+            if isinstance(record, dict) and isinstance(record.get("input"), dict):
+                yield record["input"]
+
+
+def top_workout_inputs(k=TOP_K, max_bytes=MAX_BYTES):
+    """Return the k most frequent valid suggest() inputs, most frequent first."""
+    counts = Counter()
+    examples = {}
+    for data in read_recent_inputs(WORKOUT_LOG, max_bytes):
+        try:
+            workout_suggester.validate_input(data)
+        except (workout_suggester.ValidationError, TypeError, KeyError):
+            continue
+        key = workout_suggester.input_key(data)
+        counts[key] += 1
+        examples.setdefault(key, data)
+    return [examples[key] for key, _ in counts.most_common(k)]
+
+
+def warm_catalog(catalog=None):
+    """Build the catalog's derived indexes."""
+    catalog = catalog or get_catalog()
+    catalog.fingerprint
+    get_all_exercises(catalog)
+    get_substitute_graph(catalog)
+    workout_codec.get_templates(catalog)
+
+
+def _set_state(**values):
+    with _state_lock:
+        _state.update(values)
+
+
+def run(k=TOP_K, max_bytes=MAX_BYTES, extra=()):
+    """Warm the caches in this thread.
+
+    Args:
+        k: Number of distinct inputs to pre-build
+        max_bytes: How much of the log tail to read
+        extra: Callables taking the catalog snapshot, for app-level indexes
+
+    Returns:
+        The final status()
+    """
+    _done.clear()
+    _set_state(status="running", inputs=0, seconds=None, error=None)
+    start = time.perf_counter()
+    try:
+        catalog = get_catalog()
+        warm_catalog(catalog)
+        for build in extra:
+            build(catalog)
+
+        inputs = top_workout_inputs(k, max_bytes)
+        for data in inputs:
+            workout_suggester.suggest(data)
+        _set_state(status="done", inputs=len(inputs))
+    except Exception as e:
+        # A failed warm-up only means a slower start
+        _set_state(status="failed", error=f"{type(e).__name__}: {e}")
+    finally:
+        _set_state(seconds=round(time.perf_counter() - start, 3))
+        _done.set()
+    return status()
+
+
+def start(k=TOP_K, max_bytes=MAX_BYTES, extra=()):
+    """Run the warm-up on a background daemon thread."""
+    _done.clear()
+    _set_state(status="pending")
+    thread = threading.Thread(
+        target=run, args=(k, max_bytes, extra), name="fitmentor-warmup", daemon=True
+    )
+    thread.start()
+    return thread
+
+
+def status():
+    """Return the warm-up state: status (idle, pending, running, done or
+    failed), inputs warmed, seconds taken and error."""
+    with _state_lock:
+        return dict(_state)
+
+
+def wait(timeout=None):
+    """Wait for a started warm-up; returns False on timeout."""
+    if status()["status"] == "idle":
+        return True
+    return _done.wait(timeout)
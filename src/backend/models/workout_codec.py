@@ -0,0 +1,185 @@
+"""Compact, catalog-referenced encoding for saved workout plans.
+
+Every exercise entry in a plan repeats fields that come straight from the
+exercise catalog (name, muscle_group, sub_region, type, tier, targets). The
+compact encoding replaces each entry with its exercise ID plus only what
+can't be rebuilt:
+
+- per-instance fields (sets, reps, rest_seconds, ...) that differ from the
+  plan-wide most common value, which is stored once in `defaults`
+- catalog fields whose value differs from the catalog (e.g. an edited name)
+- the names of expected fields the entry doesn't have
+
+An entry is encoded as the bare ID string when nothing else is needed, and
+as [id, fields] or [id, fields, omitted] otherwise. Entries whose ID isn't
+in the catalog are kept as they are (dicts). A plan with an entry that
+isn't a dict can't be told apart from an encoded one, so it isn't encoded
+at all. Everything outside exercise entries is stored as-is.
+
+Decoding needs the catalog fields as they were at save time. Callers pass
+the templates for the catalog fingerprint stamped on the record (see
+workout_storage). Decoding gives back an equal plan. Key order within
+exercise entries follows the suggester's order.
+"""
+
+import copy
+import json
+from collections import Counter
+
+from .catalog import get_catalog
+
+ENCODING = "compact-v1"
+
+# Plan-entry fields taken from the catalog, in plan-entry order
+CATALOG_FIELDS = ("name", "muscle_group", "sub_region", "type", "tier", "targets")
+
+# Field order of a plan entry built by the suggester
+ENTRY_ORDER = ("id", "name", "muscle_group", "sub_region", "sets", "reps",
+               "rest_seconds", "type", "tier", "targets")
+
+
+def exercise_template(exercise):
+    """The catalog fields of a plan entry for a catalog exercise."""
+    # Same derivation as workout_suggester.build_workout_day
+    return {
+        "name": exercise["name"],
+        "muscle_group": exercise["muscle_group"],
+        "sub_region": exercise["sub_region"],
+        "type": exercise["type"],
+        "tier": exercise.get("nippard_tier", "-"),
+        "targets": exercise.get("targets", []),
+    }
+
+
+def build_templates(catalog):
+    """Return {exercise id: template} for a catalog snapshot."""
+    return {e["id"]: exercise_template(e) for e in catalog.exercises}
+
+
+def get_templates(catalog=None):
+    """Templates for a snapshot (default: the current one), built once per snapshot."""
+    catalog = catalog or get_catalog()
+    return catalog.derived("workout_codec.templates", build_templates)
+
+
+def _key(value):
+    # Type-exact comparison (True != 1, 3 != 3.0) via the JSON encoding
+    return json.dumps(value, sort_keys=True)
+
+
+def _day_exercises(workout):
+    """Yield the exercise lists of a plan, or None if it isn't plan-shaped."""
+    if not isinstance(workout, dict) or not isinstance(workout.get("workouts"), list):
+        return None
+    lists = []
+    for day in workout["workouts"]:
+        if not isinstance(day, dict) or not isinstance(day.get("exercises"), list):
+            return None
+        lists.append(day["exercises"])
+    return lists
+
+
+def _compactable(entry, templates):
+    return isinstance(entry, dict) and isinstance(entry.get("id"), str) and entry["id"] in templates
+
+
+def _plan_defaults(entries):
+    """Most common value of each per-instance field across the entries."""
+    counts = {}
+    values = {}
+    for entry in entries:
+        for field, value in entry.items():
+            if field == "id" or field in CATALOG_FIELDS:
+                continue
+            key = _key(value)
+            counts.setdefault(field, Counter())[key] += 1
+            values.setdefault(field, {})[key] = value
+    return {
+        field: values[field][counter.most_common(1)[0][0]]
+        for field, counter in counts.items()
+    }
+
+
+def _encode_entry(entry, template, defaults):
+    fields = {}
+    for field, value in entry.items():
+        if field == "id":
+            continue
+        expected = template.get(field, defaults.get(field))
+        if (field not in template and field not in defaults) or _key(value) != _key(expected):
+            fields[field] = value
+
+    omitted = [f for f in list(template) + list(defaults) if f not in entry]
+
+    if omitted:
+        return [entry["id"], fields, omitted]
+    if fields:
+        return [entry["id"], fields]
+    return entry["id"]
+
+
+def encode(workout, templates):
+    """Encode a plan compactly.
+
+    Returns:
+        (compact workout, defaults), or None if the workout isn't a plan or
+        has exercise entries that aren't dicts
+    """
+    exercise_lists = _day_exercises(workout)
+    if exercise_lists is None:
+        return None
+    # Strings and lists are how encoded entries look
+    if not all(isinstance(e, dict) for exercises in exercise_lists for e in exercises):
+        return None
+
+    compactable = [e for exercises in exercise_lists for e in exercises
+                   if _compactable(e, templates)]
+    defaults = _plan_defaults(compactable)
+
+    days = []
+    for day, exercises in zip(workout["workouts"], exercise_lists):
+        encoded = [
+            _encode_entry(e, templates[e["id"]], defaults) if _compactable(e, templates) else e
+            for e in exercises
+        ]
+        days.append(dict(day, exercises=encoded))
+    return dict(workout, workouts=days), defaults
+
+
+def _decode_entry(encoded, templates, defaults):
+    if isinstance(encoded, dict):
+        return encoded
+    if isinstance(encoded, str):
+        exercise_id, fields, omitted = encoded, {}, ()
+    else:
+        exercise_id, fields = encoded[0], encoded[1]
+        omitted = encoded[2] if len(encoded) > 2 else ()
+
+    template = templates.get(exercise_id, {})
+    entry = {"id": exercise_id}
+    for field in ENTRY_ORDER[1:] + tuple(defaults) + tuple(fields):
+        if field in entry or field in omitted:
+            continue
+        if field in fields:
+            entry[field] = fields[field]
+        elif field in template:
+            entry[field] = copy.deepcopy(template[field])
+        elif field in defaults:
+            entry[field] = copy.deepcopy(defaults[field])
+    return entry
+
+
+def decode(compact, defaults, templates):
+    """Rebuild a plan encoded by encode().
+
+    Args:
+        compact: The compact workout
+        defaults: The defaults returned by encode()
+        templates: Templates of the catalog the plan was encoded against.
+            IDs missing from it come back with only their stored fields.
+    """
+    days = [
+        dict(day, exercises=[_decode_entry(e, templates, defaults) for e in day["exercises"]])
+        for day in compact["workouts"]
+    ]
+    return dict(compact, workouts=days)
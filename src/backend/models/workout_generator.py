@@ -7,13 +7,13 @@ This module provides evidence-based exercise selection that ensures:
 4. Exercise difficulty matches user experience level
 """
 
+from .catalog import get_catalog
 from .exercise_data import (
-    ALL_EXERCISES,
     SUB_REGIONS,
     TIER_RANK,
     DIFFICULTY_RANK,
 )
-from .movement_patterns import get_movement_pattern, are_exercises_redundant
+from .movement_patterns import are_exercises_redundant
 
 
 # Volume guidelines by experience level
@@ -83,20 +83,24 @@ ESSENTIAL_PATTERNS = {
 class ExerciseSelector:
     """Intelligent exercise selection for workout generation."""
 
-    def __init__(self, available_equipment: list[str], experience: str):
+    def __init__(self, available_equipment: list[str], experience: str, catalog=None):
         """Initialize selector with constraints.
 
         Args:
             available_equipment: List of available equipment
             experience: User experience level (beginner, intermediate, advanced)
+            catalog: CatalogSnapshot to select from (defaults to the current one)
         """
+        self.catalog = catalog if catalog is not None else get_catalog()
+        self.pattern_of = self.catalog.pattern_of
         self.equipment = set(available_equipment)
         self.experience = experience
-        self.config = VOLUME_BY_EXPERIENCE[experience]
+        # Copy so per-selector changes never leak into the shared defaults
+        self.config = dict(VOLUME_BY_EXPERIENCE[experience])
 
         # Filter exercises by equipment availability
         self.available_exercises = [
-            e for e in ALL_EXERCISES
+            e for e in self.catalog.exercises
             if set(e["equipment"]).issubset(self.equipment)
         ]
 
@@ -150,7 +154,7 @@ class ExerciseSelector:
         # Group candidates by movement pattern
         by_pattern = {}
         for e in candidates:
-            pattern = get_movement_pattern(e["id"])
+            pattern = self.pattern_of(e["id"])
             if pattern:
                 if pattern not in by_pattern:
                     by_pattern[pattern] = []
@@ -195,7 +199,7 @@ class ExerciseSelector:
         for e in remaining:
             if len(selected) >= target_count:
                 break
-            pattern = get_movement_pattern(e["id"])
+            pattern = self.pattern_of(e["id"])
             if pattern and pattern in used_patterns:
                 continue
             selected.append(e)
@@ -205,6 +209,36 @@ class ExerciseSelector:
 
         return selected, used_patterns
 
+    def _resolve_subregions(
+        self,
+        muscle_group: str,
+        target_subregions: list[str] | None,
+    ) -> list[str]:
+        """Determine which sub-regions to target for a muscle group."""
+        if target_subregions:
+            subregions = target_subregions
+        else:
+            subregions = SUB_REGIONS.get(muscle_group, [])
+
+        # For beginners, prioritize main sub-regions
+        if not self.config["require_all_subregions"]:
+            priority = PRIORITY_SUBREGIONS.get(muscle_group, subregions[:2])
+            subregions = [sr for sr in priority if sr in subregions]
+
+        return subregions
+
+    def _coverage_warnings(
+        self,
+        subregions: list[str],
+        covered_subregions: set[str],
+    ) -> list[str]:
+        """Warn about target sub-regions left uncovered."""
+        # In target order, so the text is the same in every process
+        missing = [sr for sr in subregions if sr not in covered_subregions]
+        if missing and self.config["require_all_subregions"]:
+            return [f"Missing coverage for: {', '.join(missing)}"]
+        return []
+
     def get_lower_tier_exercise_ids(self, exercises: list[dict]) -> set[str]:
         """Return IDs of exercises that are NOT S+ or S tier.
 
@@ -219,6 +253,7 @@ class ExerciseSelector:
         used_patterns: set[str] | None = None,
         target_subregions: list[str] | None = None,
         excluded_exercise_ids: set[str] | None = None,
+        target_count: int | None = None,
     ) -> tuple[list[dict], set[str], list[str]]:
         """Select exercises for a muscle group with intelligent coverage.
 
@@ -229,6 +264,8 @@ class ExerciseSelector:
             excluded_exercise_ids: Exercise IDs to exclude (for variant differentiation).
                                    Note: S+/S tier exercises ignore this exclusion to
                                    maintain consistency across variants.
+            target_count: Number of exercises to select. Defaults to the
+                          experience level's exercises_per_muscle.
 
         Returns:
             Tuple of (selected_exercises, updated_used_patterns, warnings)
@@ -242,18 +279,10 @@ class ExerciseSelector:
         selected = []
         selected_ids = set()
 
-        # Determine which sub-regions to target
-        if target_subregions:
-            subregions = target_subregions
-        else:
-            subregions = SUB_REGIONS.get(muscle_group, [])
+        subregions = self._resolve_subregions(muscle_group, target_subregions)
 
-        # For beginners, prioritize main sub-regions
-        if not self.config["require_all_subregions"]:
-            priority = PRIORITY_SUBREGIONS.get(muscle_group, subregions[:2])
-            subregions = [sr for sr in priority if sr in subregions]
-
-        target_count = self.config["exercises_per_muscle"]
+        if target_count is None:
+            target_count = self.config["exercises_per_muscle"]
         covered_subregions = set()
 
         # Phase 0: ALWAYS include top-tier (S+, S) exercises first - these are the "main" lifts
@@ -289,7 +318,7 @@ class ExerciseSelector:
                 if exercise["id"] in excluded_exercise_ids:
                     continue
 
-                pattern = get_movement_pattern(exercise["id"])
+                pattern = self.pattern_of(exercise["id"])
                 if pattern and pattern in used_patterns:
                     continue
 
@@ -325,7 +354,7 @@ class ExerciseSelector:
                     if exercise["id"] in excluded_exercise_ids:
                         continue
 
-                    pattern = get_movement_pattern(exercise["id"])
+                    pattern = self.pattern_of(exercise["id"])
                     if pattern and pattern in used_patterns:
                         continue
 
@@ -346,14 +375,11 @@ class ExerciseSelector:
             selected.append(best_candidate)
             selected_ids.add(best_candidate["id"])
             covered_subregions.add(best_candidate["sub_region"])
-            pattern = get_movement_pattern(best_candidate["id"])
+            pattern = self.pattern_of(best_candidate["id"])
             if pattern:
                 used_patterns.add(pattern)
 
-        # Check coverage and generate warnings
-        missing = set(subregions) - covered_subregions
-        if missing and self.config["require_all_subregions"]:
-            warnings.append(f"Missing coverage for: {', '.join(missing)}")
+        warnings.extend(self._coverage_warnings(subregions, covered_subregions))
 
         return selected, used_patterns, warnings
 
@@ -429,7 +455,8 @@ def generate_workout(
 def validate_workout(
     exercises: list[dict],
     muscle_groups: list[str],
-    target_subregions: dict[str, list[str]] | None = None
+    target_subregions: dict[str, list[str]] | None = None,
+    catalog=None,
 ) -> list[str]:
     """Validate a workout for proper coverage and redundancy.
 
@@ -439,11 +466,13 @@ def validate_workout(
         target_subregions: Optional dict mapping muscle_group -> list of expected sub-regions.
                           If provided, only checks for these specific sub-regions.
                           If None, checks all sub-regions for each muscle group.
+        catalog: CatalogSnapshot for pattern lookups (defaults to the current one)
 
     Returns:
         List of warning messages
     """
     warnings = []
+    pattern_of = (catalog if catalog is not None else get_catalog()).pattern_of
 
     # Group exercises by muscle group
     by_muscle = {}
@@ -464,11 +493,13 @@ def validate_workout(
 
         # Determine required sub-regions
         if target_subregions and muscle_group in target_subregions:
-            required = set(target_subregions[muscle_group])
+            required = target_subregions[muscle_group]
         else:
-            required = set(SUB_REGIONS.get(muscle_group, []))
+            required = SUB_REGIONS.get(muscle_group, [])
 
-        missing = required - covered
+        # In declaration order (not set order), so the text is the same in
+        # every process
+        missing = [sr for sr in dict.fromkeys(required) if sr not in covered]
 
         if missing:
             warnings.append(
@@ -478,7 +509,7 @@ def validate_workout(
     # Check for movement pattern redundancy
     patterns_seen = {}
     for e in exercises:
-        pattern = get_movement_pattern(e["id"])
+        pattern = pattern_of(e["id"])
         if pattern:
             if pattern in patterns_seen:
                 warnings.append(
@@ -1,12 +1,85 @@
-"""Workout save/load functionality using JSON Lines format."""
+"""Workout save/load functionality using JSON Lines format.
+
+Records are partitioned into shard files by a stable hash (CRC-32) of the
+normalized name. Each shard has its own locks and cache, so saves to
+different shards don't wait for each other, and each operation only
+touches one shard. The shard count is stored in a small layout manifest
+(saved_workouts.layout.json). Without a manifest there is one shard: the
+original saved_workouts.jsonl.
+
+Saving is a read-modify-write of one shard file, so it runs under an
+exclusive lock: an in-process writer lock plus an fcntl lock for other
+processes. Reads take shared locks. Shard files are replaced atomically
+(see locking.py), so readers and crashes never see a partial file.
+
+Parsed records are cached in memory per shard. Each read stats the file
+and compares its mtime, ctime, size, inode and device with the cached
+copy. If nothing changed, the read is a dict lookup; any change triggers
+a full re-read. Since replaces can reuse an inode within one timestamp
+tick, saves also compare a CRC-32 of the file's bytes before rewriting
+the shard from the cache, so another process's write is never lost.
+Saves install what they wrote directly, so they don't invalidate the
+cache.
+
+With STORAGE_ENCODING = "compact", plans are stored as exercise
+references plus overrides (see workout_codec.py). The record is stamped
+with the catalog fingerprint, and that catalog's templates are archived
+under catalog_archive/, so records decode exactly after the catalog
+changes.
+
+Resharding (reshard()) runs while the app is serving. It records the
+target shard count in the manifest ("migrating_to"). From then on, saves
+go to the new shards and lookups try the new shards before the old ones.
+Old records are copied to the new shards unless a newer save already put
+the name there. Then the manifest is switched over and the old files are
+removed. Every operation holds a shared lock on the manifest, and the
+manifest only changes under an exclusive one, so no operation sees half
+of a layout change. An interrupted reshard is resumed by running it again
+with the same shard count.
+"""
 
 import json
+import logging
+import os
 import re
+import threading
+import zlib
+from contextlib import contextmanager
 from datetime import datetime
 from pathlib import Path
 
+from . import workout_codec
+from .catalog import get_catalog
+from .locking import RWLock, atomic_write_lines, file_lock
+from .metrics import Counter, timed
+
+logger = logging.getLogger(__name__)
+
 DATA_DIR = Path(__file__).parent.parent / "data"
 SAVED_WORKOUTS_FILE = "saved_workouts.jsonl"
+LAYOUT_FILE = "saved_workouts.layout.json"
+# Catalog templates that compact records were encoded against, by fingerprint
+CATALOG_ARCHIVE_DIR = "catalog_archive"
+
+# "compact" stores plans by exercise reference (see workout_codec.py);
+# "full" stores them verbatim. Both encodings are always readable.
+STORAGE_ENCODING = os.environ.get("FITMENTOR_STORAGE_ENCODING", "full")
+
+MAX_SHARDS = 256
+
+# Guards the layout manifest within this process
+_layout_rwlock = RWLock()
+
+CACHE_LOOKUPS = Counter(
+    "fitmentor_workout_cache_total",
+    "Saved-workout cache lookups by result (hit, reload)",
+    ["result"],
+)
+
+
+class ValidationError(Exception):
+    """Raised for an invalid reshard request."""
+    pass
 
 
 def ensure_data_dir():
@@ -55,34 +128,331 @@ def validate_name(name):
     return True, ""
 
 
-def _read_all_records():
-    """Read all records from the JSONL file."""
-    filepath = DATA_DIR / SAVED_WORKOUTS_FILE
+@contextmanager
+def _locked(filepath, rwlock, shared):
+    """Hold the in-process and cross-process locks for a data file."""
+    with (rwlock.read() if shared else rwlock.write()):
+        if shared and not DATA_DIR.exists():
+            # Nothing saved yet and nothing to coordinate with
+            yield
+            return
+        ensure_data_dir()
+        with file_lock(filepath, shared=shared):
+            yield
 
-    if not filepath.exists():
-        return []
 
+def shard_filename(index, shard_count):
+    """File name of one shard. A single shard uses the original file name."""
+    if shard_count == 1:
+        return SAVED_WORKOUTS_FILE
+    stem = SAVED_WORKOUTS_FILE[:-len(".jsonl")]
+    return f"{stem}.{index:03d}-of-{shard_count:03d}.jsonl"
+
+
+def shard_index(normalized, shard_count):
+    """Shard holding a normalized name (stable across processes and runs)."""
+    return zlib.crc32(normalized.encode("utf-8")) % shard_count
+
+
+def _shard_path(normalized, shard_count):
+    return DATA_DIR / shard_filename(shard_index(normalized, shard_count), shard_count)
+
+
+def _shard_paths(shard_count):
+    return [DATA_DIR / shard_filename(i, shard_count) for i in range(shard_count)]
+
+
+def _parse_lines(data, source):
+    """Parse JSONL bytes into records.
+
+    Shard files are only ever replaced whole, so a line that doesn't parse
+    is damage, not a write in progress. It is skipped and logged.
+    """
     records = []
-    with open(filepath, "r") as f:
-        for line in f:
-            line = line.strip()
-            if line:
-                try:
-                    records.append(json.loads(line))
-                except json.JSONDecodeError:
-                    continue
+    for number, line in enumerate(data.splitlines(), 1):
+        stripped = line.strip()
+        if not stripped:
+            continue
+        try:
+            records.append(json.loads(stripped))
+        except json.JSONDecodeError as e:
+            logger.warning("%s: skipping unparsable line %d: %s", source, number, e)
+    return records
+
+
+def _read_file(filepath):
+    """Parse a shard file straight from disk, bypassing the cache."""
+    try:
+        with open(filepath, "rb") as f:
+            return _parse_lines(f.read(), filepath)
+    except FileNotFoundError:
+        return []
+
+
+def _stat_key(st):
+    return (st.st_mtime_ns, st.st_ctime_ns, st.st_size, st.st_ino, st.st_dev)
+
+
+class _RecordCache:
+    """Parsed contents of one shard file, keyed by its stat and checksum."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._clear()
+
+    def _clear(self):
+        self.path = None
+        self.stat_key = None
+        self.checksum = None
+        self.records = []
+        self.by_name = {}
+
+    def _load(self, filepath, records, checksum, st):
+        self.path = filepath
+        self.stat_key = _stat_key(st)
+        self.checksum = checksum
+        self.records = records
+        # First record with a name wins, as in a linear scan
+        self.by_name = {}
+        for record in records:
+            name = record.get("name")
+            if name is not None:
+                self.by_name.setdefault(name, record)
+
+    @timed("workout_storage.read")
+    def refresh(self, filepath, verify=False):
+        """Bring the cache up to date with the file; returns (records, by_name).
+
+        Any change to the file's stat means a full re-read. A replace can
+        reuse the old inode number and land within the same timestamp
+        tick, so a matching stat isn't proof: with verify=True (writers,
+        which rewrite the shard from what this returns) the file's
+        checksum must match too.
+
+        The returned objects are shared, so callers must not modify them.
+        """
+        with self._lock:
+            try:
+                f = open(filepath, "rb")
+            except FileNotFoundError:
+                self._clear()
+                return self.records, self.by_name
+
+            with f:
+                st = os.fstat(f.fileno())
+                fresh = filepath == self.path and _stat_key(st) == self.stat_key
+                if fresh and not verify:
+                    CACHE_LOOKUPS.inc(result="hit")
+                    return self.records, self.by_name
+
+                data = f.read()
+                checksum = zlib.crc32(data)
+                if fresh and checksum == self.checksum:
+                    CACHE_LOOKUPS.inc(result="hit")
+                    return self.records, self.by_name
+
+            CACHE_LOOKUPS.inc(result="reload")
+            self._load(filepath, _parse_lines(data, filepath), checksum, st)
+            return self.records, self.by_name
+
+    def install(self, filepath, records, data):
+        """Record that records were just written to filepath as data (bytes)."""
+        with self._lock:
+            st = os.stat(filepath)
+            if st.st_size != len(data):
+                # Someone else changed it in the meantime; re-read next time
+                self._clear()
+                return
+            self._load(filepath, records, zlib.crc32(data), st)
+
+    def invalidate(self):
+        with self._lock:
+            self._clear()
+
+
+class _Shard:
+    """Per-process state for one shard file: its lock and record cache."""
+
+    def __init__(self):
+        self.rwlock = RWLock()
+        self.cache = _RecordCache()
+
+
+_shards = {}
+_shards_lock = threading.Lock()
+
+
+def _shard(filepath):
+    with _shards_lock:
+        shard = _shards.get(filepath)
+        if shard is None:
+            shard = _shards[filepath] = _Shard()
+        return shard
+
+
+@contextmanager
+def _shard_locked(filepath, shared):
+    """Lock one shard file; yields its (records, by_name), read via the cache.
+
+    The yielded objects are shared, so callers must not modify them.
+    """
+    shard = _shard(filepath)
+    with _locked(filepath, shard.rwlock, shared):
+        yield shard.cache.refresh(filepath, verify=not shared)
+
+
+def _lookup(normalized, shard_count):
+    """Find a record by normalized name in a layout; None if it isn't there."""
+    filepath = _shard_path(normalized, shard_count)
+    with _shard_locked(filepath, shared=True) as (_, by_name):
+        return by_name.get(normalized)
+
+
+@timed("workout_storage.write")
+def _write_shard(filepath, records):
+    """Write a shard file's records (caller holds its exclusive lock)."""
+    ensure_data_dir()
+    lines = [json.dumps(record, separators=(",", ":")) + "\n" for record in records]
+    atomic_write_lines(filepath, lines)
+    _shard(filepath).cache.install(filepath, records, "".join(lines).encode("utf-8"))
+
+
+_layout_cache = {"key": None, "layout": None}
+_layout_cache_lock = threading.Lock()
+
+
+def _read_layout():
+    """Return the current layout: {"shards": n, "migrating_to": m or None}."""
+    filepath = DATA_DIR / LAYOUT_FILE
+    try:
+        st = os.stat(filepath)
+    except FileNotFoundError:
+        return {"shards": 1, "migrating_to": None}
+
+    key = (filepath, st.st_mtime_ns, st.st_size, st.st_ino)
+    with _layout_cache_lock:
+        if _layout_cache["key"] != key:
+            with open(filepath) as f:
+                data = json.load(f)
+            _layout_cache["layout"] = {
+                "shards": int(data["shards"]),
+                "migrating_to": data.get("migrating_to"),
+            }
+            _layout_cache["key"] = key
+        return dict(_layout_cache["layout"])
+
+
+def _write_layout(layout):
+    """Replace the manifest (caller holds the exclusive layout lock)."""
+    ensure_data_dir()
+    atomic_write_lines(DATA_DIR / LAYOUT_FILE, [json.dumps(layout) + "\n"])
+
+
+@contextmanager
+def _layout_locked(shared=True):
+    """Hold the layout lock; yields the current layout."""
+    with _locked(DATA_DIR / LAYOUT_FILE, _layout_rwlock, shared):
+        yield _read_layout()
 
+
+def _read_all_records():
+    """Read every record in the current layout straight from disk.
+
+    While resharding, a name in the new shards hides the same name in the
+    old ones.
+    """
+    layout = _read_layout()
+    shard_counts = [layout["shards"]]
+    if layout["migrating_to"]:
+        shard_counts.insert(0, layout["migrating_to"])
+
+    records = []
+    seen = set()
+    for shard_count in shard_counts:
+        found = []
+        for filepath in _shard_paths(shard_count):
+            found.extend(_read_file(filepath))
+        records.extend(r for r in found if r.get("name") not in seen)
+        seen.update(r.get("name") for r in found)
     return records
 
 
 def _write_all_records(records):
-    """Write all records to the JSONL file."""
-    ensure_data_dir()
-    filepath = DATA_DIR / SAVED_WORKOUTS_FILE
+    """Replace every shard of the current layout with the given records."""
+    shard_count = _read_layout()["shards"]
+    partitions = [[] for _ in range(shard_count)]
+    for record in records:
+        partitions[shard_index(record.get("name") or "", shard_count)].append(record)
 
-    with open(filepath, "w") as f:
-        for record in records:
-            f.write(json.dumps(record) + "\n")
+    for filepath, partition in zip(_shard_paths(shard_count), partitions):
+        with _shard_locked(filepath, shared=False):
+            _write_shard(filepath, partition)
+
+
+_archived = set()
+_archive_cache = {}
+_archive_lock = threading.Lock()
+
+
+def _archive_path(fingerprint):
+    return DATA_DIR / CATALOG_ARCHIVE_DIR / f"{fingerprint}.json"
+
+
+def _archive_templates(fingerprint, templates):
+    """Store a catalog's templates once, so records encoded against it stay readable."""
+    path = _archive_path(fingerprint)
+    if path in _archived:
+        return
+    if not path.exists():
+        path.parent.mkdir(parents=True, exist_ok=True)
+        atomic_write_lines(path, [json.dumps(templates, separators=(",", ":")) + "\n"])
+    with _archive_lock:
+        _archived.add(path)
+
+
+def _templates_for(fingerprint):
+    """Templates for a catalog fingerprint: the current catalog's or archived ones.
+
+    Falls back to the current catalog if the archive is missing.
+    """
+    catalog = get_catalog()
+    if fingerprint == catalog.fingerprint:
+        return workout_codec.get_templates(catalog)
+
+    path = _archive_path(fingerprint)
+    with _archive_lock:
+        templates = _archive_cache.get(path)
+    if templates is None:
+        try:
+            with open(path) as f:
+                templates = json.load(f)
+        except FileNotFoundError:
+            return workout_codec.get_templates(catalog)
+        with _archive_lock:
+            _archive_cache[path] = templates
+    return templates
+
+
+def _encode_record(record):
+    """Return a compact version of a record, or the record if it can't be compacted."""
+    catalog = get_catalog()
+    templates = workout_codec.get_templates(catalog)
+    encoded = workout_codec.encode(record["workout"], templates)
+    if encoded is None:
+        return record
+
+    _archive_templates(catalog.fingerprint, templates)
+    workout, defaults = encoded
+    return dict(record, workout=workout, encoding=workout_codec.ENCODING,
+                catalog=catalog.fingerprint, defaults=defaults)
+
+
+def _record_workout(record):
+    """The full workout of a stored record, in either encoding."""
+    if record.get("encoding") != workout_codec.ENCODING:
+        return record["workout"]
+    templates = _templates_for(record["catalog"])
+    return workout_codec.decode(record["workout"], record["defaults"], templates)
 
 
 def save_workout(name, workout, input_params):
@@ -97,32 +467,41 @@ def save_workout(name, workout, input_params):
     normalized = normalize_name(name)
     now = datetime.now().isoformat()
 
-    # Read existing records
-    records = _read_all_records()
-
-    # Check if name exists
-    existing_index = None
-    for i, record in enumerate(records):
-        if record.get("name") == normalized:
-            existing_index = i
-            break
-
-    new_record = {
+    # Round-trip through JSON so the cached record matches what's on disk
+    # and doesn't alias the caller's objects
+    new_record = json.loads(json.dumps({
         "name": normalized,
         "saved_at": now,
         "input_params": input_params,
         "workout": workout,
-    }
-
-    overwritten = existing_index is not None
-
-    if overwritten:
-        records[existing_index] = new_record
-    else:
-        records.append(new_record)
-
-    _write_all_records(records)
-
+    }))
+    if STORAGE_ENCODING == "compact":
+        new_record = _encode_record(new_record)
+
+    with _layout_locked() as layout:
+        target = layout["migrating_to"] or layout["shards"]
+
+        # Mid-reshard, the name may still only be in an old shard. Check
+        # before locking the new shard, so locks are never nested.
+        in_old_layout = bool(layout["migrating_to"]) and (
+            _lookup(normalized, layout["shards"]) is not None
+        )
+
+        # Read, modify and write under one exclusive lock (no lost updates)
+        filepath = _shard_path(normalized, target)
+        with _shard_locked(filepath, shared=False) as (cached, by_name):
+            # The cached list is shared with readers; build a new one
+            records = list(cached)
+
+            existing = by_name.get(normalized)
+            if existing is not None:
+                records[next(i for i, r in enumerate(records) if r is existing)] = new_record
+            else:
+                records.append(new_record)
+
+            _write_shard(filepath, records)
+
+    overwritten = existing is not None or in_old_layout
     message = "Workout updated successfully" if overwritten else "Workout saved successfully"
 
     return {
@@ -133,28 +512,36 @@ def save_workout(name, workout, input_params):
     }
 
 
+def _find(normalized):
+    """Find a record by normalized name in the current layout."""
+    with _layout_locked() as layout:
+        if layout["migrating_to"]:
+            record = _lookup(normalized, layout["migrating_to"])
+            if record is not None:
+                return record
+        return _lookup(normalized, layout["shards"])
+
+
 def load_workout(name):
     """Load a workout by name.
 
-    Returns the workout record or None if not found.
+    Returns the workout record or None if not found. The workout and
+    input_params are shared with the cache and must not be modified.
     """
     if not name:
         return None
 
-    normalized = normalize_name(name)
-    records = _read_all_records()
-
-    for record in records:
-        if record.get("name") == normalized:
-            return {
-                "success": True,
-                "name": record["name"],
-                "workout": record["workout"],
-                "input_params": record["input_params"],
-                "saved_at": record["saved_at"],
-            }
+    record = _find(normalize_name(name))
+    if record is None:
+        return None
 
-    return None
+    return {
+        "success": True,
+        "name": record["name"],
+        "workout": _record_workout(record),
+        "input_params": record["input_params"],
+        "saved_at": record["saved_at"],
+    }
 
 
 def workout_exists(name):
@@ -165,11 +552,95 @@ def workout_exists(name):
     if not name:
         return {"exists": False, "saved_at": None}
 
-    normalized = normalize_name(name)
-    records = _read_all_records()
+    record = _find(normalize_name(name))
+    if record is None:
+        return {"exists": False, "saved_at": None}
+    return {"exists": True, "saved_at": record.get("saved_at")}
 
-    for record in records:
-        if record.get("name") == normalized:
-            return {"exists": True, "saved_at": record.get("saved_at")}
 
-    return {"exists": False, "saved_at": None}
+def reshard(shard_count):
+    """Repartition saved workouts into shard_count shards, while serving.
+
+    Returns a dict with the old and new shard counts and how many records
+    were copied.
+
+    Raises:
+        ValidationError: shard_count is out of range, or a reshard to a
+            different count is already in progress
+    """
+    if not isinstance(shard_count, int) or not 1 <= shard_count <= MAX_SHARDS:
+        raise ValidationError(f"shard_count must be an integer from 1 to {MAX_SHARDS}")
+
+    with _layout_locked(shared=False) as layout:
+        source = layout["shards"]
+        if layout["migrating_to"] not in (None, shard_count):
+            raise ValidationError(
+                f"A reshard to {layout['migrating_to']} shards is in progress; "
+                f"run it again with that count to finish it"
+            )
+        if source == shard_count:
+            return {"from": source, "to": shard_count, "copied": 0}
+        _write_layout({"shards": source, "migrating_to": shard_count})
+
+    # Copy one old shard at a time. Names already in the new layout were
+    # saved after the reshard started, so they are newer and win.
+    copied = 0
+    for old_path in _shard_paths(source):
+        with _shard_locked(old_path, shared=True) as (old_records, _):
+            partitions = {}
+            seen = set()
+            for record in old_records:
+                name = record.get("name") or ""
+                if name:
+                    if name in seen:
+                        continue
+                    seen.add(name)
+                partitions.setdefault(shard_index(name, shard_count), []).append(record)
+
+        for index, moved in sorted(partitions.items()):
+            new_path = DATA_DIR / shard_filename(index, shard_count)
+            with _shard_locked(new_path, shared=False) as (records, by_name):
+                missing = [r for r in moved if r.get("name") not in by_name]
+                if missing:
+                    _write_shard(new_path, records + missing)
+                    copied += len(missing)
+
+    with _layout_locked(shared=False):
+        _write_layout({"shards": shard_count, "migrating_to": None})
+
+    # No operation can still be using the old layout
+    for old_path in _shard_paths(source):
+        with _shards_lock:
+            _shards.pop(old_path, None)
+        for path in (old_path, Path(f"{old_path}.lock")):
+            try:
+                path.unlink()
+            except FileNotFoundError:
+                pass
+
+    return {"from": source, "to": shard_count, "copied": copied}
+
+
+def storage_health():
+    """Report whether saved-workout storage is usable and how much is loaded.
+
+    Returns a dict with ok, error, the layout (shards, migrating_to) and
+    the shards and records held in this process's cache.
+    """
+    health = {"ok": True, "error": None, "shards": None, "migrating_to": None}
+    try:
+        health.update(_read_layout())
+    except (OSError, ValueError, KeyError) as e:
+        health.update(ok=False, error=f"Unreadable layout manifest: {e}")
+
+    # The data directory is created on first save, so check its parent then
+    directory = DATA_DIR if DATA_DIR.exists() else DATA_DIR.parent
+    if not os.access(directory, os.W_OK):
+        health.update(ok=False, error=f"{directory} is not writable")
+
+    with _shards_lock:
+        caches = [shard.cache for shard in _shards.values()]
+    loaded = [cache for cache in caches if cache.path is not None]
+    health["shards_loaded"] = len(loaded)
+    health["records_cached"] = sum(len(cache.records) for cache in loaded)
+    return health
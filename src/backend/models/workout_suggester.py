@@ -7,9 +7,16 @@ This module generates evidence-based workout plans with:
 - Experience-appropriate difficulty filtering
 """
 
+import os
+import threading
+from collections import OrderedDict
+
+from .canonical import canonical_json
 from .workout_generator import ExerciseSelector, validate_workout, WORKOUT_CONSTRAINTS
+from .vectorized_selector import VectorizedExerciseSelector, NUMPY_AVAILABLE
 from .exercise_data import TIER_RANK
-from .movement_patterns import get_movement_pattern
+from .catalog import get_catalog
+from .metrics import span
 
 VALID_GENDERS = {"male", "female"}
 VALID_GOALS = {"strength", "hypertrophy", "endurance", "weight_loss"}
@@ -260,6 +267,25 @@ PROGRESSIONS = {
 }
 
 
+# Exercise selection engines. "vectorized" needs numpy and produces the same
+# plans as "reference"; it pays off for large catalogs.
+SELECTOR_ENGINES = {"reference": ExerciseSelector}
+if NUMPY_AVAILABLE:
+    SELECTOR_ENGINES["vectorized"] = VectorizedExerciseSelector
+
+SELECTOR_ENGINE = os.environ.get("FITMENTOR_SELECTOR_ENGINE", "reference")
+
+
+def create_selector(equipment, experience, engine=None, catalog=None):
+    """Create an exercise selector using the configured engine.
+
+    Unknown engines (or "vectorized" without numpy) fall back to the
+    reference engine.
+    """
+    selector_class = SELECTOR_ENGINES.get(engine or SELECTOR_ENGINE, ExerciseSelector)
+    return selector_class(equipment, experience, catalog=catalog)
+
+
 class ValidationError(Exception):
     """Raised when input validation fails."""
     pass
@@ -273,13 +299,13 @@ def validate_input(data):
             raise ValidationError(f"Missing required field: {field}")
 
     if data["gender"] not in VALID_GENDERS:
-        raise ValidationError(f"gender must be one of: {', '.join(VALID_GENDERS)}")
+        raise ValidationError(f"gender must be one of: {', '.join(sorted(VALID_GENDERS))}")
 
     if data["goal"] not in VALID_GOALS:
-        raise ValidationError(f"goal must be one of: {', '.join(VALID_GOALS)}")
+        raise ValidationError(f"goal must be one of: {', '.join(sorted(VALID_GOALS))}")
 
     if data["experience"] not in VALID_EXPERIENCE:
-        raise ValidationError(f"experience must be one of: {', '.join(VALID_EXPERIENCE)}")
+        raise ValidationError(f"experience must be one of: {', '.join(sorted(VALID_EXPERIENCE))}")
 
     if not isinstance(data["equipment"], list):
         raise ValidationError("equipment must be a list")
@@ -287,8 +313,8 @@ def validate_input(data):
     invalid_equipment = set(data["equipment"]) - VALID_EQUIPMENT
     if invalid_equipment:
         raise ValidationError(
-            f"Invalid equipment: {', '.join(invalid_equipment)}. "
-            f"Valid options: {', '.join(VALID_EQUIPMENT)}"
+            f"Invalid equipment: {', '.join(sorted(invalid_equipment))}. "
+            f"Valid options: {', '.join(sorted(VALID_EQUIPMENT))}"
         )
 
     days = data["days_per_week"]
@@ -378,10 +404,9 @@ def build_workout_day(day_info, selector, goal_params, experience, gender,
         # Apply gender-specific volume adjustment
         gender_mult = gender_adjustments.get(muscle_group, 1.0)
 
-        # Temporarily adjust selector config for this muscle group
-        original_exercises_per_muscle = selector.config["exercises_per_muscle"]
-        adjusted_count = max(1, round(original_exercises_per_muscle * gender_mult))
-        selector.config["exercises_per_muscle"] = adjusted_count
+        # Adjust the exercise count for this muscle group. Passed explicitly
+        # rather than set on the selector so a selector can be shared.
+        adjusted_count = max(1, round(selector.config["exercises_per_muscle"] * gender_mult))
 
         # Select exercises with intelligent algorithm
         # Pass excluded_lower_tier_ids for variant differentiation
@@ -390,11 +415,9 @@ def build_workout_day(day_info, selector, goal_params, experience, gender,
             used_patterns=used_patterns,
             target_subregions=sub_targets,
             excluded_exercise_ids=excluded_lower_tier_ids,
+            target_count=adjusted_count,
         )
 
-        # Restore original config
-        selector.config["exercises_per_muscle"] = original_exercises_per_muscle
-
         all_warnings.extend(warnings)
 
         # For full body, limit exercises per muscle
@@ -459,7 +482,7 @@ def build_workout_day(day_info, selector, goal_params, experience, gender,
                     tier = exercise.get("nippard_tier")
                     if tier not in ("S+", "S"):
                         continue
-                ex_pattern = get_movement_pattern(exercise["id"])
+                ex_pattern = selector.pattern_of(exercise["id"])
                 if ex_pattern and ex_pattern in used_patterns:
                     continue
                 all_selected.append(exercise)
@@ -480,7 +503,7 @@ def build_workout_day(day_info, selector, goal_params, experience, gender,
                 for exercise in candidates:
                     if exercise["id"] in selected_ids:
                         continue
-                    ex_pattern = get_movement_pattern(exercise["id"])
+                    ex_pattern = selector.pattern_of(exercise["id"])
                     if ex_pattern and ex_pattern in used_patterns:
                         continue
                     all_selected.append(exercise)
@@ -530,93 +553,142 @@ def build_workout_day(day_info, selector, goal_params, experience, gender,
     }
 
 
-def suggest(data):
-    """Generate a workout plan based on user parameters.
+def normalize_input(data):
+    """Return the plan-relevant fields of a (validated) input in canonical form.
 
-    Returns a complete workout plan with:
-    - Exercises selected for proper muscle head coverage
-    - No redundant movement patterns
-    - Higher-tier exercises prioritized
-    - Difficulty appropriate for experience level
-    - Variant-based exercise variation (S+/S exercises stay consistent
-      across variants, lower-tier exercises differ)
+    Equipment is de-duplicated, sorted and always includes bodyweight, so
+    inputs that produce the same plan normalize to the same value.
     """
-    validate_input(data)
+    return {
+        "gender": data["gender"],
+        "goal": data["goal"],
+        "experience": data["experience"],
+        "equipment": sorted(set(data["equipment"]) | {"bodyweight"}),
+        "days_per_week": data["days_per_week"],
+        "session_duration": data.get("session_duration", 60),
+    }
 
-    equipment = data["equipment"]
-    if "bodyweight" not in equipment:
-        equipment = equipment + ["bodyweight"]
 
-    # Create the intelligent exercise selector
-    selector = ExerciseSelector(equipment, data["experience"])
+def input_key(data):
+    """Return the canonical cache key for a (validated) input."""
+    return canonical_json(normalize_input(data))
 
-    split = SPLITS[data["days_per_week"]]
-    goal_params = GOAL_PARAMS[data["goal"]]
-    progression = PROGRESSIONS[data["goal"]]
 
-    workouts = []
-    all_plan_warnings = []
+def _variant_exclusions(days, day_index, day_lower_tier_ids):
+    """Collect lower-tier exercise IDs used by other variants of a day.
 
-    # Track lower-tier exercises used per variant group
-    # Structure: {"push": {"A": set(), "B": set()}, ...}
-    # This ensures variant B excludes exercises from variant A (except S+/S tier)
-    variant_lower_tier_used = {}
+    Only days whose lower-tier IDs are already known (not None) contribute,
+    so during a full plan build each variant excludes the earlier variants.
+    """
+    day_info = days[day_index]
+    variant_group = day_info.get("variant_group")
+    variant = day_info.get("variant")
 
-    for day_info in split["days"]:
-        variant_group = day_info.get("variant_group")
-        variant = day_info.get("variant")
+    excluded = set()
+    if not (variant_group and variant):
+        return excluded
 
-        # Determine which exercises to exclude for this variant
-        excluded_lower_tier_ids = set()
-        if variant_group and variant:
-            if variant_group not in variant_lower_tier_used:
-                variant_lower_tier_used[variant_group] = {}
+    for other_index, other_day in enumerate(days):
+        if other_index == day_index:
+            continue
+        if other_day.get("variant_group") != variant_group:
+            continue
+        if other_day.get("variant") == variant:
+            continue
+        if day_lower_tier_ids[other_index] is not None:
+            excluded.update(day_lower_tier_ids[other_index])
+
+    return excluded
 
-            # Exclude lower-tier exercises from previous variants in this group
-            for prev_variant, prev_ids in variant_lower_tier_used[variant_group].items():
-                if prev_variant != variant:
-                    excluded_lower_tier_ids.update(prev_ids)
 
+def _build_day(context, day_index, excluded_lower_tier_ids):
+    """Build and validate one day of a plan from its plan context."""
+    day_info = context["split"]["days"][day_index]
+
+    with span("build_workout_day"):
         workout = build_workout_day(
-            day_info, selector, goal_params,
-            data["experience"], data["gender"],
+            day_info, context["selector"], context["goal_params"],
+            context["experience"], context["gender"],
             excluded_lower_tier_ids=excluded_lower_tier_ids
         )
 
-        # Track lower-tier exercises used in this workout for future variants
-        if variant_group and variant:
-            lower_tier_ids = selector.get_lower_tier_exercise_ids(
-                [e for e in workout["exercises"]]
-            )
-            # Note: workout["exercises"] has processed format, need to check tier field
-            lower_tier_ids = {
-                e["id"] for e in workout["exercises"]
-                if e.get("tier") not in ("S+", "S")
-            }
-            variant_lower_tier_used[variant_group][variant] = lower_tier_ids
-
-        # Validate the workout against targeted sub-regions (split-aware)
-        target_subs = SPLIT_SUBREGIONS.get(workout["split_type"], {})
-        validation_warnings = validate_workout(
+    # Validate the workout against targeted sub-regions (split-aware)
+    target_subs = SPLIT_SUBREGIONS.get(workout["split_type"], {})
+    with span("validate_workout"):
+        workout["validation_warnings"] = validate_workout(
             workout["exercises"],
             workout["muscle_groups"],
-            target_subregions=target_subs if target_subs else None
+            target_subregions=target_subs if target_subs else None,
+            catalog=context["selector"].catalog,
         )
-        workout["validation_warnings"] = validation_warnings
-        all_plan_warnings.extend(validation_warnings)
 
-        workouts.append(workout)
+    return workout
+
 
+def _lower_tier_ids(workout):
+    """Return IDs of the non-S+/S exercises in a built workout day."""
     return {
+        e["id"] for e in workout["exercises"]
+        if e.get("tier") not in ("S+", "S")
+    }
+
+
+def _build_plan(data, catalog=None, selector=None):
+    """Build a full plan, returning (plan, plan_context).
+
+    The plan context holds everything needed to rebuild a single day later:
+    the selector and, per day, the lower-tier exercise IDs used by that day
+    (for variant differentiation). Pass the selector of a cached context for
+    the same input to skip building one.
+    """
+    # Create the intelligent exercise selector
+    if selector is None:
+        with span("create_selector"):
+            selector = create_selector(
+                normalize_input(data)["equipment"], data["experience"], catalog=catalog
+            )
+
+    split = SPLITS[data["days_per_week"]]
+    days = split["days"]
+
+    context = {
+        "selector": selector,
+        "split": split,
+        "goal_params": GOAL_PARAMS[data["goal"]],
+        "experience": data["experience"],
+        "gender": data["gender"],
+        # None until the day has been built
+        "day_lower_tier_ids": [None] * len(days),
+    }
+
+    workouts = []
+    all_plan_warnings = []
+
+    for day_index, day_info in enumerate(days):
+        # Variant B excludes lower-tier exercises from variant A (except S+/S tier)
+        excluded_lower_tier_ids = _variant_exclusions(
+            days, day_index, context["day_lower_tier_ids"]
+        )
+
+        workout = _build_day(context, day_index, excluded_lower_tier_ids)
+
+        # Track lower-tier exercises used in this workout for future variants
+        if day_info.get("variant_group") and day_info.get("variant"):
+            context["day_lower_tier_ids"][day_index] = _lower_tier_ids(workout)
+
+        all_plan_warnings.extend(workout["validation_warnings"])
+        workouts.append(workout)
+
+    plan = {
         "split": {
             "name": split["name"],
             "days": [
                 {"name": d["name"], "muscle_groups": d["muscle_groups"]}
-                for d in split["days"]
+                for d in days
             ],
         },
         "workouts": workouts,
-        "progression": progression,
+        "progression": PROGRESSIONS[data["goal"]],
         "parameters": {
             "goal": data["goal"],
             "experience": data["experience"],
@@ -625,3 +697,112 @@ def suggest(data):
         },
         "warnings": all_plan_warnings,
     }
+
+    return plan, context
+
+
+# Plan contexts of recent plans, keyed by (catalog version, input_key()),
+# for single-day rebuilds
+PLAN_CONTEXT_CACHE_SIZE = 256
+_plan_contexts = OrderedDict()
+_plan_contexts_lock = threading.Lock()
+
+
+def _cache_plan_context(key, context):
+    """Store a plan context, evicting the least recently used ones."""
+    with _plan_contexts_lock:
+        _plan_contexts[key] = context
+        _plan_contexts.move_to_end(key)
+        while len(_plan_contexts) > PLAN_CONTEXT_CACHE_SIZE:
+            _plan_contexts.popitem(last=False)
+
+
+def plan_context_cache_info():
+    """Fill level of the plan-context cache."""
+    with _plan_contexts_lock:
+        return {"size": len(_plan_contexts), "max_size": PLAN_CONTEXT_CACHE_SIZE}
+
+
+def _cached_plan_context(key):
+    """Return the cached plan context for a key, or None."""
+    with _plan_contexts_lock:
+        context = _plan_contexts.get(key)
+        if context is not None:
+            _plan_contexts.move_to_end(key)
+        return context
+
+
+def _get_plan_context(data, catalog):
+    """Return the cached plan context for an input, building it if needed."""
+    key = (catalog.version, input_key(data))
+    context = _cached_plan_context(key)
+    if context is not None:
+        return context
+
+    _, context = _build_plan(data, catalog)
+    _cache_plan_context(key, context)
+    return context
+
+
+def suggest(data):
+    """Generate a workout plan based on user parameters.
+
+    Returns a complete workout plan with:
+    - Exercises selected for proper muscle head coverage
+    - No redundant movement patterns
+    - Higher-tier exercises prioritized
+    - Difficulty appropriate for experience level
+    - Variant-based exercise variation (S+/S exercises stay consistent
+      across variants, lower-tier exercises differ)
+
+    Reuses the selector of a cached plan context for the same input (left
+    by an earlier suggest(), suggest_day() or the warm-up), so a repeated
+    input skips building one.
+    """
+    with span("validate_input"):
+        validate_input(data)
+
+    catalog = get_catalog()
+    key = (catalog.version, input_key(data))
+    cached = _cached_plan_context(key)
+    plan, context = _build_plan(
+        data, catalog, selector=cached["selector"] if cached else None
+    )
+    _cache_plan_context(key, context)
+
+    return plan
+
+
+def suggest_day(data, day_index, excluded_exercise_ids=None):
+    """Regenerate a single day of a plan.
+
+    Reuses the cached plan context for the same input, so only one day is
+    built. The day excludes lower-tier exercises used by the other variants
+    in its variant group, keeping variants distinct, plus any
+    excluded_exercise_ids (S+/S tier exercises are never excluded).
+
+    Returns:
+        The workout day, in the same format as plan["workouts"] entries.
+    """
+    with span("validate_input"):
+        validate_input(data)
+
+    days = SPLITS[data["days_per_week"]]["days"]
+    if isinstance(day_index, bool) or not isinstance(day_index, int) \
+            or day_index < 0 or day_index >= len(days):
+        raise ValidationError(
+            f"day_index must be an integer between 0 and {len(days) - 1}"
+        )
+
+    if excluded_exercise_ids is None:
+        excluded_exercise_ids = []
+    if not isinstance(excluded_exercise_ids, list) \
+            or not all(isinstance(i, str) for i in excluded_exercise_ids):
+        raise ValidationError("exclude_exercise_ids must be a list of exercise IDs")
+
+    context = _get_plan_context(data, get_catalog())
+
+    excluded = _variant_exclusions(days, day_index, context["day_lower_tier_ids"])
+    excluded.update(excluded_exercise_ids)
+
+    return _build_day(context, day_index, excluded)
@@ -0,0 +1,322 @@
+"""Per-client token-bucket rate limiting.
+
+Each client has a bucket holding up to BURST tokens that refills at RATE
+tokens per second. A request takes its endpoint's cost from the bucket, or
+gets a 429 with Retry-After if there aren't enough tokens. Costs weight
+plan generation well above catalog reads, so a client looping on
+/api/suggest-workout runs dry long before one browsing exercises.
+
+Clients are identified by API key (X-API-Key) when the key is one of
+RATE_LIMIT_API_KEYS, and by remote address otherwise. Unknown keys are
+ignored, so a client can't get a fresh bucket by inventing keys. Behind a
+reverse proxy, wrap the app in werkzeug's ProxyFix so remote_addr is the
+real client.
+
+Every charged response carries RateLimit-Limit (the burst),
+RateLimit-Remaining (whole tokens left) and RateLimit-Reset (seconds until
+the bucket is full again). Probes, /metrics and CORS preflights are exempt.
+
+Bucket state lives in a backend:
+- LocalBackend: a dict in this process. With several worker processes,
+  each has its own buckets, so a client gets up to workers x the limit.
+- SharedMemoryBackend: a fixed-size table in a named shared-memory segment
+  that all workers on a host attach to, so they share one set of buckets.
+Any object with the same take() method can be used instead (for example
+one backed by a network store).
+
+Configuration (app.config, defaults from the environment):
+    RATE_LIMIT_ENABLED: FITMENTOR_RATE_LIMIT (default 1; off under TESTING
+                        unless set explicitly)
+    RATE_LIMIT_RATE: FITMENTOR_RATE_LIMIT_RATE, tokens per second, > 0 (default 10)
+    RATE_LIMIT_BURST: FITMENTOR_RATE_LIMIT_BURST, bucket size, > 0 (default 100)
+    RATE_LIMIT_BACKEND: FITMENTOR_RATE_LIMIT_BACKEND, "local" or "shm"
+                        (default "local"), or a backend object
+    RATE_LIMIT_SHM_NAME: FITMENTOR_RATE_LIMIT_SHM_NAME (default
+                         "fitmentor-ratelimit")
+    RATE_LIMIT_API_KEYS: FITMENTOR_API_KEYS, comma-separated
+    RATE_LIMIT_COSTS: {route rule: cost}, merged over ENDPOINT_COSTS
+"""
+
+import hashlib
+import math
+import os
+import struct
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from multiprocessing import resource_tracker, shared_memory
+
+from flask import current_app, g, jsonify, request
+
+from models import metrics
+from models.locking import file_lock
+
+# Tokens per request by route rule; anything else costs DEFAULT_COST
+ENDPOINT_COSTS = {
+    "/api/suggest-workout": 10,
+    "/api/suggest-workout/day": 5,
+    "/api/exercises/swap": 2,
+    "/api/workouts/save": 2,
+    "/api/stats": 2,
+    "/healthz": 0,
+    "/readyz": 0,
+    "/metrics": 0,
+}
+DEFAULT_COST = 1
+
+# Buckets kept by LocalBackend, least recently used dropped first
+MAX_KEYS = 100_000
+
+# SharedMemoryBackend table: slots and how many are probed per key
+SHM_SLOTS = 65_536
+SHM_PROBE = 8
+
+RATE_LIMITED = metrics.Counter(
+    "fitmentor_rate_limit_total",
+    "Rate-limit decisions by endpoint and result (allowed, limited)",
+    ["endpoint", "result"],
+)
+
+
+def _refill(tokens, updated, rate, burst, now):
+    if updated is None:
+        return burst
+    return min(burst, tokens + max(0.0, now - updated) * rate)
+
+
+class LocalBackend:
+    """Buckets held in this process."""
+
+    def __init__(self, max_keys=MAX_KEYS):
+        self.max_keys = max_keys
+        self._buckets = OrderedDict()
+        self._lock = threading.Lock()
+
+    def take(self, key, cost, rate, burst, now=None):
+        """Take cost tokens from key's bucket if it has them.
+
+        Returns:
+            (allowed, tokens left)
+        """
+        now = time.monotonic() if now is None else now
+        with self._lock:
+            tokens, updated = self._buckets.pop(key, (None, None))
+            tokens = _refill(tokens, updated, rate, burst, now)
+            allowed = tokens >= cost
+            if allowed:
+                tokens -= cost
+            self._buckets[key] = (tokens, now)
+            if len(self._buckets) > self.max_keys:
+                self._buckets.popitem(last=False)
+        return allowed, tokens
+
+
+class SharedMemoryBackend:
+    """Buckets in a named shared-memory table shared by processes on a host.
+
+    The table has `slots` entries of (key hash, tokens, last update), found
+    by probing SHM_PROBE slots from the key's hash. If all of them are taken
+    by other keys, the least recently updated one is reused; an evicted
+    client starts over with a full bucket, so size the table well above the
+    number of clients active within BURST / RATE seconds.
+
+    The first process to attach creates the segment. It is left in place
+    when processes exit, so buckets survive worker restarts; unlink() removes
+    it. Updates are serialized by a thread lock plus a file lock next to
+    the segment's name in the temp directory. Timestamps use time.monotonic(),
+    which is system-wide on Linux and macOS.
+    """
+
+    SLOT = struct.Struct("<Qdd")
+
+    def __init__(self, name="fitmentor-ratelimit", slots=SHM_SLOTS):
+        self.name = name
+        self.slots = slots
+        self._lock_path = os.path.join(tempfile.gettempdir(), f"{name}.shm")
+        self._lock = threading.Lock()
+        size = slots * self.SLOT.size
+        # Under the lock, so nobody attaches before the creator has sized it
+        with file_lock(self._lock_path):
+            try:
+                self._shm = shared_memory.SharedMemory(name, create=True, size=size)
+            except FileExistsError:
+                self._shm = shared_memory.SharedMemory(name)
+        # The resource tracker would unlink the segment when this process
+        # exits, pulling it out from under the other workers
+        resource_tracker.unregister(self._shm._name, "shared_memory")
+        if self._shm.size < size:
+            self._shm.close()
+            raise ValueError(f"Shared memory {name!r} is smaller than {slots} slots")
+
+    @staticmethod
+    def _hash(key):
+        # Stable across processes, unlike hash(); 0 marks an empty slot
+        digest = hashlib.blake2b(key.encode(), digest_size=8).digest()
+        return int.from_bytes(digest, "little") or 1
+
+    def _find_slot(self, key_hash):
+        """Index of key's slot, or of the slot to give it."""
+        buf = self._shm.buf
+        first = key_hash % self.slots
+        victim = victim_updated = None
+        for i in range(SHM_PROBE):
+            index = (first + i) % self.slots
+            slot_hash, _, updated = self.SLOT.unpack_from(buf, index * self.SLOT.size)
+            if slot_hash == key_hash or slot_hash == 0:
+                return index
+            if victim is None or updated < victim_updated:
+                victim, victim_updated = index, updated
+        return victim
+
+    def take(self, key, cost, rate, burst, now=None):
+        """Take cost tokens from key's bucket if it has them.
+
+        Returns:
+            (allowed, tokens left)
+        """
+        now = time.monotonic() if now is None else now
+        key_hash = self._hash(key)
+        buf = self._shm.buf
+        with self._lock, file_lock(self._lock_path):
+            index = self._find_slot(key_hash)
+            offset = index * self.SLOT.size
+            slot_hash, tokens, updated = self.SLOT.unpack_from(buf, offset)
+            if slot_hash != key_hash:
+                updated = None
+            tokens = _refill(tokens, updated, rate, burst, now)
+            allowed = tokens >= cost
+            if allowed:
+                tokens -= cost
+            self.SLOT.pack_into(buf, offset, key_hash, tokens, now)
+        return allowed, tokens
+
+    def close(self):
+        self._shm.close()
+
+    def unlink(self):
+        """Remove the segment (for all processes)."""
+        # unlink() unregisters it from the resource tracker again
+        resource_tracker.register(self._shm._name, "shared_memory")
+        self._shm.unlink()
+
+
+def make_backend(config):
+    """Return the backend named by config["RATE_LIMIT_BACKEND"]."""
+    backend = config["RATE_LIMIT_BACKEND"]
+    if backend == "local":
+        return LocalBackend()
+    if backend == "shm":
+        return SharedMemoryBackend(config["RATE_LIMIT_SHM_NAME"])
+    if isinstance(backend, str):
+        raise ValueError(f"Unknown rate-limit backend: {backend!r}")
+    return backend
+
+
+_backends = {}
+_backends_lock = threading.Lock()
+
+
+def _get_backend(app):
+    # Built on first use, so forking servers attach per worker
+    backend = _backends.get(app.name)
+    if backend is None:
+        with _backends_lock:
+            backend = _backends.get(app.name)
+            if backend is None:
+                backend = _backends[app.name] = make_backend(app.config)
+    return backend
+
+
+def reset_backend(app):
+    """Drop the app's backend; the next request builds it from the config."""
+    with _backends_lock:
+        _backends.pop(app.name, None)
+
+
+def _enabled(app):
+    enabled = app.config["RATE_LIMIT_ENABLED"]
+    return not app.testing if enabled is None else enabled
+
+
+def client_key():
+    """Bucket key of the current request: a known API key or the remote address."""
+    api_key = request.headers.get("X-API-Key")
+    if api_key and api_key in current_app.config["RATE_LIMIT_API_KEYS"]:
+        return f"key:{api_key}"
+    return f"ip:{request.remote_addr}"
+
+
+def endpoint_cost(rule):
+    """Tokens a request to a route rule costs."""
+    costs = current_app.config["RATE_LIMIT_COSTS"]
+    if rule in costs:
+        return costs[rule]
+    return ENDPOINT_COSTS.get(rule, DEFAULT_COST)
+
+
+def check_rate_limit():
+    """Charge the request to its client's bucket; 429 if it's empty."""
+    app = current_app._get_current_object()
+    if request.method == "OPTIONS" or not _enabled(app):
+        return None
+
+    rule = request.url_rule.rule if request.url_rule else "<unmatched>"
+    cost = endpoint_cost(rule)
+    if cost <= 0:
+        return None
+
+    rate = app.config["RATE_LIMIT_RATE"]
+    burst = app.config["RATE_LIMIT_BURST"]
+    # A cost above the burst could never be paid
+    cost = min(cost, burst)
+    allowed, tokens = _get_backend(app).take(client_key(), cost, rate, burst)
+
+    g.rate_limit = (burst, tokens, rate)
+    RATE_LIMITED.inc(endpoint=rule, result="allowed" if allowed else "limited")
+    if allowed:
+        return None
+
+    response = jsonify({"error": "Rate limit exceeded, please retry later"})
+    response.headers["Retry-After"] = str(max(1, math.ceil((cost - tokens) / rate)))
+    return response, 429
+
+
+def add_rate_limit_headers(response):
+    """Report the client's bucket on the response."""
+    state = g.pop("rate_limit", None)
+    if state is None:
+        return response
+    burst, tokens, rate = state
+    response.headers["RateLimit-Limit"] = f"{burst:g}"
+    response.headers["RateLimit-Remaining"] = str(int(tokens))
+    response.headers["RateLimit-Reset"] = str(math.ceil((burst - tokens) / rate))
+    return response
+
+
+def _env_flag(name):
+    value = os.environ.get(name)
+    return None if value is None else value.lower() not in ("0", "false", "no", "off")
+
+
+def init_app(app):
+    """Register the rate limiter on an app."""
+    app.config.setdefault("RATE_LIMIT_ENABLED", _env_flag("FITMENTOR_RATE_LIMIT"))
+    app.config.setdefault("RATE_LIMIT_RATE",
+                          float(os.environ.get("FITMENTOR_RATE_LIMIT_RATE", "10")))
+    app.config.setdefault("RATE_LIMIT_BURST",
+                          int(os.environ.get("FITMENTOR_RATE_LIMIT_BURST", "100")))
+    app.config.setdefault("RATE_LIMIT_BACKEND",
+                          os.environ.get("FITMENTOR_RATE_LIMIT_BACKEND", "local"))
+    app.config.setdefault("RATE_LIMIT_SHM_NAME",
+                          os.environ.get("FITMENTOR_RATE_LIMIT_SHM_NAME", "fitmentor-ratelimit"))
+    app.config.setdefault("RATE_LIMIT_API_KEYS", {
+        key.strip() for key in os.environ.get("FITMENTOR_API_KEYS", "").split(",") if key.strip()
+    })
+    app.config.setdefault("RATE_LIMIT_COSTS", {})
+    if app.config["RATE_LIMIT_RATE"] <= 0:
+        raise ValueError("RATE_LIMIT_RATE must be greater than 0")
+    if app.config["RATE_LIMIT_BURST"] <= 0:
+        raise ValueError("RATE_LIMIT_BURST must be greater than 0")
+    app.before_request(check_rate_limit)
+    app.after_request(add_rate_limit_headers)
@@ -0,0 +1,48 @@
+"""Repartition saved workouts into a different number of shard files.
+
+This is safe to run while the app is serving (see models/workout_storage.py).
+If it's interrupted, run it again with the same shard count to finish.
+
+Usage (from src/backend):
+    python reshard.py 8
+    python reshard.py --status
+    python reshard.py 16 --data-dir /srv/fitmentor/data
+"""
+
+import argparse
+import sys
+from pathlib import Path
+
+from models import workout_storage
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("shards", type=int, nargs="?", help="New number of shards")
+    parser.add_argument("--status", action="store_true", help="Show the current layout")
+    parser.add_argument("--data-dir", help="Data directory (default: the app's)")
+    args = parser.parse_args(argv)
+
+    if args.data_dir:
+        workout_storage.DATA_DIR = Path(args.data_dir)
+
+    if args.status or args.shards is None:
+        layout = workout_storage._read_layout()
+        print(f"shards: {layout['shards']}")
+        if layout["migrating_to"]:
+            print(f"unfinished reshard to {layout['migrating_to']} shards")
+        return 0
+
+    try:
+        result = workout_storage.reshard(args.shards)
+    except workout_storage.ValidationError as e:
+        print(f"error: {e}", file=sys.stderr)
+        return 2
+
+    print(f"resharded {result['from']} -> {result['to']} shards, "
+          f"copied {result['copied']} records")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,377 @@
+"""Executors that keep file I/O and plan generation from starving each other.
+
+- File work (saved workouts, data logs, stats) runs on a small thread pool
+  with a bounded queue. A slow disk then ties up at most IO_WORKERS threads
+  plus IO_QUEUE waiting jobs. Anything beyond that is rejected with
+  Overloaded instead of piling up. Request logs are queued without
+  waiting (submit_io), so a slow disk never fails a request whose result
+  is ready; when the queue is full the log record is dropped and counted.
+- CPU-bound suggest() can run on a process pool (SUGGEST_PROCESSES > 0), so
+  plan generation isn't serialized behind the GIL or behind request threads
+  waiting on disk.
+
+- AdmissionControl caps how many plan generations run at once. Callers
+  beyond the cap wait in a bounded queue. If the queue is full, or the
+  expected or actual wait passes a deadline, they get Overloaded (a fast
+  503) instead of tying up a server thread until everything times out.
+  Other endpoints never wait on it.
+- SingleFlight coalesces concurrent identical calls: while one call for a
+  key is running, later callers with the same key wait for it and share
+  its result instead of running it again.
+
+Both pools are created on first use, so forking servers create them per
+worker process.
+
+Configuration:
+    FITMENTOR_IO_WORKERS: file I/O threads (default 4)
+    FITMENTOR_IO_QUEUE: file jobs allowed to wait for a thread (default 64)
+    FITMENTOR_SUGGEST_PROCESSES: suggest() worker processes
+                                 (default 0: run in the request thread)
+    FITMENTOR_SUGGEST_CONCURRENCY: plan generations running at once
+                                   (default: worker processes, else CPUs)
+    FITMENTOR_SUGGEST_QUEUE: plan generations allowed to wait (default 32)
+    FITMENTOR_SUGGEST_QUEUE_TIMEOUT: longest wait in seconds before a 503
+                                     (default 2)
+"""
+
+import atexit
+import logging
+import multiprocessing
+import os
+import math
+import threading
+import time
+from contextlib import contextmanager
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeoutError
+
+from models.metrics import Counter, Histogram
+
+IO_WORKERS = int(os.environ.get("FITMENTOR_IO_WORKERS", "4"))
+IO_QUEUE = int(os.environ.get("FITMENTOR_IO_QUEUE", "64"))
+SUGGEST_PROCESSES = int(os.environ.get("FITMENTOR_SUGGEST_PROCESSES", "0"))
+SUGGEST_CONCURRENCY = int(os.environ.get(
+    "FITMENTOR_SUGGEST_CONCURRENCY", str(SUGGEST_PROCESSES or os.cpu_count() or 1)
+))
+SUGGEST_QUEUE = int(os.environ.get("FITMENTOR_SUGGEST_QUEUE", "32"))
+SUGGEST_QUEUE_TIMEOUT = float(os.environ.get("FITMENTOR_SUGGEST_QUEUE_TIMEOUT", "2"))
+
+# Seconds a request waits for its file job before giving up
+IO_TIMEOUT = 30
+
+logger = logging.getLogger(__name__)
+
+IO_DROPPED = Counter(
+    "fitmentor_io_dropped_total",
+    "Background file jobs dropped because the I/O queue was full",
+    ["job"],
+)
+
+
+class Overloaded(Exception):
+    """Raised when an executor's queue is full or its wait is too long.
+
+    retry_after is a hint for the client, in whole seconds.
+    """
+
+    def __init__(self, message="", retry_after=1):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+class BoundedExecutor:
+    """Wraps an executor, rejecting work once max_pending jobs are queued or running."""
+
+    def __init__(self, executor, max_pending):
+        self.executor = executor
+        self.max_pending = max_pending
+        self._slots = threading.BoundedSemaphore(max_pending)
+        self._pending = 0
+        self._pending_lock = threading.Lock()
+
+    @property
+    def pending(self):
+        """Jobs queued or running."""
+        return self._pending
+
+    def _release(self, _=None):
+        with self._pending_lock:
+            self._pending -= 1
+        self._slots.release()
+
+    def submit(self, func, *args, **kwargs):
+        if not self._slots.acquire(blocking=False):
+            raise Overloaded(f"More than {self.max_pending} jobs pending")
+        with self._pending_lock:
+            self._pending += 1
+        try:
+            future = self.executor.submit(func, *args, **kwargs)
+        except BaseException:
+            self._release()
+            raise
+        future.add_done_callback(self._release)
+        return future
+
+    def shutdown(self, wait=True):
+        self.executor.shutdown(wait=wait)
+
+
+ADMISSIONS = Counter(
+    "fitmentor_admission_total",
+    "Admission decisions by group and result (admitted, rejected, timed_out)",
+    ["group", "result"],
+)
+ADMISSION_WAIT_SECONDS = Histogram(
+    "fitmentor_admission_wait_seconds",
+    "Time admitted calls waited for a slot",
+    ["group"],
+)
+
+
+class AdmissionControl:
+    """Bounds concurrent calls, queueing a limited number and shedding the rest.
+
+    A caller is rejected at once if max_queue callers are already waiting,
+    or if the expected wait (callers ahead x average run time / limit) is
+    over `timeout`. A caller still waiting after `timeout` seconds is
+    rejected too. Rejections raise Overloaded.
+    """
+
+    def __init__(self, group, limit, max_queue, timeout):
+        self.group = group
+        self.limit = max(1, limit)
+        self.max_queue = max_queue
+        self.timeout = timeout
+        self._cond = threading.Condition()
+        self._running = 0
+        self._waiting = 0
+        # Exponentially weighted average run time, None until measured
+        self._run_seconds = None
+
+    def _expected_wait(self):
+        if self._run_seconds is None:
+            return 0.0
+        return (self._waiting + 1) * self._run_seconds / self.limit
+
+    def _reject(self, result, message, wait):
+        ADMISSIONS.inc(group=self.group, result=result)
+        raise Overloaded(message, retry_after=max(1, math.ceil(wait)))
+
+    def _acquire(self):
+        with self._cond:
+            if self._running < self.limit and not self._waiting:
+                self._running += 1
+                return 0.0
+
+            expected = self._expected_wait()
+            if self._waiting >= self.max_queue:
+                self._reject("rejected", f"{self.group}: queue full", expected)
+            if expected > self.timeout:
+                self._reject("rejected", f"{self.group}: expected wait {expected:.1f}s", expected)
+
+            start = time.monotonic()
+            deadline = start + self.timeout
+            self._waiting += 1
+            try:
+                while self._running >= self.limit:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        self._reject("timed_out", f"{self.group}: waited {self.timeout}s",
+                                     self._expected_wait())
+                    self._cond.wait(remaining)
+            finally:
+                self._waiting -= 1
+            self._running += 1
+            return time.monotonic() - start
+
+    def _release(self, run_seconds):
+        with self._cond:
+            self._running -= 1
+            if self._run_seconds is None:
+                self._run_seconds = run_seconds
+            else:
+                self._run_seconds = 0.8 * self._run_seconds + 0.2 * run_seconds
+            self._cond.notify()
+
+    @contextmanager
+    def admit(self):
+        """Hold a slot for the duration of the block.
+
+        Raises:
+            Overloaded: the queue is full or the wait is too long
+        """
+        waited = self._acquire()
+        ADMISSIONS.inc(group=self.group, result="admitted")
+        ADMISSION_WAIT_SECONDS.observe(waited, group=self.group)
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self._release(time.perf_counter() - start)
+
+    def info(self):
+        """Current running and waiting counts and limits."""
+        with self._cond:
+            return {
+                "running": self._running,
+                "waiting": self._waiting,
+                "limit": self.limit,
+                "max_queue": self.max_queue,
+            }
+
+
+SINGLEFLIGHT_CALLS = Counter(
+    "fitmentor_singleflight_calls_total",
+    "Coalesced calls by group and role (leader ran it, follower shared it)",
+    ["group", "role"],
+)
+SINGLEFLIGHT_SAVED_SECONDS = Counter(
+    "fitmentor_singleflight_saved_seconds_total",
+    "Run time of coalesced calls that followers didn't have to repeat",
+    ["group"],
+)
+
+
+class SingleFlight:
+    """Runs at most one call per key at a time; concurrent callers share it.
+
+    Results (and exceptions) are shared between callers, so they must not
+    be modified. Nothing is cached: a call for a key that isn't running
+    runs again.
+    """
+
+    def __init__(self, group):
+        self.group = group
+        self._lock = threading.Lock()
+        self._calls = {}
+
+    def do(self, key, func, *args, **kwargs):
+        """Call func(*args, **kwargs), or wait for the running call for key."""
+        with self._lock:
+            future = self._calls.get(key)
+            leader = future is None
+            if leader:
+                future = self._calls[key] = Future()
+
+        if not leader:
+            SINGLEFLIGHT_CALLS.inc(group=self.group, role="follower")
+            result = future.result()
+            SINGLEFLIGHT_SAVED_SECONDS.inc(future.elapsed, group=self.group)
+            return result
+
+        SINGLEFLIGHT_CALLS.inc(group=self.group, role="leader")
+        start = time.perf_counter()
+        try:
+            result = func(*args, **kwargs)
+        except BaseException as e:
+            future.elapsed = time.perf_counter() - start
+            self._finish(key)
+            future.set_exception(e)
+            raise
+        future.elapsed = time.perf_counter() - start
+        self._finish(key)
+        future.set_result(result)
+        return result
+
+    def _finish(self, key):
+        # Later callers start a new call rather than getting this result
+        with self._lock:
+            del self._calls[key]
+
+
+_lock = threading.Lock()
+_io_executor = None
+_cpu_executor = None
+
+
+def _get_io_executor():
+    global _io_executor
+    with _lock:
+        if _io_executor is None:
+            _io_executor = BoundedExecutor(
+                ThreadPoolExecutor(IO_WORKERS, thread_name_prefix="fitmentor-io"),
+                IO_WORKERS + IO_QUEUE,
+            )
+        return _io_executor
+
+
+def _get_cpu_executor():
+    global _cpu_executor
+    with _lock:
+        if _cpu_executor is None:
+            # spawn: forking a process that already runs threads is unsafe
+            _cpu_executor = ProcessPoolExecutor(
+                SUGGEST_PROCESSES, mp_context=multiprocessing.get_context("spawn")
+            )
+        return _cpu_executor
+
+
+def run_io(func, *args, **kwargs):
+    """Run a file-bound call on the I/O pool and wait for its result.
+
+    Raises:
+        Overloaded: the I/O queue is full, or the call didn't finish
+            within IO_TIMEOUT seconds
+    """
+    future = _get_io_executor().submit(func, *args, **kwargs)
+    try:
+        return future.result(IO_TIMEOUT)
+    except FutureTimeoutError:
+        # Don't run it later for a request that has given up
+        future.cancel()
+        raise Overloaded(f"{func.__name__} took over {IO_TIMEOUT}s") from None
+
+
+def _log_failure(future):
+    if not future.cancelled() and future.exception() is not None:
+        logger.error("Background file job failed", exc_info=future.exception())
+
+
+def submit_io(func, *args, **kwargs):
+    """Queue a file-bound call on the I/O pool without waiting for it.
+
+    For work the response doesn't depend on (request logs). If the queue
+    is full the call is dropped and counted in IO_DROPPED; failures are
+    logged.
+
+    Returns:
+        The Future, or None if the call was dropped
+    """
+    try:
+        future = _get_io_executor().submit(func, *args, **kwargs)
+    except Overloaded:
+        IO_DROPPED.inc(job=func.__name__)
+        return None
+    future.add_done_callback(_log_failure)
+    return future
+
+
+def run_cpu(func, *args, **kwargs):
+    """Run a CPU-bound call on the process pool (or inline if disabled).
+
+    func and its arguments must be picklable (module-level functions).
+    """
+    if SUGGEST_PROCESSES <= 0:
+        return func(*args, **kwargs)
+    return _get_cpu_executor().submit(func, *args, **kwargs).result()
+
+
+def io_queue_depth():
+    """File jobs queued or running on the I/O pool (0 before first use)."""
+    executor = _io_executor
+    return executor.pending if executor is not None else 0
+
+
+def shutdown():
+    """Shut down both pools (they are recreated on next use)."""
+    global _io_executor, _cpu_executor
+    with _lock:
+        io_executor, cpu_executor = _io_executor, _cpu_executor
+        _io_executor = _cpu_executor = None
+    if io_executor is not None:
+        io_executor.shutdown()
+    if cpu_executor is not None:
+        cpu_executor.shutdown()
+
+
+atexit.register(shutdown)
@@ -93,6 +93,21 @@ async function fetchExercises() {
     return result.exercises;
 }
 
+async function fetchSubstitutes(exerciseId, dayExerciseIds, equipment) {
+    const response = await fetch(`${API_URL}/api/exercises/swap`, {
+        method: 'POST',
+        headers: { 'Content-Type': 'application/json' },
+        body: JSON.stringify({
+            exercise_id: exerciseId,
+            day_exercise_ids: dayExerciseIds,
+            equipment: equipment || undefined
+        })
+    });
+    const result = await response.json();
+    if (!response.ok) throw new Error(result.error || 'Failed to fetch alternatives');
+    return result.substitutes;
+}
+
 async function saveWorkoutAPI(name, workout, inputParams) {
     const response = await fetch(`${API_URL}/api/workouts/save`, {
         method: 'POST',
@@ -228,10 +243,28 @@ function hideExerciseModal() {
 }
 
 // Swap popup functions
-function showSwapPopup(exerciseName, dayIndex, exerciseIndex, buttonEl) {
+async function getSwapAlternatives(exerciseName, dayIndex, exerciseIndex) {
+    const dayExercises = currentWorkoutData.workouts[dayIndex].exercises;
+    const exercise = dayExercises[exerciseIndex];
+    const equipment = currentInputParams ? currentInputParams.equipment : null;
+
+    // Ask the server for swaps that keep the day free of redundant patterns;
+    // fall back to the local catalog
+    if (exercise && exercise.id) {
+        try {
+            const dayIds = dayExercises.map(e => e.id).filter(Boolean);
+            return await fetchSubstitutes(exercise.id, dayIds, equipment);
+        } catch (err) {
+            console.error('Failed to fetch substitutes:', err);
+        }
+    }
+    return getAlternativeExercises(exerciseName);
+}
+
+async function showSwapPopup(exerciseName, dayIndex, exerciseIndex, buttonEl) {
     hideSwapPopup();
 
-    const alternatives = getAlternativeExercises(exerciseName);
+    const alternatives = await getSwapAlternatives(exerciseName, dayIndex, exerciseIndex);
     const popup = $('#swap-popup');
     const list = popup.querySelector('.swap-popup-list');
 
@@ -243,7 +276,7 @@ function showSwapPopup(exerciseName, dayIndex, exerciseIndex, buttonEl) {
                 ? `<span class="tier-badge tier-${ex.nippard_tier.toLowerCase().replace('+', '-plus')}">${ex.nippard_tier}</span>`
                 : '';
             return `
-                <div class="swap-popup-item" data-exercise-name="${ex.name}">
+                <div class="swap-popup-item" data-exercise-name="${ex.name}" data-exercise-id="${ex.id}">
                     <span class="swap-popup-item-name">${ex.name}</span>
                     <span class="swap-popup-item-meta">
                         ${tierBadge}
@@ -257,7 +290,8 @@ function showSwapPopup(exerciseName, dayIndex, exerciseIndex, buttonEl) {
         list.querySelectorAll('.swap-popup-item').forEach(item => {
             item.addEventListener('click', () => {
                 const newExerciseName = item.dataset.exerciseName;
-                swapExercise(exerciseName, newExerciseName, dayIndex, exerciseIndex);
+                const newExerciseId = item.dataset.exerciseId;
+                swapExercise(exerciseName, newExerciseName, dayIndex, exerciseIndex, newExerciseId);
             });
         });
     }
@@ -301,12 +335,15 @@ function positionSwapPopup(buttonEl) {
     popup.style.left = `${left}px`;
 }
 
-function swapExercise(originalName, newExerciseName, dayIndex, exerciseIndex) {
+function swapExercise(originalName, newExerciseName, dayIndex, exerciseIndex, newExerciseId) {
     const workout = currentWorkoutData.workouts[dayIndex];
     const exercise = workout.exercises[exerciseIndex];
 
     // Update the exercise name in the data (keep sets, reps, rest)
     exercise.name = newExerciseName;
+    if (newExerciseId) {
+        exercise.id = newExerciseId;
+    }
 
     // Re-render the workout plan without scrolling
     renderWorkoutPlan(currentWorkoutData, false);
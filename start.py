@@ -1,16 +1,22 @@
 #!/usr/bin/env python3
 """Start FitMentor backend and frontend servers."""
 
+import json
 import subprocess
 import sys
 import os
 import time
 import signal
+import urllib.error
+import urllib.request
 
 ROOT = os.path.dirname(os.path.abspath(__file__))
 BACKEND_DIR = os.path.join(ROOT, "src", "backend")
 FRONTEND_DIR = os.path.join(ROOT, "src", "frontend")
 
+READY_URL = "http://localhost:5000/readyz"
+READY_TIMEOUT = 120
+
 processes = []
 
 def cleanup(sig=None, frame=None):
@@ -18,6 +24,30 @@ def cleanup(sig=None, frame=None):
         p.terminate()
     sys.exit(0)
 
+def wait_until_ready(process):
+    """Poll the backend's /readyz until it reports ready, exits, or times out."""
+    deadline = time.time() + READY_TIMEOUT
+    last_status = None
+    while time.time() < deadline:
+        if process.poll() is not None:
+            return False
+        try:
+            with urllib.request.urlopen(READY_URL, timeout=2) as response:
+                return response.status == 200
+        except urllib.error.HTTPError as e:
+            # 503 while warming up
+            try:
+                status = json.loads(e.read()).get("status")
+            except ValueError:
+                status = e.code
+            if status != last_status:
+                print(f"  Backend {status}...")
+                last_status = status
+        except (urllib.error.URLError, OSError):
+            pass  # Not listening yet
+        time.sleep(0.25)
+    return False
+
 signal.signal(signal.SIGINT, cleanup)
 signal.signal(signal.SIGTERM, cleanup)
 
@@ -29,7 +59,7 @@ print("\nPress Ctrl+C to stop\n")
 # Start backend
 backend = subprocess.Popen(
     [sys.executable, "-c",
-     f"import sys; sys.path.insert(0, '{BACKEND_DIR}'); from app import app; app.run(port=5000)"],
+     f"import sys; sys.path.insert(0, '{BACKEND_DIR}'); from app import app, start_warmup; start_warmup(); app.run(port=5000)"],
 )
 processes.append(backend)
 
@@ -38,8 +68,11 @@ frontend = subprocess.Popen(
     [sys.executable, "-m", "http.server", "8000", "--directory", FRONTEND_DIR],
 )
 
-time.sleep(1)
-print("Ready! Open http://localhost:8000")
+if wait_until_ready(backend):
+    print("Ready! Open http://localhost:8000")
+else:
+    print("Backend did not become ready; check its output above")
+    cleanup()
 
 # Wait for processes
 try:
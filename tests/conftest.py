@@ -0,0 +1,22 @@
+"""Shared test fixtures."""
+
+import sys
+import os
+
+# Add src/backend to path for imports
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src', 'backend'))
+
+import pytest
+
+
+@pytest.fixture
+def client(tmp_path, monkeypatch):
+    """Flask test client writing data files to a temporary directory."""
+    from app import app
+    from models import data_collector, workout_storage
+
+    monkeypatch.setattr(data_collector, "DATA_DIR", tmp_path)
+    monkeypatch.setattr(workout_storage, "DATA_DIR", tmp_path)
+    app.config["TESTING"] = True
+    with app.test_client() as client:
+        yield client
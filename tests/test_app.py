@@ -0,0 +1,173 @@
+"""Tests for the Flask API endpoints."""
+
+import sys
+import os
+
+# Add src/backend to path for imports
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src', 'backend'))
+
+
+class TestExerciseLookup:
+    """Test bulk exercise lookup by new and legacy IDs."""
+
+    def test_lookup_mixed_ids(self, client):
+        """String slugs and legacy integer IDs resolve in one request."""
+        response = client.post("/api/exercises/lookup", json={
+            "ids": ["lat-pulldown", 1, "not-an-exercise", 99],
+        })
+        assert response.status_code == 200
+        data = response.get_json()
+
+        ids = [e["id"] for e in data["exercises"]]
+        assert ids == ["lat-pulldown", "flat-barbell-bench-press"]
+        assert data["count"] == 2
+        assert data["resolved_ids"] == {"1": "flat-barbell-bench-press"}
+        assert data["not_found"] == ["not-an-exercise", 99]
+
+    def test_lookup_deduplicates(self, client):
+        """Legacy and new IDs for the same exercise return one record."""
+        response = client.post("/api/exercises/lookup", json={
+            "ids": [18, 19, "romanian-deadlift"],
+        })
+        data = response.get_json()
+        assert [e["id"] for e in data["exercises"]] == ["romanian-deadlift"]
+
+    def test_lookup_field_projection(self, client):
+        """Only requested fields (plus id) are returned."""
+        response = client.post("/api/exercises/lookup", json={
+            "ids": ["lat-pulldown"],
+            "fields": ["name", "nippard_tier"],
+        })
+        exercise = response.get_json()["exercises"][0]
+        assert set(exercise) == {"id", "name", "nippard_tier"}
+
+    def test_lookup_validation_errors(self, client):
+        """Malformed lookups are rejected with 400."""
+        assert client.post("/api/exercises/lookup", json={}).status_code == 400
+        assert client.post("/api/exercises/lookup", json={
+            "ids": [True],
+        }).status_code == 400
+        assert client.post("/api/exercises/lookup", json={
+            "ids": [1], "fields": ["bogus"],
+        }).status_code == 400
+
+    def test_lookup_body_must_be_object(self, client):
+        """JSON bodies that aren't objects are rejected with 400."""
+        for body in ([1, 2], "x", 3):
+            response = client.post("/api/exercises/lookup", json=body)
+            assert response.status_code == 400
+            assert response.get_json()["error"] == "Request body must be a JSON object"
+
+
+class TestExerciseSubstitutes:
+    """Test the substitute graph endpoint."""
+
+    def test_substitutes_same_subregion_and_type(self, client):
+        """Alternatives share sub-region and type and exclude the original."""
+        response = client.get("/api/exercises/incline-barbell-bench-press/substitutes")
+        assert response.status_code == 200
+        data = response.get_json()
+
+        assert data["exercise_id"] == "incline-barbell-bench-press"
+        assert data["count"] == len(data["substitutes"]) > 0
+        for sub in data["substitutes"]:
+            assert sub["id"] != "incline-barbell-bench-press"
+            assert sub["sub_region"] == "upper_chest"
+            assert sub["type"] == "compound"
+            assert "pattern" in sub
+
+    def test_substitutes_respect_equipment(self, client):
+        """Only alternatives doable with the given equipment are returned."""
+        response = client.get(
+            "/api/exercises/incline-barbell-bench-press/substitutes?equipment=dumbbell,bench"
+        )
+        for sub in response.get_json()["substitutes"]:
+            assert set(sub["equipment"]) <= {"dumbbell", "bench", "bodyweight"}
+
+    def test_substitutes_legacy_id(self, client):
+        """Legacy integer IDs in the path are resolved."""
+        response = client.get("/api/exercises/3/substitutes")
+        assert response.get_json()["exercise_id"] == "incline-barbell-bench-press"
+
+    def test_substitutes_errors(self, client):
+        """Unknown exercises 404, invalid equipment 400."""
+        assert client.get("/api/exercises/nope/substitutes").status_code == 404
+        assert client.get(
+            "/api/exercises/lat-pulldown/substitutes?equipment=spaceship"
+        ).status_code == 400
+
+
+class TestDaySwap:
+    """Test pattern-aware swaps for a workout day."""
+
+    def test_swap_avoids_day_patterns(self, client):
+        """Substitutes never repeat a pattern already used in the day."""
+        from models.movement_patterns import get_movement_pattern
+
+        day = ["incline-barbell-bench-press", "flat-dumbbell-press", "lat-pulldown"]
+        response = client.post("/api/exercises/swap", json={
+            "exercise_id": "incline-barbell-bench-press",
+            "day_exercise_ids": day,
+        })
+        assert response.status_code == 200
+        substitutes = response.get_json()["substitutes"]
+        assert substitutes
+
+        day_patterns = {get_movement_pattern(i) for i in day[1:]}
+        for sub in substitutes:
+            assert sub["id"] not in day
+            assert sub["pattern"] not in day_patterns
+
+    def test_swap_respects_equipment(self, client):
+        """Substitutes are feasible with the user's equipment."""
+        response = client.post("/api/exercises/swap", json={
+            "exercise_id": "incline-barbell-bench-press",
+            "day_exercise_ids": ["incline-barbell-bench-press"],
+            "equipment": ["dumbbell", "bench"],
+        })
+        for sub in response.get_json()["substitutes"]:
+            assert set(sub["equipment"]) <= {"dumbbell", "bench", "bodyweight"}
+
+    def test_swap_errors(self, client):
+        """Missing or unknown exercises are rejected."""
+        assert client.post("/api/exercises/swap", json={}).status_code == 400
+        assert client.post("/api/exercises/swap", json={
+            "exercise_id": "nope",
+        }).status_code == 404
+
+    def test_swap_body_must_be_object(self, client):
+        """JSON bodies that aren't objects are rejected with 400."""
+        for body in ([1, 2], "x", 3):
+            response = client.post("/api/exercises/swap", json=body)
+            assert response.status_code == 400
+            assert response.get_json()["error"] == "Request body must be a JSON object"
+
+
+class TestSuggestWorkoutDay:
+    """Test the single-day regeneration endpoint."""
+
+    def test_regenerate_day(self, client):
+        """A single day is returned for a valid plan input."""
+        response = client.post("/api/suggest-workout/day", json={
+            "gender": "female",
+            "goal": "strength",
+            "experience": "beginner",
+            "equipment": ["dumbbell", "bench"],
+            "days_per_week": 4,
+            "day_index": 1,
+        })
+        assert response.status_code == 200
+        data = response.get_json()
+        assert data["day_index"] == 1
+        assert data["workout"]["day"] == "Lower A"
+
+    def test_regenerate_day_requires_index(self, client):
+        """day_index is required."""
+        response = client.post("/api/suggest-workout/day", json={
+            "gender": "female",
+            "goal": "strength",
+            "experience": "beginner",
+            "equipment": [],
+            "days_per_week": 4,
+        })
+        assert response.status_code == 400
@@ -0,0 +1,216 @@
+"""Tests for versioned catalog snapshots and hot reload."""
+
+import sys
+import os
+
+# Add src/backend to path for imports
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src', 'backend'))
+
+import pytest
+from models import catalog as catalog_module
+from models import exercise_data, workout_suggester
+from models.catalog import CatalogHolder, CatalogSnapshot
+from models.exercise_data import ALL_EXERCISES
+from models.exercise_data.loader import ExerciseCatalogFile, write_catalog
+from models.exercises import (
+    get_all_exercises, get_exercise_by_id, get_exercises_by_ids, resolve_exercise_id,
+)
+from models.movement_patterns import EXERCISE_TO_PATTERN
+from models.substitutes import get_substitute_nodes
+
+
+SAMPLE_INPUT = {
+    "gender": "male",
+    "goal": "hypertrophy",
+    "experience": "intermediate",
+    "days_per_week": 3,
+    "equipment": ["barbell", "dumbbell", "cable", "machine"],
+}
+
+
+@pytest.fixture
+def holder(monkeypatch):
+    """A fresh holder (no polling) installed as the process-wide one."""
+    holder = CatalogHolder(poll_seconds=0)
+    monkeypatch.setattr(catalog_module, "_holder", holder)
+    return holder
+
+
+@pytest.fixture
+def catalog_file(tmp_path, monkeypatch):
+    """Point the catalog at an external file holding the built-in exercises."""
+    path = tmp_path / "catalog.jsonl"
+    write_catalog(path, ALL_EXERCISES, EXERCISE_TO_PATTERN)
+    monkeypatch.setattr(exercise_data, "CATALOG_PATH", str(path))
+    return path
+
+
+def _touch(path, exercises):
+    """Rewrite a catalog file and make sure its mtime changes."""
+    write_catalog(path, exercises, EXERCISE_TO_PATTERN)
+    st = os.stat(path)
+    os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000_000))
+
+
+class TestCatalogSnapshot:
+    """Test the immutable snapshot."""
+
+    def test_lookups(self):
+        snapshot = CatalogSnapshot(1, ALL_EXERCISES, EXERCISE_TO_PATTERN)
+        assert len(snapshot.exercises) == len(ALL_EXERCISES)
+        assert snapshot.get_exercise("lat-pulldown")["name"]
+        assert snapshot.pattern_of("lat-pulldown") == EXERCISE_TO_PATTERN["lat-pulldown"]
+        assert snapshot.get_exercise("not-an-exercise") is None
+
+    def test_derived_is_built_once(self):
+        snapshot = CatalogSnapshot(1, ALL_EXERCISES, EXERCISE_TO_PATTERN)
+        calls = []
+
+        def builder(s):
+            calls.append(s)
+            return len(s.exercises)
+
+        assert snapshot.derived("count", builder) == len(ALL_EXERCISES)
+        assert snapshot.derived("count", builder) == len(ALL_EXERCISES)
+        assert calls == [snapshot]
+
+
+    def test_file_snapshot_parses_groups_on_demand(self, tmp_path):
+        path = tmp_path / "catalog.jsonl"
+        moved = dict(ALL_EXERCISES[0], movement_pattern="file_pattern")
+        write_catalog(path, [moved] + ALL_EXERCISES[1:], EXERCISE_TO_PATTERN)
+        catalog_file = ExerciseCatalogFile(path)
+
+        snapshot = CatalogSnapshot.from_file(1, catalog_file, EXERCISE_TO_PATTERN)
+        chest = snapshot.group("chest")
+        assert [e["id"] for e in chest] == \
+            [e["id"] for e in ALL_EXERCISES if e["muscle_group"] == "chest"]
+        assert list(catalog_file._groups) == ["chest"]
+
+        assert len(snapshot.exercises) == len(ALL_EXERCISES)
+        assert snapshot.get_exercise("lat-pulldown")["name"]
+        # Patterns stored in the file win over the given ones
+        assert snapshot.pattern_of(moved["id"]) == "file_pattern"
+        assert snapshot.pattern_of("lat-pulldown") == EXERCISE_TO_PATTERN["lat-pulldown"]
+
+    def test_group_of_list_snapshot(self):
+        snapshot = CatalogSnapshot(1, ALL_EXERCISES, EXERCISE_TO_PATTERN)
+        assert snapshot.group("legs") == tuple(
+            e for e in ALL_EXERCISES if e["muscle_group"] == "legs"
+        )
+        assert snapshot.group("not-a-group") == ()
+
+
+class TestCatalogHolder:
+    """Test swapping in new catalog versions."""
+
+    def test_replace_bumps_version(self, holder):
+        first = holder.current()
+        smaller = [e for e in ALL_EXERCISES if e["id"] != "lat-pulldown"]
+
+        second = holder.replace(smaller, EXERCISE_TO_PATTERN)
+
+        assert second.version == first.version + 1
+        assert catalog_module.get_catalog() is second
+        # The old snapshot is untouched
+        assert first.get_exercise("lat-pulldown") is not None
+
+    def test_derived_indexes_follow_reload(self, holder):
+        assert resolve_exercise_id("lat-pulldown") == "lat-pulldown"
+        assert get_substitute_nodes("lat-pulldown") is not None
+
+        holder.replace(
+            [e for e in ALL_EXERCISES if e["id"] != "lat-pulldown"], EXERCISE_TO_PATTERN
+        )
+
+        assert resolve_exercise_id("lat-pulldown") is None
+        assert get_substitute_nodes("lat-pulldown") is None
+        assert len(get_all_exercises()) == len(ALL_EXERCISES) - 1
+
+    def test_first_snapshot_does_not_parse_file(self, catalog_file, monkeypatch):
+        catalog_file_obj = ExerciseCatalogFile(catalog_file)
+        monkeypatch.setattr(exercise_data, "_CATALOG_FILE", catalog_file_obj)
+
+        holder = CatalogHolder(poll_seconds=0)
+        assert catalog_file_obj._groups == {}
+        assert len(holder.current().group("back")) > 0
+        assert list(catalog_file_obj._groups) == ["back"]
+
+    def test_legacy_lookups_follow_reload(self, holder):
+        assert exercise_data.get_exercise_by_id("lat-pulldown") is not None
+        back = len(exercise_data.get_exercises_by_muscle_group("back"))
+
+        holder.replace(
+            [e for e in ALL_EXERCISES if e["id"] != "lat-pulldown"], EXERCISE_TO_PATTERN
+        )
+
+        assert exercise_data.get_exercise_by_id("lat-pulldown") is None
+        assert len(exercise_data.get_exercises_by_muscle_group("back")) == back - 1
+        assert "lat-pulldown" not in [
+            e["id"] for e in exercise_data.get_exercises_by_sub_region("lats")
+        ]
+        assert len(exercise_data.get_all_exercises()) == len(ALL_EXERCISES) - 1
+
+    def test_unchanged_files_do_not_reload(self, catalog_file):
+        holder = CatalogHolder(poll_seconds=0)
+        assert holder.check_for_changes() is False
+        assert holder.current().version == 1
+
+    def test_reload_on_file_change(self, catalog_file):
+        holder = CatalogHolder(poll_seconds=0)
+        _touch(catalog_file, ALL_EXERCISES[:10])
+
+        assert holder.check_for_changes() is True
+        snapshot = holder.current()
+        assert snapshot.version == 2
+        assert len(snapshot.exercises) == 10
+
+    def test_failed_reload_keeps_last_good_snapshot(self, catalog_file):
+        holder = CatalogHolder(poll_seconds=0)
+        catalog_file.write_text("{not json\n")
+
+        assert holder.check_for_changes() is False
+        assert holder.current().version == 1
+        assert len(holder.current().exercises) == len(ALL_EXERCISES)
+
+    def test_poll_triggers_check(self, catalog_file):
+        holder = CatalogHolder(poll_seconds=0.001)
+        _touch(catalog_file, ALL_EXERCISES[:10])
+        holder._next_check = 0
+
+        assert holder.current().version == 2
+
+
+class TestCompatTables:
+    """The backward-compatible lookups share one table per snapshot."""
+
+    def test_get_exercise_by_id_returns_copy(self, holder):
+        exercise = get_exercise_by_id("lat-pulldown")
+        exercise["name"] = "Changed"
+        exercise["targets"].append("changed")
+
+        fresh = get_exercise_by_id("lat-pulldown")
+        assert fresh["name"] != "Changed"
+        assert "changed" not in fresh["targets"]
+        assert get_exercise_by_id(10)["id"] == "lat-pulldown"
+        assert get_exercise_by_id(True) is None
+
+    def test_lookup_by_ids_skips_bad_types(self, holder):
+        exercises, legacy, not_found = get_exercises_by_ids(["lat-pulldown", 10, True, None])
+        assert [e["id"] for e in exercises] == ["lat-pulldown"]
+        assert legacy == {10: "lat-pulldown"}
+        assert not_found == [True, None]
+
+
+class TestPlanCacheVersioning:
+    """Cached plan contexts must not outlive their catalog version."""
+
+    def test_plan_context_rebuilt_after_reload(self, holder):
+        workout_suggester.suggest(SAMPLE_INPUT)
+        cached = workout_suggester._get_plan_context(SAMPLE_INPUT, holder.current())
+
+        holder.replace(ALL_EXERCISES, EXERCISE_TO_PATTERN)
+        rebuilt = workout_suggester._get_plan_context(SAMPLE_INPUT, holder.current())
+
+        assert rebuilt is not cached
+        assert rebuilt["selector"].catalog is holder.current()
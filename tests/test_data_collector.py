@@ -0,0 +1,104 @@
+"""Tests for request logging and the plan blob store."""
+
+import sys
+import os
+import json
+
+# Add src/backend to path for imports
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src', 'backend'))
+
+import pytest
+from models import data_collector
+from models.canonical import content_hash
+from models.workout_suggester import suggest
+
+
+SAMPLE_INPUT = {
+    "gender": "male",
+    "goal": "hypertrophy",
+    "experience": "intermediate",
+    "days_per_week": 4,
+    "equipment": ["barbell", "dumbbell", "cable", "machine"],
+}
+
+
+@pytest.fixture
+def data_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(data_collector, "DATA_DIR", tmp_path)
+    return tmp_path
+
+
+def _blob_files(data_dir):
+    return list((data_dir / data_collector.BLOB_DIR).rglob("*.json"))
+
+
+class TestPlanDeduplication:
+    """Plan outputs are stored once and referenced by hash."""
+
+    def test_identical_plans_stored_once(self, data_dir):
+        plan = suggest(SAMPLE_INPUT)
+        for _ in range(20):
+            data_collector.log_workout_plan(SAMPLE_INPUT, plan)
+
+        assert len(_blob_files(data_dir)) == 1
+        lines = (data_dir / "workout_plans.jsonl").read_text().splitlines()
+        assert len(lines) == 20
+        record = json.loads(lines[0])
+        assert record["output_blob"] == content_hash(plan)
+        assert "output" not in record
+        # The log line is a small fraction of the plan
+        assert len(lines[0]) * 10 < len(json.dumps(plan))
+
+    def test_distinct_plans_get_distinct_blobs(self, data_dir):
+        data_collector.log_workout_plan(SAMPLE_INPUT, suggest(SAMPLE_INPUT))
+        other = dict(SAMPLE_INPUT, days_per_week=3)
+        data_collector.log_workout_plan(other, suggest(other))
+        assert len(_blob_files(data_dir)) == 2
+
+    def test_read_records_rehydrates_lazily(self, data_dir, monkeypatch):
+        plan = suggest(SAMPLE_INPUT)
+        for _ in range(3):
+            data_collector.log_workout_plan(SAMPLE_INPUT, plan)
+
+        loads = []
+        original = data_collector.load_blob
+        monkeypatch.setattr(data_collector, "load_blob",
+                            lambda digest: loads.append(digest) or original(digest))
+
+        records = data_collector.read_records("workout_plans.jsonl")
+        assert loads == []
+
+        assert records[0]["output"] == plan
+        assert records[1].get("output") == plan
+        assert records[2]["input"] == SAMPLE_INPUT
+        # Each blob is read once per call
+        assert len(loads) == 1
+
+    def test_stats_do_not_load_blobs(self, data_dir, monkeypatch):
+        data_collector.log_workout_plan(SAMPLE_INPUT, suggest(SAMPLE_INPUT))
+        monkeypatch.setattr(data_collector, "load_blob", None)
+        assert data_collector.get_stats()["workout_plans"]["total"] == 1
+
+    def test_legacy_inline_records(self, data_dir):
+        path = data_dir / "workout_plans.jsonl"
+        path.write_text(json.dumps({"timestamp": "t", "input": {}, "output": {"a": 1}}) + "\n")
+        data_collector.log_workout_plan({}, {"b": 2})
+
+        records = data_collector.read_records("workout_plans.jsonl")
+        assert [r["output"] for r in records] == [{"a": 1}, {"b": 2}]
+
+    def test_calorie_log_stays_inline(self, data_dir):
+        data_collector.log_calorie_calculation({"weight": 80}, {"tdee": 2500})
+        record = data_collector.read_records("calorie_calculations.jsonl")[0]
+        assert record["output"] == {"tdee": 2500}
+        assert not (data_dir / data_collector.BLOB_DIR).exists()
+
+
+class TestLazyRecord:
+    """Test LazyRecord access."""
+
+    def test_missing_keys(self):
+        record = data_collector.LazyRecord({"input": {}}, load=None)
+        with pytest.raises(KeyError):
+            record["output"]
+        assert record.get("output", "default") == "default"
@@ -0,0 +1,71 @@
+"""suggest() output must be byte-identical across processes.
+
+Each check runs plan generation in fresh interpreters with different
+PYTHONHASHSEED values. Set iteration order differs between them, so any
+output that depends on it shows up as a digest mismatch.
+"""
+
+import sys
+import os
+import subprocess
+
+import pytest
+
+BACKEND_DIR = os.path.join(os.path.dirname(__file__), '..', 'src', 'backend')
+
+SEEDS = ["0", "1", "2", "4242"]
+
+# Prints one digest of the canonical bytes and one of the bytes the API
+# sends (insertion order), over a grid of inputs. Invalid inputs contribute
+# their error message.
+SCRIPT = """
+import hashlib, itertools, json, sys
+sys.path.insert(0, sys.argv[1])
+from json_provider import FastJSONProvider
+from flask import Flask
+from models.canonical import canonical_bytes
+from models.workout_suggester import ValidationError, suggest
+
+provider = FastJSONProvider(Flask(__name__))
+canonical = hashlib.sha256()
+api = hashlib.sha256()
+equipment_sets = [["bodyweight"], ["dumbbell", "bench"], ["barbell", "cable", "machine"],
+                  ["barbell", "dumbbell", "cable", "bench", "rack", "machine", "pullup_bar"]]
+for gender, goal, experience, days, equipment in itertools.product(
+        ["male", "female"], ["strength", "hypertrophy", "weight_loss"],
+        ["beginner", "advanced"], [3, 5, 6], equipment_sets):
+    data = {"gender": gender, "goal": goal, "experience": experience,
+            "days_per_week": days, "equipment": equipment}
+    plan = suggest(data)
+    canonical.update(canonical_bytes(plan))
+    api.update(provider.dumps(plan).encode("utf-8"))
+for bad in ({"gender": "x"}, {"equipment": ["laser", "rope", "sled"]}):
+    data = {"gender": "male", "goal": "strength", "experience": "beginner",
+            "days_per_week": 3, "equipment": ["barbell"], **bad}
+    try:
+        suggest(data)
+    except ValidationError as e:
+        api.update(str(e).encode("utf-8"))
+print(canonical.hexdigest(), api.hexdigest())
+"""
+
+
+def _digests(seed, engine):
+    env = dict(os.environ, PYTHONHASHSEED=seed, FITMENTOR_SELECTOR_ENGINE=engine)
+    result = subprocess.run(
+        [sys.executable, "-c", SCRIPT, BACKEND_DIR],
+        env=env, capture_output=True, text=True, timeout=300,
+    )
+    assert result.returncode == 0, result.stderr
+    return result.stdout.split()
+
+
+class TestByteStableOutput:
+    """Plans and validation errors don't depend on hash randomization."""
+
+    @pytest.mark.parametrize("engine", ["reference", "vectorized"])
+    def test_same_bytes_for_every_seed(self, engine):
+        if engine == "vectorized":
+            pytest.importorskip("numpy")
+        digests = {seed: _digests(seed, engine) for seed in SEEDS}
+        assert len({tuple(d) for d in digests.values()}) == 1, digests
@@ -0,0 +1,113 @@
+"""Tests for loading the exercise catalog from external JSONL files."""
+
+import sys
+import os
+import json
+import subprocess
+
+# Add src/backend to path for imports
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src', 'backend'))
+
+import pytest
+from models.exercise_data import ALL_EXERCISES, get_exercises_by_muscle_group
+from models.exercise_data.loader import (
+    ExerciseCatalogFile,
+    LazyExerciseList,
+    ValidationError,
+    write_catalog,
+)
+from models.movement_patterns import EXERCISE_TO_PATTERN
+
+
+@pytest.fixture
+def catalog_path(tmp_path):
+    """The built-in catalog written to a catalog file."""
+    path = tmp_path / "catalog.jsonl"
+    write_catalog(path, ALL_EXERCISES, EXERCISE_TO_PATTERN)
+    return path
+
+
+def _strip_patterns(exercises):
+    return [{k: v for k, v in e.items() if k != "movement_pattern"} for e in exercises]
+
+
+class TestCatalogFile:
+    """Test the lazily parsed catalog file."""
+
+    def test_round_trip(self, catalog_path):
+        """Every group reads back exactly as written."""
+        catalog = ExerciseCatalogFile(catalog_path)
+        for muscle_group in catalog.muscle_groups:
+            assert _strip_patterns(catalog.group(muscle_group)) == \
+                get_exercises_by_muscle_group(muscle_group)
+        assert _strip_patterns(catalog.all()) == ALL_EXERCISES
+
+    def test_groups_parse_lazily(self, catalog_path):
+        """Reading one group leaves the others unparsed."""
+        catalog = ExerciseCatalogFile(catalog_path)
+        catalog.group("chest")
+        assert list(catalog._groups) == ["chest"]
+
+    def test_headerless_file(self, tmp_path):
+        """Plain JSONL files without a header are accepted."""
+        path = tmp_path / "plain.jsonl"
+        with open(path, "w") as f:
+            for exercise in reversed(ALL_EXERCISES):
+                f.write(json.dumps(exercise) + "\n\n")
+
+        catalog = ExerciseCatalogFile(path)
+        assert len(catalog.group("legs")) == len(get_exercises_by_muscle_group("legs"))
+        assert catalog.get_by_id("lat-pulldown")["name"] == "Lat Pulldown (Medium Grip)"
+
+    def test_invalid_record_rejected(self, tmp_path):
+        """Records that break the schema raise ValidationError."""
+        bad = dict(ALL_EXERCISES[0], difficulty="impossible")
+        with pytest.raises(ValidationError):
+            write_catalog(tmp_path / "bad.jsonl", [bad])
+
+        path = tmp_path / "bad.jsonl"
+        path.write_text(json.dumps(bad) + "\n")
+        with pytest.raises(ValidationError):
+            ExerciseCatalogFile(path).group("chest")
+
+    def test_malformed_header_rejected(self, tmp_path):
+        """A header with a bad group index raises ValidationError."""
+        path = tmp_path / "bad-header.jsonl"
+        record = json.dumps(ALL_EXERCISES[0]) + "\n"
+        for groups in ([], {"chest": 5}, {"chest": [0]}, {"chest": ["0", 5]},
+                       {"chest": [0, 10_000]}, None):
+            header = {"format": "fitmentor-exercise-catalog", "version": 1, "groups": groups}
+            path.write_text(json.dumps(header) + "\n" + record)
+            with pytest.raises(ValidationError):
+                ExerciseCatalogFile(path)
+
+    def test_lazy_exercise_list(self, catalog_path):
+        """LazyExerciseList behaves like the built-in list."""
+        lazy = LazyExerciseList(ExerciseCatalogFile(catalog_path))
+        assert len(lazy) == len(ALL_EXERCISES)
+        assert lazy[0]["id"] == ALL_EXERCISES[0]["id"]
+        assert [e["id"] for e in lazy.copy()] == [e["id"] for e in ALL_EXERCISES]
+
+    def test_patterns_kept_per_file(self, tmp_path):
+        """Patterns in a file don't leak into the module-level mapping."""
+        exercise = dict(ALL_EXERCISES[0], id="file-only-press", movement_pattern="file_pattern")
+        path = tmp_path / "patterns.jsonl"
+        write_catalog(path, [exercise])
+
+        catalog = ExerciseCatalogFile(path)
+        assert catalog.patterns() == {"file-only-press": "file_pattern"}
+        assert "file-only-press" not in EXERCISE_TO_PATTERN
+
+    def test_builtin_lists_not_imported_in_file_mode(self, catalog_path):
+        """With a catalog file, the built-in exercise modules stay unimported."""
+        backend = os.path.join(os.path.dirname(__file__), '..', 'src', 'backend')
+        code = (
+            "import sys\n"
+            "from models import catalog\n"
+            "print(any(m in sys.modules for m in ("
+            "'models.exercise_data.chest', 'models.exercise_data.legs')))\n"
+        )
+        env = dict(os.environ, FITMENTOR_CATALOG_PATH=str(catalog_path))
+        result = subprocess.run([sys.executable, "-c", code], cwd=backend, env=env,
+                                capture_output=True, text=True, check=True)
+        assert result.stdout.strip() == "False"
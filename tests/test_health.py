@@ -0,0 +1,107 @@
+"""Tests for the liveness and readiness endpoints."""
+
+import sys
+import os
+import threading
+from collections import deque
+
+# Add src/backend to path for imports
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src', 'backend'))
+
+from concurrent.futures import ThreadPoolExecutor
+
+import serving
+from app import RECENT_REQUEST_SECONDS
+from models import warmup, workout_storage
+from models.catalog import get_catalog
+
+
+def _warmup_status(status):
+    return lambda: {"status": status, "inputs": 0, "seconds": None, "error": None}
+
+
+class TestHealthz:
+    """Liveness doesn't depend on warm-up or storage."""
+
+    def test_ok(self, client, monkeypatch):
+        monkeypatch.setattr(warmup, "status", _warmup_status("running"))
+        response = client.get("/healthz")
+        assert response.status_code == 200
+        assert response.get_json() == {"status": "ok"}
+
+
+class TestReadyz:
+    """Readiness reports warm state and storage health."""
+
+    def test_ready(self, client):
+        client.get("/api/exercises")
+        response = client.get("/readyz")
+        body = response.get_json()
+
+        assert response.status_code == 200
+        assert body["status"] == "ready"
+        assert body["catalog"]["version"] == get_catalog().version
+        assert body["catalog"]["exercises"] == len(get_catalog().exercises)
+        assert "exercises.json" in body["caches"]["catalog_indexes"]
+        assert body["caches"]["plan_contexts"]["max_size"] > 0
+        assert body["io_queue"]["limit"] == serving.IO_WORKERS + serving.IO_QUEUE
+        assert body["storage"]["ok"] is True
+        assert body["storage"]["shards"] == 1
+
+    def test_not_ready_while_warming(self, client, monkeypatch):
+        for status in ("pending", "running"):
+            monkeypatch.setattr(warmup, "status", _warmup_status(status))
+            response = client.get("/readyz")
+            assert response.status_code == 503
+            assert response.get_json()["status"] == "warming"
+
+    def test_ready_after_failed_warmup(self, client, monkeypatch):
+        monkeypatch.setattr(warmup, "status", _warmup_status("failed"))
+        assert client.get("/readyz").status_code == 200
+
+    def test_not_ready_with_broken_storage(self, client, tmp_path):
+        (tmp_path / workout_storage.LAYOUT_FILE).write_text("{not json")
+        response = client.get("/readyz")
+        body = response.get_json()
+
+        assert response.status_code == 503
+        assert body["status"] == "unavailable"
+        assert body["storage"]["ok"] is False
+        assert "layout" in body["storage"]["error"]
+
+    def test_reports_loaded_storage(self, client):
+        client.post("/api/workouts/save", json={
+            "name": "Push Day", "workout": {"exercises": []}, "input_params": {},
+        })
+        client.get("/api/workouts/exists/Push%20Day")
+        storage = client.get("/readyz").get_json()["storage"]
+        assert storage["shards_loaded"] >= 1
+        assert storage["records_cached"] >= 1
+
+    def test_latency_percentiles_exclude_probes(self, client, monkeypatch):
+        monkeypatch.setattr(RECENT_REQUEST_SECONDS, "_samples", deque(maxlen=16))
+        for _ in range(3):
+            client.get("/healthz")
+        assert client.get("/readyz").get_json()["latency_ms"]["count"] == 0
+
+        client.get("/api/exercises")
+        latency = client.get("/readyz").get_json()["latency_ms"]
+        assert latency["count"] == 1
+        assert latency["p50"] == latency["p99"] > 0
+
+
+class TestQueueDepth:
+    """The bounded executor reports its pending jobs."""
+
+    def test_pending(self):
+        release = threading.Event()
+        executor = serving.BoundedExecutor(ThreadPoolExecutor(1), 4)
+        try:
+            futures = [executor.submit(release.wait) for _ in range(3)]
+            assert executor.pending == 3
+            release.set()
+            for f in futures:
+                f.result()
+        finally:
+            executor.shutdown()
+        assert executor.pending == 0
@@ -0,0 +1,37 @@
+"""Tests for the fast JSON provider and pre-encoded fragments."""
+
+import sys
+import os
+import json
+
+# Add src/backend to path for imports
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src', 'backend'))
+
+from app import app
+from json_provider import JSONFragment, encode_fragment
+from models.exercises import get_all_exercises
+
+
+class TestFastJSONProvider:
+    """Test encoding with the app's JSON provider."""
+
+    def test_compact_and_unsorted(self):
+        assert app.json.dumps({"b": 1, "a": [1, 2]}) == '{"b":1,"a":[1,2]}'
+
+    def test_fragments_spliced_verbatim(self):
+        fragment = encode_fragment({"z": [1, "two"], "a": None})
+        text = app.json.dumps({"x": fragment, "y": [fragment, 3]})
+        assert json.loads(text) == {
+            "x": {"z": [1, "two"], "a": None},
+            "y": [{"z": [1, "two"], "a": None}, 3],
+        }
+
+    def test_placeholder_text_in_data_is_not_replaced(self):
+        value = {"name": "__fragment_0", "f": JSONFragment("[1]")}
+        assert json.loads(app.json.dumps(value)) == {"name": "__fragment_0", "f": [1]}
+
+    def test_catalog_endpoint_uses_fragment(self):
+        with app.test_client() as client:
+            data = client.get("/api/exercises").get_json()
+        assert data["exercises"] == json.loads(json.dumps(get_all_exercises()))
+        assert data["count"] == len(get_all_exercises())
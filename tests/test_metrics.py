@@ -0,0 +1,135 @@
+"""Tests for in-process metrics and the /metrics endpoint."""
+
+import sys
+import os
+import threading
+import time
+
+# Add src/backend to path for imports
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src', 'backend'))
+
+import pytest
+import serving
+from models import metrics
+
+
+SAMPLE_INPUT = {
+    "gender": "male",
+    "goal": "hypertrophy",
+    "experience": "intermediate",
+    "days_per_week": 3,
+    "equipment": ["barbell", "dumbbell", "cable", "machine"],
+}
+
+
+def _unique_name(prefix):
+    """Metric names are process-wide, so each test registers its own."""
+    _unique_name.count = getattr(_unique_name, "count", 0) + 1
+    return f"test_{prefix}_{_unique_name.count}"
+
+
+def _sample(text, line_start):
+    """Return the value of the exposition line starting with line_start."""
+    for line in text.splitlines():
+        if line.startswith(line_start + " "):
+            return float(line.rsplit(" ", 1)[1])
+    return None
+
+
+class TestMetrics:
+    """Test per-thread recording and merging."""
+
+    def test_counter_merges_threads(self):
+        counter = metrics.Counter(_unique_name("counter"), "Test counter", ["kind"])
+
+        def work():
+            for _ in range(1000):
+                counter.inc(kind="a")
+
+        threads = [threading.Thread(target=work) for _ in range(4)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        counter.inc(5, kind="b")
+
+        merged = metrics.collect()
+        assert merged[(counter.name, ("a",))] == 4000
+        assert merged[(counter.name, ("b",))] == 5
+        # Exited threads are folded into the retired totals exactly once
+        assert metrics.collect()[(counter.name, ("a",))] == 4000
+
+    def test_gauge_sums_deltas(self):
+        gauge = metrics.Gauge(_unique_name("gauge"), "Test gauge")
+        gauge.inc()
+        gauge.inc()
+        gauge.dec()
+        assert metrics.collect()[(gauge.name, ())] == 1
+
+    def test_histogram_exposition(self):
+        histogram = metrics.Histogram(_unique_name("hist"), "Test histogram", buckets=(1, 5))
+        for value in (0.5, 1, 3, 10):
+            histogram.observe(value)
+
+        text = metrics.render()
+        assert f"# TYPE {histogram.name} histogram" in text
+        assert _sample(text, f'{histogram.name}_bucket{{le="1"}}') == 2
+        assert _sample(text, f'{histogram.name}_bucket{{le="5"}}') == 3
+        assert _sample(text, f'{histogram.name}_bucket{{le="+Inf"}}') == 4
+        assert _sample(text, f"{histogram.name}_sum") == 14.5
+        assert _sample(text, f"{histogram.name}_count") == 4
+
+    def test_wrong_labels_rejected(self):
+        counter = metrics.Counter(_unique_name("labels"), "Test counter", ["kind"])
+        with pytest.raises(ValueError):
+            counter.inc(other="x")
+
+    def test_span_records_duration(self):
+        name = _unique_name("span")
+        with metrics.span(name):
+            pass
+        counts = metrics.collect()[(metrics.SPAN_SECONDS.name, (name,))]
+        assert sum(counts[:-1]) == 1
+
+    def test_recent_samples_percentiles(self):
+        recent = metrics.RecentSamples(size=100)
+        assert recent.percentiles() == {"p50": None, "p95": None, "p99": None, "count": 0}
+
+        for value in range(1, 201):
+            recent.observe(value)
+        # Only the newest 100 (101..200) are kept
+        assert recent.percentiles() == {"p50": 150, "p95": 195, "p99": 199, "count": 100}
+
+
+class TestMetricsEndpoint:
+    """Test the /metrics endpoint."""
+
+    def test_request_and_span_metrics(self, client):
+        response = client.post("/api/suggest-workout", json=SAMPLE_INPUT)
+        assert response.status_code == 200
+        # The request log is written in the background
+        deadline = time.monotonic() + 5
+        while serving.io_queue_depth() and time.monotonic() < deadline:
+            time.sleep(0.01)
+
+        response = client.get("/metrics")
+        assert response.status_code == 200
+        assert response.content_type.startswith("text/plain")
+        text = response.get_data(as_text=True)
+
+        endpoint = 'endpoint="/api/suggest-workout"'
+        assert _sample(
+            text, f'fitmentor_http_responses_total{{method="POST",{endpoint},status="200"}}'
+        ) >= 1
+        assert _sample(
+            text, f'fitmentor_http_request_duration_seconds_count{{method="POST",{endpoint}}}'
+        ) >= 1
+        assert _sample(text, f"fitmentor_http_response_size_bytes_count{{{endpoint}}}") >= 1
+        # Only the /metrics request itself is still in flight
+        assert _sample(text, f"fitmentor_http_requests_in_flight{{{endpoint}}}") == 0
+
+        for name in ("validate_input", "create_selector", "build_workout_day",
+                     "validate_workout", "data_collector.append_record"):
+            assert _sample(
+                text, f'fitmentor_span_duration_seconds_count{{span="{name}"}}'
+            ) >= 1
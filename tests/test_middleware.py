@@ -0,0 +1,105 @@
+"""Tests for response compression and ETag revalidation."""
+
+import sys
+import os
+import gzip
+import zlib
+
+# Add src/backend to path for imports
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src', 'backend'))
+
+import json
+
+from models import catalog as catalog_module
+from models.catalog import CatalogHolder
+from models.exercise_data import ALL_EXERCISES
+from models.movement_patterns import EXERCISE_TO_PATTERN
+
+
+SAMPLE_INPUT = {
+    "gender": "male",
+    "goal": "hypertrophy",
+    "experience": "intermediate",
+    "days_per_week": 3,
+    "equipment": ["barbell", "dumbbell", "cable", "machine"],
+}
+
+
+class TestCompression:
+    """Test Accept-Encoding negotiation."""
+
+    def test_gzip(self, client):
+        response = client.post("/api/suggest-workout", json=SAMPLE_INPUT,
+                               headers={"Accept-Encoding": "gzip, deflate"})
+        assert response.headers["Content-Encoding"] == "gzip"
+        assert "Accept-Encoding" in response.headers["Vary"]
+
+        plan = json.loads(gzip.decompress(response.get_data()))
+        assert plan == client.post("/api/suggest-workout", json=SAMPLE_INPUT).get_json()
+        assert int(response.headers["Content-Length"]) == len(response.get_data())
+
+    def test_deflate_preferred_by_quality(self, client):
+        response = client.get("/api/exercises",
+                              headers={"Accept-Encoding": "gzip;q=0.5, deflate"})
+        assert response.headers["Content-Encoding"] == "deflate"
+        assert json.loads(zlib.decompress(response.get_data()))["count"] > 0
+
+    def test_identity_without_accept_encoding(self, client):
+        response = client.get("/api/exercises")
+        assert "Content-Encoding" not in response.headers
+        assert response.get_json()["count"] > 0
+
+    def test_unsupported_encoding_only(self, client):
+        response = client.get("/api/exercises", headers={"Accept-Encoding": "br"})
+        assert "Content-Encoding" not in response.headers
+
+    def test_small_responses_not_compressed(self, client):
+        response = client.get("/api/workouts/exists/nothing",
+                              headers={"Accept-Encoding": "gzip"})
+        assert "Content-Encoding" not in response.headers
+
+
+class TestETags:
+    """Test conditional requests on deterministic endpoints."""
+
+    def test_suggest_revalidates(self, client):
+        response = client.post("/api/suggest-workout", json=SAMPLE_INPUT)
+        etag = response.headers["ETag"]
+        assert etag.startswith('W/"')
+        assert response.headers["Cache-Control"] == "no-cache"
+
+        response = client.post("/api/suggest-workout", json=SAMPLE_INPUT,
+                               headers={"If-None-Match": etag})
+        assert response.status_code == 304
+        assert response.get_data() == b""
+        assert response.headers["ETag"] == etag
+
+    def test_equivalent_inputs_share_etag(self, client):
+        reordered = dict(SAMPLE_INPUT, equipment=["machine", "cable", "dumbbell", "barbell",
+                                                  "bodyweight"])
+        first = client.post("/api/suggest-workout", json=SAMPLE_INPUT)
+        second = client.post("/api/suggest-workout", json=reordered)
+        assert first.headers["ETag"] == second.headers["ETag"]
+
+        other = client.post("/api/suggest-workout", json=dict(SAMPLE_INPUT, days_per_week=4))
+        assert other.headers["ETag"] != first.headers["ETag"]
+
+    def test_etag_independent_of_encoding(self, client):
+        plain = client.get("/api/exercises")
+        compressed = client.get("/api/exercises", headers={"Accept-Encoding": "gzip"})
+        assert plain.headers["ETag"] == compressed.headers["ETag"]
+
+    def test_errors_have_no_etag(self, client):
+        response = client.post("/api/suggest-workout", json={"gender": "male"})
+        assert response.status_code == 400
+        assert "ETag" not in response.headers
+
+    def test_catalog_change_changes_etag(self, client, monkeypatch):
+        holder = CatalogHolder(poll_seconds=0)
+        monkeypatch.setattr(catalog_module, "_holder", holder)
+        etag = client.get("/api/exercises").headers["ETag"]
+
+        holder.replace(ALL_EXERCISES[:-1], EXERCISE_TO_PATTERN)
+        response = client.get("/api/exercises", headers={"If-None-Match": etag})
+        assert response.status_code == 200
+        assert response.headers["ETag"] != etag
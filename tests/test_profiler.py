@@ -0,0 +1,96 @@
+"""Tests for the sampling profiler and per-request profiling."""
+
+import sys
+import os
+import threading
+
+# Add src/backend to path for imports
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src', 'backend'))
+
+import pytest
+from app import app
+from models import profiler
+
+
+SAMPLE_INPUT = {
+    "gender": "male",
+    "goal": "hypertrophy",
+    "experience": "intermediate",
+    "days_per_week": 3,
+    "equipment": ["barbell", "dumbbell", "cable", "machine"],
+}
+
+
+@pytest.fixture
+def client(client, monkeypatch):
+    """Flask test client with profiling enabled."""
+    monkeypatch.setitem(app.config, "PROFILING_ENABLED", True)
+    monkeypatch.setattr(profiler, "_last_finished", None)
+    return client
+
+
+def busy_worker(stop):
+    while not stop.is_set():
+        sum(range(1000))
+
+
+class TestSamplingProfiler:
+    """Test the collapsed-stack sampling endpoint."""
+
+    def test_collapsed_stacks(self, client):
+        stop = threading.Event()
+        worker = threading.Thread(target=busy_worker, args=(stop,))
+        worker.start()
+        try:
+            response = client.get("/api/debug/profile?seconds=0.2&interval=0.002")
+        finally:
+            stop.set()
+            worker.join()
+
+        assert response.status_code == 200
+        lines = response.get_data(as_text=True).splitlines()
+        worker_lines = [line for line in lines if "busy_worker" in line]
+        assert worker_lines
+        stack, count = worker_lines[0].rsplit(" ", 1)
+        assert int(count) > 0
+        assert stack.split(";")[0].endswith(":Thread._bootstrap")
+
+    def test_rate_limited(self, client):
+        assert client.get("/api/debug/profile?seconds=0.1").status_code == 200
+
+        response = client.get("/api/debug/profile?seconds=0.1")
+        assert response.status_code == 429
+        assert int(response.headers["Retry-After"]) >= 1
+
+    def test_invalid_parameters(self, client):
+        response = client.get("/api/debug/profile?seconds=600")
+        assert response.status_code == 400
+
+        response = client.get("/api/debug/profile?interval=fast")
+        assert response.status_code == 400
+
+    def test_disabled(self, client):
+        app.config["PROFILING_ENABLED"] = False
+        assert client.get("/api/debug/profile?seconds=0.1").status_code == 404
+
+
+class TestRequestProfile:
+    """Test the X-Profile request header."""
+
+    def test_profile_header_returns_summary(self, client):
+        response = client.post(
+            "/api/suggest-workout", json=SAMPLE_INPUT, headers={"X-Profile": "1"}
+        )
+        assert response.status_code == 200
+        assert response.headers["X-Profile"] == "cprofile"
+        text = response.get_data(as_text=True)
+        assert "function calls" in text
+        assert "build_workout_day" in text
+
+    def test_profile_header_ignored_when_disabled(self, client):
+        app.config["PROFILING_ENABLED"] = False
+        response = client.post(
+            "/api/suggest-workout", json=SAMPLE_INPUT, headers={"X-Profile": "1"}
+        )
+        assert response.status_code == 200
+        assert "workouts" in response.get_json()
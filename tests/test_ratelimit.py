@@ -0,0 +1,243 @@
+"""Tests for per-client token-bucket rate limiting."""
+
+import sys
+import os
+import multiprocessing
+import tempfile
+import uuid
+from multiprocessing import shared_memory
+
+# Add src/backend to path for imports
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src', 'backend'))
+
+import pytest
+import ratelimit
+from app import app
+from flask import Flask
+
+
+SAMPLE_INPUT = {
+    "gender": "male",
+    "goal": "hypertrophy",
+    "experience": "intermediate",
+    "days_per_week": 3,
+    "equipment": ["barbell", "dumbbell", "cable", "machine"],
+}
+
+
+@pytest.fixture
+def client(client, monkeypatch):
+    """Test client with rate limiting on and a fresh local backend."""
+    monkeypatch.setitem(app.config, "RATE_LIMIT_ENABLED", True)
+    # Slow refill so the tests see whole-token steps
+    monkeypatch.setitem(app.config, "RATE_LIMIT_RATE", 0.01)
+    monkeypatch.setitem(app.config, "RATE_LIMIT_BURST", 30)
+    monkeypatch.setitem(app.config, "RATE_LIMIT_BACKEND", "local")
+    monkeypatch.setitem(app.config, "RATE_LIMIT_API_KEYS", {"partner-key"})
+    ratelimit.reset_backend(app)
+    yield client
+    ratelimit.reset_backend(app)
+
+
+@pytest.fixture
+def shm_name():
+    name = f"fitmentor-test-{uuid.uuid4().hex[:12]}"
+    yield name
+    lock_path = os.path.join(tempfile.gettempdir(), f"{name}.shm.lock")
+    if os.path.exists(lock_path):
+        os.unlink(lock_path)
+    try:
+        segment = shared_memory.SharedMemory(name)
+    except FileNotFoundError:
+        return
+    segment.close()
+    segment.unlink()
+
+
+class TestLocalBackend:
+    """Token-bucket arithmetic."""
+
+    def test_burst_then_refill(self):
+        backend = ratelimit.LocalBackend()
+        assert backend.take("a", 4, 1.0, 10, now=0.0) == (True, 6)
+        assert backend.take("a", 4, 1.0, 10, now=0.0) == (True, 2)
+        assert backend.take("a", 4, 1.0, 10, now=0.0) == (False, 2)
+        # Two seconds refill two tokens
+        assert backend.take("a", 4, 1.0, 10, now=2.0) == (True, 0)
+
+    def test_refill_capped_at_burst(self):
+        backend = ratelimit.LocalBackend()
+        backend.take("a", 1, 1.0, 10, now=0.0)
+        assert backend.take("a", 1, 1.0, 10, now=100.0) == (True, 9)
+
+    def test_keys_are_independent(self):
+        backend = ratelimit.LocalBackend()
+        assert backend.take("a", 10, 1.0, 10, now=0.0)[0]
+        assert not backend.take("a", 1, 1.0, 10, now=0.0)[0]
+        assert backend.take("b", 10, 1.0, 10, now=0.0)[0]
+
+    def test_least_recently_used_dropped(self):
+        backend = ratelimit.LocalBackend(max_keys=2)
+        backend.take("a", 10, 1.0, 10, now=0.0)
+        backend.take("b", 10, 1.0, 10, now=0.0)
+        backend.take("c", 10, 1.0, 10, now=0.0)
+        # "a" was forgotten, so it starts over with a full bucket
+        assert backend.take("a", 10, 1.0, 10, now=0.0)[0]
+        assert not backend.take("c", 1, 1.0, 10, now=0.0)[0]
+
+
+def _take_all(name, results):
+    backend = ratelimit.SharedMemoryBackend(name, slots=16)
+    allowed = 0
+    for _ in range(50):
+        allowed += backend.take("client", 1, 1e-9, 40)[0]
+    backend.close()
+    results.put(allowed)
+
+
+class TestSharedMemoryBackend:
+    """Buckets shared through a named segment."""
+
+    def test_same_arithmetic(self, shm_name):
+        backend = ratelimit.SharedMemoryBackend(shm_name, slots=16)
+        assert backend.take("a", 4, 1.0, 10, now=0.0) == (True, 6)
+        assert backend.take("a", 8, 1.0, 10, now=0.0) == (False, 6)
+        assert backend.take("a", 8, 1.0, 10, now=2.0) == (True, 0)
+        backend.close()
+
+    def test_shared_between_attachments(self, shm_name):
+        first = ratelimit.SharedMemoryBackend(shm_name, slots=16)
+        second = ratelimit.SharedMemoryBackend(shm_name, slots=16)
+        assert first.take("a", 10, 1.0, 10, now=0.0)[0]
+        assert not second.take("a", 1, 1.0, 10, now=0.0)[0]
+        first.close()
+        second.close()
+
+    def test_shared_between_processes(self, shm_name):
+        # Attach in the parent first, as the app's first request would
+        ratelimit.SharedMemoryBackend(shm_name, slots=16).close()
+        results = multiprocessing.Queue()
+        workers = [multiprocessing.Process(target=_take_all, args=(shm_name, results))
+                   for _ in range(4)]
+        for w in workers:
+            w.start()
+        for w in workers:
+            w.join(timeout=30)
+        # 4 x 50 attempts against one bucket of 40 tokens
+        assert sum(results.get(timeout=5) for _ in workers) == 40
+
+    def test_full_probe_window_evicts_oldest(self, shm_name, monkeypatch):
+        monkeypatch.setattr(ratelimit, "SHM_PROBE", 2)
+        backend = ratelimit.SharedMemoryBackend(shm_name, slots=2)
+        backend.take("a", 10, 1.0, 10, now=0.0)
+        backend.take("b", 10, 1.0, 10, now=1.0)
+        backend.take("c", 10, 1.0, 10, now=2.0)
+        # "a" was the oldest, so "c" took its slot and "b" is still empty
+        assert not backend.take("b", 5, 1.0, 10, now=2.0)[0]
+        assert backend.take("a", 10, 1.0, 10, now=3.0)[0]
+        backend.close()
+
+    def test_too_small_segment(self, shm_name):
+        ratelimit.SharedMemoryBackend(shm_name, slots=16).close()
+        with pytest.raises(ValueError):
+            ratelimit.SharedMemoryBackend(shm_name, slots=1024)
+
+
+class TestRateLimitedApp:
+    """Rate limiting of API requests."""
+
+    def test_headers(self, client):
+        response = client.get("/api/exercises")
+        assert response.status_code == 200
+        assert response.headers["RateLimit-Limit"] == "30"
+        assert response.headers["RateLimit-Remaining"] == "29"
+        assert int(response.headers["RateLimit-Reset"]) == 100
+
+    def test_plan_generation_costs_more(self, client):
+        response = client.post("/api/suggest-workout", json=SAMPLE_INPUT)
+        assert response.headers["RateLimit-Remaining"] == "20"
+        response = client.post("/api/exercises/lookup", json={"ids": []})
+        assert response.headers["RateLimit-Remaining"] == "19"
+
+    def test_empty_bucket_gets_429(self, client):
+        for _ in range(3):
+            assert client.post("/api/suggest-workout", json=SAMPLE_INPUT).status_code == 200
+        response = client.post("/api/suggest-workout", json=SAMPLE_INPUT)
+        assert response.status_code == 429
+        assert response.get_json()["error"]
+        # 10 tokens at 0.01 per second
+        assert response.headers["Retry-After"] == "1000"
+        assert response.headers["RateLimit-Remaining"] == "0"
+        assert response.headers["Access-Control-Allow-Origin"] == "*"
+
+    def test_cheap_requests_still_allowed(self, client):
+        client.application.config["RATE_LIMIT_BURST"] = 35
+        for _ in range(3):
+            client.post("/api/suggest-workout", json=SAMPLE_INPUT)
+        assert client.post("/api/suggest-workout", json=SAMPLE_INPUT).status_code == 429
+        assert client.get("/api/exercises").status_code == 200
+
+    def test_probes_exempt(self, client):
+        for _ in range(3):
+            client.post("/api/suggest-workout", json=SAMPLE_INPUT)
+        for path in ("/healthz", "/metrics"):
+            response = client.get(path)
+            assert response.status_code == 200
+            assert "RateLimit-Remaining" not in response.headers
+
+    def test_preflight_exempt(self, client):
+        for _ in range(3):
+            client.post("/api/suggest-workout", json=SAMPLE_INPUT)
+        assert client.options("/api/suggest-workout").status_code == 200
+
+    def test_clients_by_address(self, client):
+        for _ in range(3):
+            client.post("/api/suggest-workout", json=SAMPLE_INPUT)
+        assert client.get("/api/exercises").status_code == 429
+        other = client.get("/api/exercises", environ_base={"REMOTE_ADDR": "10.0.0.2"})
+        assert other.status_code == 200
+
+    def test_known_api_key_has_own_bucket(self, client):
+        for _ in range(3):
+            client.post("/api/suggest-workout", json=SAMPLE_INPUT)
+        response = client.get("/api/exercises", headers={"X-API-Key": "partner-key"})
+        assert response.status_code == 200
+        # Made-up keys fall back to the address
+        response = client.get("/api/exercises", headers={"X-API-Key": "made-up"})
+        assert response.status_code == 429
+
+    def test_custom_costs(self, client):
+        client.application.config["RATE_LIMIT_COSTS"] = {"/api/exercises": 0}
+        try:
+            response = client.get("/api/exercises")
+            assert "RateLimit-Remaining" not in response.headers
+        finally:
+            client.application.config["RATE_LIMIT_COSTS"] = {}
+
+    def test_cost_capped_at_burst(self, client):
+        client.application.config["RATE_LIMIT_BURST"] = 5
+        assert client.post("/api/suggest-workout", json=SAMPLE_INPUT).status_code == 200
+
+    def test_off_under_testing_by_default(self, client):
+        client.application.config["RATE_LIMIT_ENABLED"] = None
+        for _ in range(5):
+            response = client.post("/api/suggest-workout", json=SAMPLE_INPUT)
+            assert response.status_code == 200
+        assert "RateLimit-Remaining" not in response.headers
+
+
+class TestInitApp:
+    """Configuration checks when the limiter is registered."""
+
+    @pytest.mark.parametrize("key", ["RATE_LIMIT_RATE", "RATE_LIMIT_BURST"])
+    @pytest.mark.parametrize("value", [0, -1])
+    def test_non_positive_rejected(self, key, value):
+        other = Flask("ratelimit-config-test")
+        other.config[key] = value
+        with pytest.raises(ValueError, match=key):
+            ratelimit.init_app(other)
+
+    def test_rate_from_environment(self, monkeypatch):
+        monkeypatch.setenv("FITMENTOR_RATE_LIMIT_RATE", "0")
+        with pytest.raises(ValueError):
+            ratelimit.init_app(Flask("ratelimit-env-test"))
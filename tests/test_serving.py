@@ -0,0 +1,361 @@
+"""Tests for the I/O and plan-generation executors."""
+
+import sys
+import os
+import threading
+import time
+
+# Add src/backend to path for imports
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src', 'backend'))
+
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+import app as app_module
+import serving
+from app import app
+from models import data_collector, metrics, workout_storage, workout_suggester
+
+
+SAMPLE_INPUT = {
+    "gender": "male",
+    "goal": "hypertrophy",
+    "experience": "intermediate",
+    "days_per_week": 3,
+    "equipment": ["barbell", "dumbbell", "cable", "machine"],
+}
+
+
+class TestBoundedExecutor:
+    """Test queue bounding."""
+
+    def test_rejects_when_full(self):
+        release = threading.Event()
+        executor = serving.BoundedExecutor(ThreadPoolExecutor(1), max_pending=2)
+        try:
+            futures = [executor.submit(release.wait) for _ in range(2)]
+            with pytest.raises(serving.Overloaded):
+                executor.submit(release.wait)
+
+            release.set()
+            for future in futures:
+                future.result(5)
+            # Slots are released once jobs finish
+            assert executor.submit(lambda: 42).result(5) == 42
+        finally:
+            release.set()
+            executor.shutdown()
+
+
+def _run_concurrently(count, func):
+    """Call func(i) from count threads started together; returns the results."""
+    barrier = threading.Barrier(count)
+
+    def call(i):
+        barrier.wait()
+        return func(i)
+
+    with ThreadPoolExecutor(count) as pool:
+        return list(pool.map(call, range(count)))
+
+
+def _flight_count(group, role):
+    return metrics.collect().get(("fitmentor_singleflight_calls_total", (group, role)), 0)
+
+
+class TestSingleFlight:
+    """Concurrent calls with the same key share one execution."""
+
+    def test_concurrent_calls_coalesce(self):
+        flight = serving.SingleFlight("test-coalesce")
+        calls = []
+
+        def slow(value):
+            calls.append(value)
+            time.sleep(0.2)
+            return {"value": value}
+
+        results = _run_concurrently(8, lambda i: flight.do("key", slow, 42))
+
+        assert calls == [42]
+        assert all(r is results[0] for r in results)
+        assert _flight_count("test-coalesce", "leader") == 1
+        assert _flight_count("test-coalesce", "follower") == 7
+
+    def test_different_keys_run_separately(self):
+        flight = serving.SingleFlight("test-keys")
+        results = _run_concurrently(4, lambda i: flight.do(i % 2, lambda: i % 2))
+        assert sorted(results) == [0, 0, 1, 1]
+
+    def test_exception_is_shared(self):
+        flight = serving.SingleFlight("test-error")
+        calls = []
+
+        def failing():
+            calls.append(1)
+            time.sleep(0.2)
+            raise ValueError("bad input")
+
+        def call(i):
+            try:
+                flight.do("key", failing)
+            except ValueError as e:
+                return str(e)
+
+        assert _run_concurrently(4, call) == ["bad input"] * 4
+        assert len(calls) == 1
+
+    def test_finished_calls_are_not_cached(self):
+        flight = serving.SingleFlight("test-rerun")
+        calls = []
+        for _ in range(3):
+            flight.do("key", calls.append, 1)
+        assert len(calls) == 3
+
+
+class TestAdmissionControl:
+    """Bounded concurrency with fast rejection."""
+
+    def _hold(self, admission):
+        """Occupy one slot on another thread until the returned event is set."""
+        entered, release = threading.Event(), threading.Event()
+
+        def hold():
+            with admission.admit():
+                entered.set()
+                release.wait(5)
+
+        thread = threading.Thread(target=hold)
+        thread.start()
+        assert entered.wait(5)
+        return release, thread
+
+    def test_waits_for_a_free_slot(self):
+        admission = serving.AdmissionControl("test-wait", 1, 4, timeout=5)
+        release, thread = self._hold(admission)
+        threading.Timer(0.1, release.set).start()
+
+        with admission.admit():
+            assert admission.info()["running"] == 1
+        thread.join()
+        assert admission.info() == {"running": 0, "waiting": 0, "limit": 1, "max_queue": 4}
+
+    def test_rejects_when_queue_full(self):
+        admission = serving.AdmissionControl("test-full", 1, 0, timeout=5)
+        release, thread = self._hold(admission)
+        try:
+            start = time.monotonic()
+            with pytest.raises(serving.Overloaded):
+                with admission.admit():
+                    pass
+            assert time.monotonic() - start < 0.5
+        finally:
+            release.set()
+            thread.join()
+
+    def test_times_out(self):
+        admission = serving.AdmissionControl("test-timeout", 1, 4, timeout=0.1)
+        release, thread = self._hold(admission)
+        try:
+            with pytest.raises(serving.Overloaded):
+                with admission.admit():
+                    pass
+        finally:
+            release.set()
+            thread.join()
+        assert admission.info()["waiting"] == 0
+
+    def test_rejects_on_expected_wait(self):
+        admission = serving.AdmissionControl("test-expected", 1, 4, timeout=2)
+        admission._run_seconds = 7.2
+        release, thread = self._hold(admission)
+        try:
+            start = time.monotonic()
+            with pytest.raises(serving.Overloaded) as excinfo:
+                with admission.admit():
+                    pass
+            assert time.monotonic() - start < 0.5
+            assert excinfo.value.retry_after == 8
+        finally:
+            release.set()
+            thread.join()
+
+    def test_slot_released_on_error(self):
+        admission = serving.AdmissionControl("test-error", 1, 0, timeout=1)
+        with pytest.raises(ValueError):
+            with admission.admit():
+                raise ValueError
+        with admission.admit():
+            pass
+
+
+def _wait_for_io(timeout=5):
+    deadline = time.monotonic() + timeout
+    while serving.io_queue_depth() and time.monotonic() < deadline:
+        time.sleep(0.01)
+
+
+@pytest.fixture
+def tiny_io_pool(monkeypatch):
+    """An I/O pool with one thread and no queue."""
+    executor = serving.BoundedExecutor(ThreadPoolExecutor(1), 1)
+    monkeypatch.setattr(serving, "_io_executor", executor)
+    yield executor
+    executor.shutdown()
+
+
+class TestIoJobs:
+    """Waiting and background file jobs."""
+
+    def test_run_io_timeout_is_overloaded(self, tiny_io_pool, monkeypatch):
+        monkeypatch.setattr(serving, "IO_TIMEOUT", 0.05)
+        release = threading.Event()
+        try:
+            with pytest.raises(serving.Overloaded):
+                serving.run_io(release.wait)
+        finally:
+            release.set()
+
+    def test_submit_io_drops_when_full(self, tiny_io_pool):
+        release = threading.Event()
+        first = serving.submit_io(release.wait)
+        try:
+            assert first is not None
+            assert serving.submit_io(release.wait) is None
+        finally:
+            release.set()
+        assert 'fitmentor_io_dropped_total{job="wait"}' in metrics.render()
+        assert first.result(1)
+
+    def test_failures_are_logged(self, tiny_io_pool, caplog):
+        def broken():
+            raise OSError("disk full")
+
+        serving.submit_io(broken)
+        _wait_for_io()
+        assert "Background file job failed" in caplog.text
+
+
+class TestServingEndpoints:
+    """Test endpoints routed through the executors."""
+
+    def test_storage_on_io_pool(self, client, monkeypatch):
+        threads = []
+        original = workout_storage.save_workout
+
+        def recording_save(*args):
+            threads.append(threading.current_thread().name)
+            return original(*args)
+
+        monkeypatch.setattr(workout_storage, "save_workout", recording_save)
+        response = client.post("/api/workouts/save", json={
+            "name": "Push Day", "workout": {"exercises": []}, "input_params": {},
+        })
+        assert response.status_code == 201
+        assert threads[0].startswith("fitmentor-io")
+        assert client.get("/api/workouts/exists/Push%20Day").get_json()["exists"]
+
+    def test_overloaded_returns_503(self, client, monkeypatch):
+        def overloaded(*args, **kwargs):
+            raise serving.Overloaded("full")
+
+        monkeypatch.setattr(serving, "run_io", overloaded)
+        response = client.get("/api/stats")
+        assert response.status_code == 503
+        assert response.headers["Retry-After"] == "1"
+
+    def test_slow_log_does_not_fail_requests(self, client, tiny_io_pool, monkeypatch):
+        release = threading.Event()
+        original = data_collector.log_workout_plan
+
+        def slow_log(*args):
+            release.wait(5)
+            return original(*args)
+
+        monkeypatch.setattr(data_collector, "log_workout_plan", slow_log)
+        try:
+            # The first log holds the only I/O slot; the rest are dropped
+            for _ in range(3):
+                response = client.post("/api/suggest-workout", json=SAMPLE_INPUT)
+                assert response.status_code == 200
+            response = client.post("/api/calculate-calories", json={
+                "age": 30, "height": 180, "weight": 80, "gender": "male",
+                "activity_level": "moderate", "goal": "maintain",
+            })
+            assert response.status_code == 200
+        finally:
+            release.set()
+        _wait_for_io()
+        assert len(data_collector.read_records("workout_plans.jsonl")) == 1
+
+    def test_suggest_day_on_process_pool(self, client, monkeypatch):
+        monkeypatch.setattr(serving, "SUGGEST_PROCESSES", 1)
+        body = dict(SAMPLE_INPUT, day_index=1)
+        try:
+            response = client.post("/api/suggest-workout/day", json=body)
+            invalid = client.post("/api/suggest-workout/day", json=dict(body, day_index=9))
+        finally:
+            serving.shutdown()
+
+        assert response.status_code == 200
+        assert invalid.status_code == 400
+        inline = client.post("/api/suggest-workout/day", json=body)
+        assert response.get_json() == inline.get_json()
+
+    def test_suggest_on_process_pool(self, client, monkeypatch):
+        monkeypatch.setattr(serving, "SUGGEST_PROCESSES", 1)
+        try:
+            response = client.post("/api/suggest-workout", json=SAMPLE_INPUT)
+        finally:
+            serving.shutdown()
+
+        assert response.status_code == 200
+        inline = client.post("/api/suggest-workout", json=SAMPLE_INPUT)
+        assert response.get_json() == inline.get_json()
+
+    def test_identical_suggests_coalesce(self, client, monkeypatch):
+        calls = []
+        original = workout_suggester.suggest
+
+        def slow_suggest(data):
+            calls.append(1)
+            time.sleep(0.2)
+            return original(data)
+
+        monkeypatch.setattr(workout_suggester, "suggest", slow_suggest)
+
+        def post(i):
+            with app.test_client() as c:
+                return c.post("/api/suggest-workout", json=SAMPLE_INPUT)
+
+        responses = _run_concurrently(6, post)
+
+        assert [r.status_code for r in responses] == [200] * 6
+        assert len({r.get_data() for r in responses}) == 1
+        assert len(calls) == 1
+        # Every request is still logged (in the background)
+        _wait_for_io()
+        assert len(data_collector.read_records("workout_plans.jsonl")) == 6
+
+    def test_busy_plan_generation_sheds_load(self, client, monkeypatch):
+        admission = serving.AdmissionControl("test-plans", 1, 0, timeout=1)
+        monkeypatch.setattr(app_module, "_plan_admission", admission)
+        admission._run_seconds = 3.5
+
+        release, thread = TestAdmissionControl()._hold(admission)
+        try:
+            response = client.post("/api/suggest-workout", json=SAMPLE_INPUT)
+            assert response.status_code == 503
+            assert response.headers["Retry-After"] == "4"
+
+            day = client.post("/api/suggest-workout/day", json=dict(SAMPLE_INPUT, day_index=0))
+            assert day.status_code == 503
+
+            # Cheap endpoints don't wait on plan generation
+            assert client.get("/api/exercises").status_code == 200
+            assert client.get("/api/workouts/exists/push%20day").status_code == 200
+        finally:
+            release.set()
+            thread.join()
+
+        assert client.post("/api/suggest-workout", json=SAMPLE_INPUT).status_code == 200
@@ -0,0 +1,148 @@
+"""Differential tests: the vectorized selector must match the reference one.
+
+Every comparison runs the same inputs through ExerciseSelector and
+VectorizedExerciseSelector and asserts identical results.
+"""
+
+import sys
+import os
+import itertools
+import random
+
+# Add src/backend to path for imports
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src', 'backend'))
+
+import pytest
+
+pytest.importorskip("numpy")
+
+from models import workout_suggester, movement_patterns
+from models.catalog import CatalogSnapshot
+from models.workout_generator import ExerciseSelector
+from models.vectorized_selector import VectorizedExerciseSelector
+from models.exercise_data import ALL_EXERCISES, SUB_REGIONS, NIPPARD_TIERS
+
+EQUIPMENT_SETS = [
+    ["bodyweight"],
+    ["bodyweight", "dumbbell", "bench"],
+    ["bodyweight", "barbell", "dumbbell", "bench", "rack"],
+    ["bodyweight", "cable", "machine"],
+    ["bodyweight", "barbell", "barbell_ez", "dumbbell", "bench", "rack",
+     "cable", "machine", "pullup_bar"],
+]
+EXPERIENCES = ["beginner", "intermediate", "advanced"]
+
+
+def _ids(selection):
+    selected, used_patterns, warnings = selection
+    return [e["id"] for e in selected], sorted(used_patterns), warnings
+
+
+def _random_selection_calls(rng, n_calls):
+    """Yield random select_for_muscle_group arguments."""
+    all_ids = [e["id"] for e in ALL_EXERCISES]
+    all_patterns = sorted(set(movement_patterns.EXERCISE_TO_PATTERN.values()))
+    for _ in range(n_calls):
+        muscle_group = rng.choice(sorted(SUB_REGIONS))
+        subs = SUB_REGIONS[muscle_group]
+        yield {
+            "muscle_group": muscle_group,
+            "target_subregions": rng.choice(
+                [None, rng.sample(subs, rng.randint(1, len(subs)))]
+            ),
+            "used_patterns": set(rng.sample(all_patterns, rng.randint(0, 6))),
+            "excluded_exercise_ids": set(rng.sample(all_ids, rng.randint(0, 30))),
+            "target_count": rng.choice([None, 1, 2, 3, 5, 8]),
+        }
+
+
+class TestVectorizedSelectorDifferential:
+    """Compare the vectorized engine against the reference engine."""
+
+    @pytest.mark.parametrize("equipment", EQUIPMENT_SETS)
+    @pytest.mark.parametrize("experience", EXPERIENCES)
+    def test_select_for_muscle_group_matches(self, equipment, experience):
+        """Randomized selection calls produce identical results."""
+        reference = ExerciseSelector(equipment, experience)
+        vectorized = VectorizedExerciseSelector(equipment, experience)
+
+        rng = random.Random(f"{experience}-{len(equipment)}")
+        for kwargs in _random_selection_calls(rng, 200):
+            ref_kwargs = dict(kwargs, used_patterns=set(kwargs["used_patterns"]))
+            vec_kwargs = dict(kwargs, used_patterns=set(kwargs["used_patterns"]))
+            assert _ids(vectorized.select_for_muscle_group(**vec_kwargs)) == \
+                _ids(reference.select_for_muscle_group(**ref_kwargs)), kwargs
+
+    @pytest.mark.parametrize("experience", EXPERIENCES)
+    def test_duplicate_target_subregions_match(self, experience):
+        """A sub-region listed twice ranks by its first position."""
+        reference = ExerciseSelector(EQUIPMENT_SETS[-1], experience)
+        vectorized = VectorizedExerciseSelector(EQUIPMENT_SETS[-1], experience)
+
+        rng = random.Random(f"duplicates-{experience}")
+        for kwargs in _random_selection_calls(rng, 200):
+            subs = kwargs["target_subregions"] or SUB_REGIONS[kwargs["muscle_group"]]
+            kwargs["target_subregions"] = subs + [subs[0]] + rng.sample(subs, len(subs))
+            ref_kwargs = dict(kwargs, used_patterns=set(kwargs["used_patterns"]))
+            vec_kwargs = dict(kwargs, used_patterns=set(kwargs["used_patterns"]))
+            assert _ids(vectorized.select_for_muscle_group(**vec_kwargs)) == \
+                _ids(reference.select_for_muscle_group(**ref_kwargs)), kwargs
+
+    @pytest.mark.parametrize("experience", EXPERIENCES)
+    def test_subregion_candidates_match(self, experience):
+        """Sub-region candidate lists keep the reference tier order."""
+        reference = ExerciseSelector(EQUIPMENT_SETS[-1], experience)
+        vectorized = VectorizedExerciseSelector(EQUIPMENT_SETS[-1], experience)
+        for sub_region in itertools.chain.from_iterable(SUB_REGIONS.values()):
+            assert vectorized._get_exercises_for_subregion(sub_region) == \
+                reference._get_exercises_for_subregion(sub_region)
+
+    def test_full_plan_grid_matches(self, monkeypatch):
+        """suggest() returns identical plans with either engine."""
+        grid = itertools.product(
+            ["male", "female"],
+            ["strength", "hypertrophy"],
+            EXPERIENCES,
+            [3, 4, 5, 6],
+            EQUIPMENT_SETS,
+        )
+        for gender, goal, experience, days, equipment in grid:
+            data = {
+                "gender": gender,
+                "goal": goal,
+                "experience": experience,
+                "equipment": equipment,
+                "days_per_week": days,
+            }
+            monkeypatch.setattr(workout_suggester, "SELECTOR_ENGINE", "reference")
+            expected = workout_suggester.suggest(data)
+            monkeypatch.setattr(workout_suggester, "SELECTOR_ENGINE", "vectorized")
+            assert workout_suggester.suggest(data) == expected, data
+
+    def test_large_synthetic_catalog_matches(self):
+        """Results still match on a catalog of thousands of exercises."""
+        rng = random.Random(7)
+        exercises = list(ALL_EXERCISES)
+        patterns = dict(movement_patterns.EXERCISE_TO_PATTERN)
+        for i in range(2000):
+            base = rng.choice(ALL_EXERCISES)
+            variation = dict(
+                base,
+                id=f"{base['id']}-var-{i}",
+                name=f"{base['name']} Variation {i % 50}",
+                nippard_tier=rng.choice(NIPPARD_TIERS + [None]),
+            )
+            exercises.append(variation)
+            pattern = patterns.get(base["id"])
+            if pattern and rng.random() < 0.8:
+                patterns[variation["id"]] = pattern
+        catalog = CatalogSnapshot(0, exercises, patterns)
+
+        reference = ExerciseSelector(EQUIPMENT_SETS[-1], "advanced", catalog)
+        vectorized = VectorizedExerciseSelector(EQUIPMENT_SETS[-1], "advanced", catalog)
+
+        for kwargs in _random_selection_calls(rng, 100):
+            ref_kwargs = dict(kwargs, used_patterns=set(kwargs["used_patterns"]))
+            vec_kwargs = dict(kwargs, used_patterns=set(kwargs["used_patterns"]))
+            assert _ids(vectorized.select_for_muscle_group(**vec_kwargs)) == \
+                _ids(reference.select_for_muscle_group(**ref_kwargs)), kwargs
@@ -0,0 +1,125 @@
+"""Tests for cache warm-up from request logs."""
+
+import sys
+import os
+import json
+
+# Add src/backend to path for imports
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src', 'backend'))
+
+import pytest
+from models import data_collector, warmup, workout_suggester
+from models.catalog import get_catalog
+
+
+BASE_INPUT = {
+    "gender": "male",
+    "goal": "hypertrophy",
+    "experience": "intermediate",
+    "days_per_week": 3,
+    "equipment": ["barbell", "dumbbell", "cable", "machine"],
+}
+
+
+@pytest.fixture
+def data_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(data_collector, "DATA_DIR", tmp_path)
+    return tmp_path
+
+
+def _write_log(data_dir, inputs, extra_lines=()):
+    with open(data_dir / warmup.WORKOUT_LOG, "w") as f:
+        for line in extra_lines:
+            f.write(line + "\n")
+        for data in inputs:
+            f.write(json.dumps({"timestamp": "t", "input": data, "output_blob": "x"}) + "\n")
+
+
+class TestTopInputs:
+    """Inputs are ranked by how often their canonical form occurs."""
+
+    def test_ranked_by_frequency(self, data_dir):
+        popular = dict(BASE_INPUT, days_per_week=4)
+        rare = dict(BASE_INPUT, goal="strength")
+        _write_log(data_dir, [rare] + [popular] * 3 + [BASE_INPUT] * 2)
+
+        top = warmup.top_workout_inputs(k=2)
+        assert top == [popular, BASE_INPUT]
+
+    def test_canonical_inputs_counted_together(self, data_dir):
+        reordered = dict(BASE_INPUT, equipment=list(reversed(BASE_INPUT["equipment"])))
+        other = dict(BASE_INPUT, days_per_week=5)
+        _write_log(data_dir, [other, other, BASE_INPUT, reordered, BASE_INPUT])
+
+        assert warmup.top_workout_inputs(k=1) == [BASE_INPUT]
+
+    def test_skips_invalid_records(self, data_dir):
+        _write_log(
+            data_dir,
+            [dict(BASE_INPUT, goal="nope"), {"gender": "male"}, BASE_INPUT],
+            extra_lines=["{not json", "[]", json.dumps({"input": "x"})],
+        )
+        assert warmup.top_workout_inputs() == [BASE_INPUT]
+
+    def test_reads_only_log_tail(self, data_dir):
+        old = dict(BASE_INPUT, days_per_week=6)
+        _write_log(data_dir, [old] * 50 + [BASE_INPUT])
+        line_size = len(json.dumps({"timestamp": "t", "input": BASE_INPUT, "output_blob": "x"}))
+
+        assert warmup.top_workout_inputs(max_bytes=line_size + 10) == [BASE_INPUT]
+
+    def test_missing_log(self, data_dir):
+        assert warmup.top_workout_inputs() == []
+
+
+class TestRun:
+    """The warm-up fills the plan-context cache."""
+
+    def test_fills_plan_contexts(self, data_dir):
+        popular = dict(BASE_INPUT, gender="female", days_per_week=5)
+        _write_log(data_dir, [popular] * 2)
+        key = (get_catalog().version, workout_suggester.input_key(popular))
+        workout_suggester._plan_contexts.pop(key, None)
+
+        extra = []
+        result = warmup.run(extra=[extra.append])
+
+        assert result["status"] == "done"
+        assert result["inputs"] == 1
+        assert key in workout_suggester._plan_contexts
+        assert extra == [get_catalog()]
+
+    def test_warm_suggest_reuses_selector(self, data_dir, monkeypatch):
+        popular = dict(BASE_INPUT, goal="strength", days_per_week=4)
+        _write_log(data_dir, [popular])
+        key = (get_catalog().version, workout_suggester.input_key(popular))
+        workout_suggester._plan_contexts.pop(key, None)
+        cold = workout_suggester.suggest(popular)
+        workout_suggester._plan_contexts.pop(key, None)
+        warmup.run()
+
+        built = []
+        original = workout_suggester.create_selector
+        monkeypatch.setattr(workout_suggester, "create_selector",
+                            lambda *args, **kwargs: built.append(1) or original(*args, **kwargs))
+
+        assert workout_suggester.suggest(popular) == cold
+        assert built == []
+
+    def test_background_start(self, data_dir):
+        _write_log(data_dir, [BASE_INPUT])
+        warmup.start()
+        assert warmup.wait(timeout=30)
+        assert warmup.status()["status"] == "done"
+
+    def test_failure_is_recorded(self, data_dir, monkeypatch):
+        _write_log(data_dir, [BASE_INPUT])
+
+        def broken(data):
+            raise RuntimeError("boom")
+
+        monkeypatch.setattr(workout_suggester, "suggest", broken)
+        result = warmup.run()
+        assert result["status"] == "failed"
+        assert "boom" in result["error"]
+        assert warmup.wait(timeout=1)
@@ -0,0 +1,109 @@
+"""Tests for the compact saved-workout encoding."""
+
+import sys
+import os
+import copy
+import itertools
+import json
+
+# Add src/backend to path for imports
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src', 'backend'))
+
+import pytest
+from models import workout_codec
+from models.workout_suggester import suggest
+
+
+BASE_INPUT = {
+    "gender": "male",
+    "goal": "hypertrophy",
+    "experience": "intermediate",
+    "days_per_week": 3,
+    "equipment": ["barbell", "dumbbell", "cable", "machine"],
+}
+
+
+@pytest.fixture(scope="module")
+def templates():
+    return workout_codec.get_templates()
+
+
+def _plans():
+    for gender, goal, days in itertools.product(
+        ["male", "female"], ["strength", "hypertrophy", "endurance"], [3, 4, 5, 6]
+    ):
+        yield suggest(dict(BASE_INPUT, gender=gender, goal=goal, days_per_week=days))
+
+
+def _roundtrip(workout, templates):
+    compact, defaults = workout_codec.encode(workout, templates)
+    # Stored as JSON, so decode what a reload would see
+    compact, defaults = json.loads(json.dumps([compact, defaults]))
+    return workout_codec.decode(compact, defaults, templates)
+
+
+class TestRoundTrip:
+    """Decoding gives back exactly what was encoded."""
+
+    def test_generated_plans(self, templates):
+        for plan in _plans():
+            decoded = _roundtrip(plan, templates)
+            assert decoded == plan
+            # Including key order of the exercise entries
+            assert json.dumps(decoded) == json.dumps(plan)
+
+    def test_client_edits(self, templates):
+        plan = copy.deepcopy(suggest(BASE_INPUT))
+        exercises = plan["workouts"][0]["exercises"]
+        exercises[0]["sets"] = 5
+        exercises[0]["name"] = "My Bench"
+        exercises[1]["notes"] = "paused reps"
+        del exercises[2]["targets"]
+        exercises[3]["rest_seconds"] = 90.0
+        plan["workouts"][1]["exercises"].append({"id": "custom-move", "name": "Custom"})
+
+        assert _roundtrip(plan, templates) == plan
+
+    def test_type_exact(self, templates):
+        plan = copy.deepcopy(suggest(BASE_INPUT))
+        plan["workouts"][0]["exercises"][0]["sets"] = True
+        decoded = _roundtrip(plan, templates)
+        assert decoded["workouts"][0]["exercises"][0]["sets"] is True
+
+    def test_decoded_entries_do_not_share_templates(self, templates):
+        plan = suggest(BASE_INPUT)
+        decoded = _roundtrip(plan, templates)
+        decoded["workouts"][0]["exercises"][0]["targets"].append("x")
+        exercise_id = plan["workouts"][0]["exercises"][0]["id"]
+        assert "x" not in templates[exercise_id]["targets"]
+
+
+class TestEncoding:
+    """Test the compact form itself."""
+
+    def test_not_a_plan(self, templates):
+        assert workout_codec.encode({"exercises": []}, templates) is None
+        assert workout_codec.encode({"workouts": [1]}, templates) is None
+        assert workout_codec.encode([], templates) is None
+
+    def test_non_dict_entries_not_encoded(self, templates):
+        plan = suggest(BASE_INPUT)
+        plan["workouts"][0]["exercises"][:0] = ["hello", [1, 2]]
+        assert workout_codec.encode(plan, templates) is None
+
+    def test_entries_are_references(self, templates):
+        plan = suggest(BASE_INPUT)
+        compact, _ = workout_codec.encode(plan, templates)
+        entries = [e for day in compact["workouts"] for e in day["exercises"]]
+        assert any(isinstance(e, str) for e in entries)
+        assert all(isinstance(e, (str, list)) for e in entries)
+
+    def test_unknown_ids_kept_verbatim(self, templates):
+        workout = {"workouts": [{"exercises": [{"id": "custom-move", "sets": 3}]}]}
+        compact, _ = workout_codec.encode(workout, templates)
+        assert compact["workouts"][0]["exercises"] == [{"id": "custom-move", "sets": 3}]
+
+    def test_smaller(self, templates):
+        plan = suggest(dict(BASE_INPUT, days_per_week=5))
+        compact = workout_codec.encode(plan, templates)
+        assert len(json.dumps(plan)) > 3 * len(json.dumps(compact, separators=(",", ":")))
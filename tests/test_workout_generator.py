@@ -27,7 +27,8 @@ from models.workout_generator import (
     validate_workout,
     VOLUME_BY_EXPERIENCE,
 )
-from models.workout_suggester import suggest, ValidationError
+from models import workout_suggester
+from models.workout_suggester import suggest, suggest_day, ValidationError
 from models.exercise_data import ALL_EXERCISES, SUB_REGIONS, TIER_RANK
 
 
@@ -632,5 +633,58 @@ class TestWorkoutDayVariation:
             f"Push A has {len(push_a['exercises'])} exercises, Push B has {len(push_b['exercises'])}"
 
 
+class TestSingleDayRegeneration:
+    """Test regenerating one day from a cached plan context."""
+
+    PPL_INPUT = {
+        "gender": "male",
+        "goal": "hypertrophy",
+        "experience": "intermediate",
+        "equipment": ["barbell", "dumbbell", "cable", "bench", "rack", "machine"],
+        "days_per_week": 6,
+    }
+
+    @staticmethod
+    def _lower_tier(workout):
+        return {e["id"] for e in workout["exercises"] if e["tier"] not in ("S+", "S")}
+
+    def test_regenerated_day_matches_plan(self):
+        """Without extra exclusions, the last variant rebuilds identically."""
+        plan = suggest(self.PPL_INPUT)
+        push_b = suggest_day(self.PPL_INPUT, 3)
+        assert push_b == plan["workouts"][3]
+
+    def test_regenerated_day_keeps_other_variant_constraints(self):
+        """Rebuilding variant A excludes variant B's lower-tier exercises."""
+        plan = suggest(self.PPL_INPUT)
+        push_a = suggest_day(self.PPL_INPUT, 0)
+        push_b = plan["workouts"][3]
+        assert not self._lower_tier(push_a) & self._lower_tier(push_b)
+
+    def test_regenerated_day_respects_exclusions(self):
+        """Requested exclusions are dropped from the rebuilt day."""
+        plan = suggest(self.PPL_INPUT)
+        excluded = sorted(self._lower_tier(plan["workouts"][3]))[:1]
+        push_b = suggest_day(self.PPL_INPUT, 3, excluded)
+        assert excluded[0] not in {e["id"] for e in push_b["exercises"]}
+
+    def test_regeneration_uses_cached_context(self, monkeypatch):
+        """A cached plan context means no full plan rebuild."""
+        suggest(self.PPL_INPUT)
+
+        def fail(*args):
+            raise AssertionError("full plan rebuilt")
+
+        monkeypatch.setattr(workout_suggester, "_build_plan", fail)
+        suggest_day(self.PPL_INPUT, 1)
+
+    def test_invalid_day_index(self):
+        """Out-of-range day indexes are rejected."""
+        with pytest.raises(ValidationError):
+            suggest_day(self.PPL_INPUT, 6)
+        with pytest.raises(ValidationError):
+            suggest_day(self.PPL_INPUT, "0")
+
+
 if __name__ == "__main__":
     pytest.main([__file__, "-v"])
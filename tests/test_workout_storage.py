@@ -0,0 +1,428 @@
+"""Tests for concurrency-safe workout storage."""
+
+import sys
+import os
+import json
+import multiprocessing
+import threading
+from pathlib import Path
+
+# Add src/backend to path for imports
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src', 'backend'))
+
+import pytest
+from models import workout_storage
+from models.catalog import CatalogSnapshot
+from models.exercise_data import ALL_EXERCISES
+from models.movement_patterns import EXERCISE_TO_PATTERN
+from models.workout_suggester import suggest
+from models.locking import RWLock, atomic_write_lines
+import reshard as reshard_cli
+
+
+PROCESSES = 4
+SAVES_PER_WORKER = 25
+
+
+@pytest.fixture
+def data_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(workout_storage, "DATA_DIR", tmp_path)
+    return tmp_path
+
+
+def _save_many(data_dir, worker):
+    """Save SAVES_PER_WORKER uniquely named workouts (runs in a child process)."""
+    workout_storage.DATA_DIR = Path(data_dir)
+    for i in range(SAVES_PER_WORKER):
+        result = workout_storage.save_workout(
+            f"w{worker}-{i}", {"exercises": [worker, i]}, {"worker": worker}
+        )
+        assert result["success"]
+
+
+def _saved_names():
+    return {record["name"] for record in workout_storage._read_all_records()}
+
+
+class TestConcurrentSaves:
+    """Concurrent saves must never lose records."""
+
+    def test_threads(self, data_dir):
+        threads = [
+            threading.Thread(target=_save_many, args=(data_dir, w)) for w in range(8)
+        ]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+        assert len(_saved_names()) == 8 * SAVES_PER_WORKER
+
+    @pytest.mark.parametrize("shards", [1, 4])
+    def test_processes(self, data_dir, shards):
+        workout_storage.reshard(shards)
+        context = multiprocessing.get_context("fork")
+        processes = [
+            context.Process(target=_save_many, args=(str(data_dir), w))
+            for w in range(PROCESSES)
+        ]
+        for p in processes:
+            p.start()
+        for p in processes:
+            p.join(60)
+            assert p.exitcode == 0
+
+        expected = {f"w{w}-{i}" for w in range(PROCESSES) for i in range(SAVES_PER_WORKER)}
+        assert _saved_names() == expected
+        # Every line is a complete record
+        lines = [
+            line for path in data_dir.glob("*.jsonl") for line in path.read_text().splitlines()
+        ]
+        assert len(lines) == len(expected)
+
+    def test_overwrite_keeps_one_record(self, data_dir):
+        for i in range(3):
+            workout_storage.save_workout("push day", {"exercises": [i]}, {})
+        records = workout_storage._read_all_records()
+        assert len(records) == 1
+        assert workout_storage.load_workout("Push Day")["workout"] == {"exercises": [2]}
+
+
+class TestRecordCache:
+    """The parsed-record cache is revalidated against the file's stat."""
+
+    @pytest.fixture
+    def parsed(self, monkeypatch):
+        """Record the size of every chunk the cache parses."""
+        sizes = []
+        original = workout_storage._parse_lines
+
+        def counting(data, source):
+            sizes.append(len(data))
+            return original(data, source)
+
+        monkeypatch.setattr(workout_storage, "_parse_lines", counting)
+        return sizes
+
+    def _path(self, data_dir):
+        return data_dir / workout_storage.SAVED_WORKOUTS_FILE
+
+    def _record(self, name):
+        return {"name": name, "saved_at": "2024-01-01T00:00:00",
+                "input_params": {}, "workout": {"name": name}}
+
+    def test_repeated_reads_do_not_reparse(self, data_dir, parsed):
+        workout_storage.save_workout("push day", {"exercises": []}, {})
+        for _ in range(5):
+            assert workout_storage.workout_exists("Push Day")["exists"]
+            assert workout_storage.load_workout("push day") is not None
+        # The save installed its own records, so nothing was parsed
+        assert parsed == []
+
+    def test_external_append_reloads(self, data_dir, parsed):
+        workout_storage.save_workout("push day", {"exercises": []}, {})
+        path = self._path(data_dir)
+
+        line = json.dumps(self._record("pull day")) + "\n"
+        with open(path, "a") as f:
+            f.write(line)
+
+        assert workout_storage.workout_exists("pull day")["exists"]
+        assert workout_storage.workout_exists("push day")["exists"]
+        assert parsed == [path.stat().st_size]
+
+    def test_longer_rewrite_of_same_inode_reloads(self, data_dir):
+        workout_storage.save_workout("alpha", {"v": "v1"}, {})
+        path = self._path(data_dir)
+        inode = path.stat().st_ino
+
+        # Another writer's file: same inode, longer, earlier bytes changed
+        record = dict(self._record("alpha"), workout={"v": "v2-longer"})
+        with open(path, "r+") as f:
+            f.write(json.dumps(record) + "\n")
+            f.truncate()
+        assert path.stat().st_ino == inode
+
+        assert workout_storage.load_workout("alpha")["workout"] == {"v": "v2-longer"}
+        workout_storage.save_workout("gamma", {"v": "g"}, {})
+        assert workout_storage._read_file(path)[0]["workout"] == {"v": "v2-longer"}
+
+    def test_save_checks_contents_when_stat_matches(self, data_dir, monkeypatch):
+        # Simulate a replace that reused the inode within one timestamp tick
+        monkeypatch.setattr(workout_storage, "_stat_key", lambda st: (st.st_size,))
+        workout_storage.save_workout("alpha", {"v": "v1"}, {})
+        path = self._path(data_dir)
+
+        text = path.read_text()
+        path.write_text(text.replace('"v1"', '"v2"'))
+
+        workout_storage.save_workout("gamma", {"v": "g"}, {})
+        records = {r["name"]: r for r in workout_storage._read_file(path)}
+        assert records["alpha"]["workout"] == {"v": "v2"}
+        assert "gamma" in records
+
+    def test_unparsable_lines_are_logged(self, data_dir, caplog):
+        path = self._path(data_dir)
+        path.write_text("{broken\n" + json.dumps(self._record("push day")) + "\n")
+        assert workout_storage.workout_exists("push day")["exists"]
+        assert "skipping unparsable line 1" in caplog.text
+
+    def test_partial_append_is_picked_up_when_complete(self, data_dir):
+        workout_storage.save_workout("push day", {"exercises": []}, {})
+        path = self._path(data_dir)
+        line = json.dumps(self._record("pull day")) + "\n"
+
+        with open(path, "a") as f:
+            f.write(line[:20])
+        assert not workout_storage.workout_exists("pull day")["exists"]
+
+        with open(path, "a") as f:
+            f.write(line[20:])
+        assert workout_storage.workout_exists("pull day")["exists"]
+
+    def test_external_rewrite_reloads(self, data_dir, parsed):
+        workout_storage.save_workout("push day", {"exercises": []}, {})
+        path = self._path(data_dir)
+
+        replacement = data_dir / "replacement.jsonl"
+        replacement.write_text(json.dumps(self._record("legs day")) + "\n")
+        os.replace(replacement, path)
+
+        assert not workout_storage.workout_exists("push day")["exists"]
+        assert workout_storage.workout_exists("legs day")["exists"]
+        assert len(parsed) == 1
+
+    def test_deleted_file_empties_cache(self, data_dir):
+        workout_storage.save_workout("push day", {"exercises": []}, {})
+        self._path(data_dir).unlink()
+        assert workout_storage.load_workout("push day") is None
+
+    def test_first_duplicate_wins(self, data_dir):
+        path = self._path(data_dir)
+        first, second = self._record("push day"), self._record("push day")
+        second["saved_at"] = "2025-01-01T00:00:00"
+        path.write_text(json.dumps(first) + "\n" + json.dumps(second) + "\n")
+        assert workout_storage.workout_exists("push day")["saved_at"] == first["saved_at"]
+
+    def test_saved_record_does_not_alias_caller(self, data_dir):
+        workout = {"exercises": [1]}
+        workout_storage.save_workout("push day", workout, {})
+        workout["exercises"].append(2)
+        assert workout_storage.load_workout("push day")["workout"] == {"exercises": [1]}
+
+
+class TestSharding:
+    """Records are partitioned by name hash; resharding keeps every record."""
+
+    def _save(self, names, version=0):
+        for name in names:
+            workout_storage.save_workout(name, {"version": version}, {})
+
+    def _names(self, count):
+        return [f"workout {i}" for i in range(count)]
+
+    def test_default_is_single_legacy_file(self, data_dir):
+        self._save(self._names(3))
+        assert sorted(p.name for p in data_dir.glob("*.jsonl")) == ["saved_workouts.jsonl"]
+
+    def test_shard_index_is_stable(self):
+        assert workout_storage.shard_index("push day", 8) == workout_storage.shard_index("push day", 8)
+        assert workout_storage.shard_index("push day", 1) == 0
+
+    def test_reshard_keeps_records(self, data_dir):
+        names = self._names(40)
+        self._save(names)
+
+        result = workout_storage.reshard(4)
+
+        assert result == {"from": 1, "to": 4, "copied": 40}
+        assert not (data_dir / "saved_workouts.jsonl").exists()
+        assert len(list(data_dir.glob("saved_workouts.*-of-004.jsonl"))) == 4
+        for name in names:
+            assert workout_storage.load_workout(name)["workout"] == {"version": 0}
+        assert len(_saved_names()) == 40
+
+    def test_save_touches_only_its_shard(self, data_dir):
+        workout_storage.reshard(4)
+        workout_storage.save_workout("push day", {}, {})
+        index = workout_storage.shard_index("push day", 4)
+        files = [p.name for p in data_dir.glob("*.jsonl")]
+        assert files == [workout_storage.shard_filename(index, 4)]
+
+    def test_reshard_back_to_one(self, data_dir):
+        self._save(self._names(20))
+        workout_storage.reshard(8)
+        workout_storage.reshard(1)
+        assert sorted(p.name for p in data_dir.glob("*.jsonl")) == ["saved_workouts.jsonl"]
+        assert len(_saved_names()) == 20
+
+    def test_saves_during_reshard_win(self, data_dir):
+        names = self._names(10)
+        self._save(names)
+        # A reshard that stopped right after announcing the new layout
+        workout_storage._write_layout({"shards": 1, "migrating_to": 4})
+
+        result = workout_storage.save_workout(names[0], {"version": 1}, {})
+        assert result["overwritten"]
+        assert workout_storage.load_workout(names[1])["workout"] == {"version": 0}
+
+        # Running it again finishes it without clobbering the newer save
+        assert workout_storage.reshard(4)["copied"] == 9
+        assert workout_storage.load_workout(names[0])["workout"] == {"version": 1}
+        assert len(_saved_names()) == 10
+
+    def test_concurrent_saves_while_resharding(self, data_dir):
+        self._save(self._names(50))
+        threads = [
+            threading.Thread(target=_save_many, args=(data_dir, w)) for w in range(4)
+        ]
+        for t in threads:
+            t.start()
+        workout_storage.reshard(8)
+        for t in threads:
+            t.join()
+
+        assert len(_saved_names()) == 50 + 4 * SAVES_PER_WORKER
+
+    def test_invalid_shard_count(self, data_dir):
+        for count in (0, workout_storage.MAX_SHARDS + 1, "4"):
+            with pytest.raises(workout_storage.ValidationError):
+                workout_storage.reshard(count)
+
+    def test_other_reshard_in_progress(self, data_dir):
+        workout_storage._write_layout({"shards": 1, "migrating_to": 4})
+        with pytest.raises(workout_storage.ValidationError):
+            workout_storage.reshard(8)
+
+    def test_cli(self, data_dir, capsys):
+        self._save(self._names(5))
+        assert reshard_cli.main(["4", "--data-dir", str(data_dir)]) == 0
+        assert "1 -> 4" in capsys.readouterr().out
+        assert reshard_cli.main(["--status", "--data-dir", str(data_dir)]) == 0
+        assert "shards: 4" in capsys.readouterr().out
+        assert reshard_cli.main(["0", "--data-dir", str(data_dir)]) == 2
+
+
+class TestCompactEncoding:
+    """Plans stored by exercise reference load back unchanged."""
+
+    PLAN_INPUT = {
+        "gender": "female",
+        "goal": "strength",
+        "experience": "beginner",
+        "days_per_week": 4,
+        "equipment": ["barbell", "dumbbell", "machine"],
+    }
+
+    @pytest.fixture
+    def compact(self, data_dir, monkeypatch):
+        monkeypatch.setattr(workout_storage, "STORAGE_ENCODING", "compact")
+        return data_dir
+
+    def _stored_size(self, data_dir):
+        return sum(p.stat().st_size for p in data_dir.glob("*.jsonl"))
+
+    def test_round_trip(self, compact):
+        plan = suggest(self.PLAN_INPUT)
+        workout_storage.save_workout("my plan", plan, self.PLAN_INPUT)
+
+        assert workout_storage.load_workout("my plan")["workout"] == plan
+        record = workout_storage._read_all_records()[0]
+        assert record["encoding"] == "compact-v1"
+
+    def test_smaller_than_full(self, compact, tmp_path, monkeypatch):
+        plan = suggest(self.PLAN_INPUT)
+        workout_storage.save_workout("my plan", plan, self.PLAN_INPUT)
+        compact_size = self._stored_size(compact)
+
+        full_dir = tmp_path / "full"
+        monkeypatch.setattr(workout_storage, "DATA_DIR", full_dir)
+        monkeypatch.setattr(workout_storage, "STORAGE_ENCODING", "full")
+        workout_storage.save_workout("my plan", plan, self.PLAN_INPUT)
+
+        assert self._stored_size(full_dir) > 2 * compact_size
+
+    def test_catalog_change_uses_archive(self, compact, monkeypatch):
+        plan = suggest(self.PLAN_INPUT)
+        workout_storage.save_workout("my plan", plan, self.PLAN_INPUT)
+
+        # The catalog changes: every exercise is renamed
+        renamed = [dict(e, name=e["name"] + " (v2)") for e in ALL_EXERCISES]
+        new_catalog = CatalogSnapshot(2, renamed, EXERCISE_TO_PATTERN)
+        monkeypatch.setattr(workout_storage, "get_catalog", lambda: new_catalog)
+
+        assert workout_storage.load_workout("my plan")["workout"] == plan
+
+    def test_mixed_encodings(self, data_dir, monkeypatch):
+        plan = suggest(self.PLAN_INPUT)
+        workout_storage.save_workout("full plan", plan, {})
+        monkeypatch.setattr(workout_storage, "STORAGE_ENCODING", "compact")
+        workout_storage.save_workout("compact plan", plan, {})
+
+        assert workout_storage.load_workout("full plan")["workout"] == plan
+        assert workout_storage.load_workout("compact plan")["workout"] == plan
+
+    def test_non_plan_stored_verbatim(self, compact):
+        workout_storage.save_workout("odd one", {"exercises": [1, 2]}, {})
+        record = workout_storage._read_all_records()[0]
+        assert "encoding" not in record
+        assert workout_storage.load_workout("odd one")["workout"] == {"exercises": [1, 2]}
+
+    def test_plan_with_non_dict_entries_round_trips(self, compact):
+        plan = suggest(self.PLAN_INPUT)
+        plan["workouts"][0]["exercises"][:0] = ["hello", [1, 2]]
+        workout_storage.save_workout("mixed plan", plan, {})
+        record = workout_storage._read_all_records()[0]
+        assert "encoding" not in record
+        assert workout_storage.load_workout("mixed plan")["workout"] == plan
+
+
+class TestAtomicWrite:
+    """A failed write leaves the previous file intact."""
+
+    def test_failed_write_keeps_old_file(self, tmp_path):
+        path = tmp_path / "data.jsonl"
+        atomic_write_lines(path, ['{"a": 1}\n'])
+
+        def broken_lines():
+            yield '{"b": 2}\n'
+            raise RuntimeError("disk full")
+
+        with pytest.raises(RuntimeError):
+            atomic_write_lines(path, broken_lines())
+
+        assert path.read_text() == '{"a": 1}\n'
+        assert [p.name for p in tmp_path.iterdir()] == ["data.jsonl"]
+
+
+class TestRWLock:
+    """Test reader/writer exclusion."""
+
+    def test_readers_share(self):
+        lock = RWLock()
+        entered = threading.Event()
+
+        def reader():
+            with lock.read():
+                entered.set()
+
+        with lock.read():
+            thread = threading.Thread(target=reader)
+            thread.start()
+            assert entered.wait(5)
+        thread.join(5)
+
+    def test_writer_waits_for_readers(self):
+        lock = RWLock()
+        entered = threading.Event()
+
+        def writer():
+            with lock.write():
+                entered.set()
+
+        with lock.read():
+            thread = threading.Thread(target=writer)
+            thread.start()
+            assert not entered.wait(0.2)
+        assert entered.wait(5)
+        thread.join(5)